@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+from api.services.orders.cart_store import cache_is_shared
+from utils.caches import is_shared_cache
+
+
+@register(Tags.caches)
+def check_cart_cache(app_configs, **kwargs):
+    # Con una caché local cada worker tiene su propia copia del carrito y `flush_carts` no ve ninguna
+    if settings.DEBUG or cache_is_shared():
+        return []
+    return [Warning(
+        "La caché de carritos es local al proceso.",
+        hint="Configure CART_CACHE_BACKEND con una caché compartida sin expulsión (p. ej. RedisCache).",
+        id='api.W001',
+    )]
+
+
+@register(Tags.caches)
+def check_default_cache(app_configs, **kwargs):
+    # Las versiones de invalidación viven en la caché por defecto: si es local, un cambio en un
+    # worker no llega a los demás hasta IN_PROCESS_TABLE_TTL (tablas) o el TTL de cada entrada
+    if settings.DEBUG or is_shared_cache('default'):
+        return []
+    return [Warning(
+        "La caché por defecto es local al proceso: las invalidaciones no llegan a los demás workers.",
+        hint="Configure CACHE_BACKEND con una caché compartida (p. ej. RedisCache).",
+        id='api.W002',
+    )]
@@ -0,0 +1,134 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.migrations import operations
+from django.db.migrations.autodetector import MigrationAutodetector
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.questioner import NonInteractiveMigrationQuestioner
+from django.db.migrations.state import ProjectState
+
+from api.models.locations.models_locations import Address
+from api.models.orders.models_orders import Order, OrderStatusHistory
+
+# Índices que el plan reemplazó por compuestos o parciales: (modelo, nombre o columnas)
+SUPERSEDED = [
+    (Order, 'idx_order_user'),                          # prefijo de idx_order_user_created
+    (Order, 'idx_order_number'),                        # duplica la restricción unique de order_number
+    (Order, 'idx_order_status'),                        # prefijo de idx_order_status_created
+    (OrderStatusHistory, 'idx_status_history_order'),   # prefijo de idx_status_history_order_date
+    (Address, ['user_id', 'es_principal']),             # reemplazado por unique_principal_address_per_user
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Crea con CREATE INDEX CONCURRENTLY los índices y restricciones parciales declarados en los "
+        "modelos que aún no existen, y elimina los reemplazados, sin bloquear escrituras (solo PostgreSQL). "
+        "Al final indica si la migración pendiente de `api` contiene solo esos índices y puede marcarse con `--fake`."
+    )
+
+    MIGRATION_NAME = 'index_plan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Solo mostrar el SQL")
+        parser.add_argument('--keep-superseded', action='store_true', help="No eliminar los índices reemplazados")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("CREATE INDEX CONCURRENTLY solo existe en PostgreSQL; use `migrate` en otras bases.")
+
+        statements = self.create_statements()
+        if not options['keep_superseded']:
+            statements += self.drop_statements()
+        if not statements:
+            self.stdout.write(self.style.SUCCESS("El plan de índices ya está aplicado."))
+            self.migration_advice()
+            return
+
+        # CONCURRENTLY no puede ejecutarse dentro de una transacción: una sentencia por vez en autocommit
+        for sql in statements:
+            self.stdout.write(sql)
+            if not options['dry_run']:
+                with connection.cursor() as cursor:
+                    cursor.execute(sql)
+        if not options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f"{len(statements)} sentencias aplicadas."))
+        self.migration_advice()
+
+    @staticmethod
+    def is_index_operation(operation):
+        """Operaciones que este comando ya ejecutó en la base"""
+        if isinstance(operation, (operations.AddIndex, operations.RemoveIndex, operations.RenameIndex)):
+            return True
+        return isinstance(operation, operations.AddConstraint) and getattr(operation.constraint, 'condition', None) is not None
+
+    def migration_advice(self):
+        """
+        Compara los modelos con las migraciones de `api` (lo mismo que
+        `makemigrations api`) y solo recomienda `--fake` si lo pendiente son
+        índices: marcar como aplicada una migración con otros cambios los
+        dejaría sin ejecutar.
+        """
+        loader = MigrationLoader(connection, ignore_no_migrations=True)
+        autodetector = MigrationAutodetector(
+            loader.project_state(),
+            ProjectState.from_apps(apps),
+            NonInteractiveMigrationQuestioner(specified_apps={'api'}, dry_run=True),
+        )
+        changes = autodetector.changes(
+            graph=loader.graph, trim_to_apps={'api'}, convert_apps={'api'}, migration_name=self.MIGRATION_NAME,
+        )
+        migrations = changes.get('api', [])
+        if not migrations:
+            self.stdout.write("Las migraciones de `api` ya declaran estos índices: no hay nada que marcar.")
+            return
+        pending = [operation for migration in migrations for operation in migration.operations]
+        others = [operation for operation in pending if not self.is_index_operation(operation)]
+        if others:
+            self.stdout.write(self.style.WARNING(
+                f"La migración pendiente de `api` incluye {len(others)} cambios que no son de este plan; "
+                f"no la marque con `--fake` (quedarían sin aplicar). Genérela y aplíquela con `migrate`:"
+            ))
+            for operation in others[:20]:
+                self.stdout.write(f"    - {operation.describe()}")
+            if len(others) > 20:
+                self.stdout.write(f"    ... y {len(others) - 20} más")
+            return
+        self.stdout.write(
+            f"La migración pendiente de `api` solo contiene los {len(pending)} índices del plan. Regístrela sin "
+            f"volver a crearlos:\n"
+            f"    python manage.py makemigrations api --name {self.MIGRATION_NAME}\n"
+            f"    python manage.py migrate api {migrations[-1].name} --fake"
+        )
+
+    def existing(self, table):
+        with connection.cursor() as cursor:
+            return connection.introspection.get_constraints(cursor, table)
+
+    def create_statements(self):
+        statements = []
+        with connection.schema_editor(atomic=False, collect_sql=True) as editor:
+            for model in apps.get_app_config('api').get_models():
+                if model._meta.proxy or not model._meta.managed:
+                    continue
+                existing = self.existing(model._meta.db_table)
+                for index in model._meta.indexes:
+                    if index.name not in existing:
+                        statements.append(str(index.create_sql(model, editor, concurrently=True)))
+                for constraint in model._meta.constraints:
+                    # Solo las únicas parciales se crean como índice; el resto queda para `migrate`
+                    if getattr(constraint, 'condition', None) is None or constraint.name in existing:
+                        continue
+                    sql = str(constraint.create_sql(model, editor))
+                    statements.append(sql.replace('CREATE UNIQUE INDEX', 'CREATE UNIQUE INDEX CONCURRENTLY', 1))
+        return statements
+
+    def drop_statements(self):
+        statements = []
+        for model, target in SUPERSEDED:
+            for name, info in self.existing(model._meta.db_table).items():
+                if not info['index'] or info['primary_key'] or info['unique']:
+                    continue
+                if name == target or info['columns'] == target:
+                    statements.append(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+        return statements
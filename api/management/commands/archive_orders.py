@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+
+from api.services.orders.archive import archivable, archive_orders
+
+
+def _megabytes(value):
+    return "n/d" if value is None else f"{value / 1024 / 1024:.1f} MB"
+
+
+class Command(BaseCommand):
+    help = (
+        "Mueve a las tablas *_archive las órdenes entregadas o canceladas antiguas con sus líneas, "
+        "historial y pagos, por lotes transaccionales. Se puede interrumpir y volver a ejecutar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, help="Por defecto ORDER_ARCHIVE_AFTER_DAYS")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Órdenes por transacción")
+        parser.add_argument('--max-batches', type=int, help="Detenerse tras N lotes (ventanas de mantenimiento)")
+        parser.add_argument('--reindex', action='store_true', help="REINDEX CONCURRENTLY al final (PostgreSQL)")
+        parser.add_argument('--dry-run', action='store_true', help="Solo contar las órdenes a archivar")
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            count = archivable(options['older_than_days']).count()
+            self.stdout.write(f"{count} órdenes por archivar.")
+            return
+
+        def progress(report):
+            self.stdout.write(
+                f"  lote {report.batches}: {report.orders} órdenes, {report.total_rows} filas "
+                f"({report.rows_per_second:.0f} filas/s)"
+            )
+
+        report = archive_orders(
+            older_than_days=options['older_than_days'],
+            batch_size=options['batch_size'],
+            max_batches=options['max_batches'],
+            reindex=options['reindex'],
+            progress=progress if options['verbosity'] > 1 else None,
+        )
+        for table, rows in report.rows.items():
+            self.stdout.write(f"  {table}: {rows} filas")
+        self.stdout.write(self.style.SUCCESS(
+            f"{report.orders} órdenes ({report.total_rows} filas) archivadas en {report.elapsed:.1f}s "
+            f"({report.rows_per_second:.0f} filas/s) y {report.batches} lotes. Índices calientes: "
+            f"{_megabytes(report.index_bytes_before)} -> {_megabytes(report.index_bytes_after)} "
+            f"(ahorro {_megabytes(report.index_bytes_saved)})."
+        ))
@@ -0,0 +1,120 @@
+import random
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries
+
+from api.models.orders.models_orders import CartItem, ShoppingCart
+from api.models.products.models_products import Product
+from api.services.orders import cart_store
+
+BENCH_USERNAME = 'bench-cart'
+BENCH_SKU_PREFIX = 'BENCH-CART-'
+
+
+class Command(BaseCommand):
+    help = (
+        "Prueba de carga del carrito: una escritura en la base por cambio contra el carrito en caché "
+        "con escritura diferida, con la misma secuencia de cambios y comprobando que el estado final coincide"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--carts', type=int, default=200)
+        parser.add_argument('--products', type=int, default=50)
+        parser.add_argument('--mutations', type=int, default=20000)
+        parser.add_argument('--flush-every', type=int, default=2000, help="Cambios entre barridos (simula el intervalo)")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        user, _ = get_user_model().objects.get_or_create(username=BENCH_USERNAME, defaults={'email': 'bench-cart@example.com'})
+        products = Product.objects.bulk_create([
+            Product(name=f"Producto carrito {i}", sku=f"{BENCH_SKU_PREFIX}{i}", price=Decimal(1000 + i))
+            for i in range(options['products'])
+        ])
+        product_ids = [product.pk for product in products]
+        rng = random.Random(options['seed'])
+        operations = [
+            (rng.randrange(options['carts']), rng.choice(('add', 'add', 'set', 'remove')), rng.choice(product_ids), rng.randint(1, 5))
+            for _ in range(options['mutations'])
+        ]
+        try:
+            direct_carts = self.carts(user, options['carts'])
+            cached_carts = self.carts(user, options['carts'])
+
+            direct = self.measure(lambda: self.direct(direct_carts, operations))
+            cached = self.measure(lambda: self.write_behind(cached_carts, operations, options['flush_every']))
+
+            n = len(operations)
+            self.stdout.write(f"{'':<28}{'ms/cambio':>11}{'consultas':>11}{'total s':>9}")
+            self.stdout.write(f"{'Base por cambio':<28}{direct[0] / n * 1000:>11.3f}{direct[1]:>11}{direct[0]:>9.2f}")
+            self.stdout.write(f"{'Caché + escritura diferida':<28}{cached[0] / n * 1000:>11.3f}{cached[1]:>11}{cached[0]:>9.2f}")
+            self.stdout.write(f"Consultas por cambio: {direct[1] / n:.2f} contra {cached[1] / n:.3f}")
+
+            if self.snapshot(direct_carts) != self.snapshot(cached_carts):
+                raise CommandError("El estado final de los carritos no coincide entre las dos estrategias")
+            self.stdout.write(self.style.SUCCESS("Estado final idéntico en la base con ambas estrategias."))
+        finally:
+            carts = ShoppingCart.objects.filter(user=user)
+            for cart_id in carts.values_list('pk', flat=True):
+                cart_store.forget_cart(cart_id)
+            carts.delete()
+            Product.objects.filter(sku__startswith=BENCH_SKU_PREFIX).delete()
+
+    @staticmethod
+    def carts(user, count):
+        return [cart.pk for cart in ShoppingCart.objects.bulk_create([ShoppingCart(user=user) for _ in range(count)])]
+
+    @staticmethod
+    def measure(action):
+        debug = connection.force_debug_cursor
+        connection.force_debug_cursor = True
+        reset_queries()
+        try:
+            start = time.perf_counter()
+            action()
+            return time.perf_counter() - start, len(connection.queries)
+        finally:
+            connection.force_debug_cursor = debug
+
+    @staticmethod
+    def direct(carts, operations):
+        """Lo que haría una vista sin caché: leer y escribir `cart_items` en cada cambio"""
+        for cart_index, kind, product_id, quantity in operations:
+            cart_id = carts[cart_index]
+            item = CartItem.objects.filter(cart_id=cart_id, product_id=product_id).first()
+            if kind == 'add':
+                if item is None:
+                    item = CartItem(cart_id=cart_id, product_id=product_id, quantity=0)
+                item.quantity += quantity
+                item.save()
+            elif item is not None and kind == 'set':
+                item.quantity = quantity
+                item.save(update_fields=['quantity'])
+            elif item is not None:
+                item.delete()
+
+    @staticmethod
+    def write_behind(carts, operations, flush_every):
+        for position, (cart_index, kind, product_id, quantity) in enumerate(operations, 1):
+            cart_id = carts[cart_index]
+            if kind == 'add':
+                cart_store.add_item(cart_id, product_id=product_id, quantity=quantity)
+            else:
+                try:
+                    cart_store.set_quantity(cart_id, quantity if kind == 'set' else 0, product_id=product_id)
+                except KeyError:
+                    pass  # la línea no existe: igual que la vista directa, no hay nada que cambiar
+            if position % flush_every == 0:
+                cart_store.flush_dirty()
+        cart_store.flush_dirty()
+
+    @staticmethod
+    def snapshot(carts):
+        position = {cart_id: index for index, cart_id in enumerate(carts)}
+        return sorted(
+            (position[cart_id], product_id, quantity)
+            for cart_id, product_id, quantity in CartItem.objects.filter(cart_id__in=carts)
+            .values_list('cart_id', 'product_id', 'quantity')
+        )
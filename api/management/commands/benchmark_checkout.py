@@ -0,0 +1,96 @@
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries, transaction
+
+from api.models.locations.models_locations import Address, Municipio
+from api.models.orders.models_orders import CartItem, Order, OrderItem, OrderStatusHistory, ShippingRate, ShoppingCart
+from api.models.products.models_products import Product
+from api.services.orders.checkout import checkout, compute_totals
+from api.services.products.pricing import resolve_prices
+
+BENCH_USERNAME = 'bench-checkout'
+BENCH_SKU_PREFIX = 'BENCH-CHECKOUT-'
+
+
+class Command(BaseCommand):
+    help = "Mide el checkout por conjuntos contra OrderItem.save fila por fila y muestra que las consultas no crecen con el carrito"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lines', type=int, default=50, help="Líneas del carrito más grande")
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        municipio = Municipio.objects.order_by('codigo_dane').first()
+        if municipio is None:
+            raise CommandError("No hay municipios cargados; ejecute primero `load_dane`.")
+        user, _ = get_user_model().objects.get_or_create(username=BENCH_USERNAME, defaults={'email': 'bench-checkout@example.com'})
+        address = Address.objects.create(user=user, municipio=municipio, tipo_via='CL', numero_via='1')
+        products = Product.objects.bulk_create([
+            Product(name=f"Producto checkout {i}", sku=f"{BENCH_SKU_PREFIX}{i}", price=Decimal(1000 + i), weight_grams=250)
+            for i in range(options['lines'])
+        ])
+        rate = ShippingRate.objects.create(shipping_method=Order.ShippingMethod.PICKUP, cost=0)
+        try:
+            self.stdout.write(f"{'líneas':>8}{'por fila ms':>14}{'consultas':>11}{'conjuntos ms':>14}{'consultas':>11}")
+            sizes = sorted({1, 10, options['lines']})
+            for size in sizes:
+                lines = products[:size]
+                prepare = lambda: self.cart(user, lines)  # noqa: E731
+                naive = self.run(prepare, lambda cart: self.naive_checkout(cart, address), options['repeat'])
+                bulk = self.run(
+                    prepare,
+                    lambda cart: checkout(cart, address, shipping_method=Order.ShippingMethod.PICKUP),
+                    options['repeat'],
+                )
+                self.stdout.write(f"{size:>8}{naive[0]:>14.2f}{naive[1]:>11}{bulk[0]:>14.2f}{bulk[1]:>11}")
+        finally:
+            Order.objects.filter(user=user).delete()
+            ShoppingCart.objects.filter(user=user).delete()
+            Product.objects.filter(sku__startswith=BENCH_SKU_PREFIX).delete()
+            address.delete()
+            rate.delete()
+
+    @staticmethod
+    def cart(user, products):
+        cart = ShoppingCart.objects.create(user=user)
+        CartItem.objects.bulk_create([
+            CartItem(cart=cart, product=product, quantity=2, price=product.price) for product in products
+        ])
+        return cart
+
+    @staticmethod
+    def naive_checkout(cart, address):
+        """Lo que haría una vista sin el servicio: un save por línea con snapshots perezosos"""
+        with transaction.atomic():
+            items = list(cart.items.all())
+            totals = compute_totals(resolve_prices(items), 0)
+            order = Order.objects.create(
+                user_id=cart.user_id, shipping_address=address, billing_address=address,
+                shipping_method=Order.ShippingMethod.PICKUP, subtotal=totals.subtotal,
+                tax_amount=totals.tax_amount, total=totals.total,
+            )
+            for item in items:
+                OrderItem(order=order, product=item.product, unit_price=item.price, quantity=item.quantity).save()
+            OrderStatusHistory.objects.create(order=order, new_status=order.status, changed_by='checkout')
+            cart.items.all().delete()
+
+    @staticmethod
+    def run(prepare, action, repeat):
+        """Mejor tiempo y consultas de `action(prepare())`; la preparación no se mide"""
+        timings, queries = [], None
+        for _ in range(repeat):
+            cart = prepare()
+            debug = connection.force_debug_cursor
+            connection.force_debug_cursor = True
+            reset_queries()
+            try:
+                start = time.perf_counter()
+                action(cart)
+                timings.append((time.perf_counter() - start) * 1000)
+                queries = len(connection.queries)
+            finally:
+                connection.force_debug_cursor = debug
+        return min(timings), queries
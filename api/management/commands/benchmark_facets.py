@@ -0,0 +1,122 @@
+import random
+import time
+from collections import Counter
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, reset_queries, transaction
+from django.db.models import Case, Count, IntegerField, Value, When
+
+from api.models.products.models_products import Product, ProductCategory, ProductCategoryAssignment
+from api.services.products.facets import PRICE_BUCKETS, compute_facets, filter_products, normalize_filters
+
+BENCH_SKU_PREFIX = 'BENCH-FACET-'
+BENCH_SLUG_PREFIX = 'bench-facet-'
+
+BRANDS = ['Hollsen', 'Andina', 'Caribe', 'Pacífico', 'Llanos', 'Sierra', 'Macondo', 'Tayrona']
+COLORS = ['negro', 'blanco', 'azul', 'rojo', 'verde', 'gris', 'amarillo', 'morado']
+
+SCENARIOS = [
+    {},
+    {'brand': ['Hollsen', 'Andina']},
+    {'min_price': '50000', 'max_price': '200000'},
+    {'brand': ['Caribe'], 'max_price': '100000'},
+]
+
+
+class Command(BaseCommand):
+    help = "Compara el motor de facetas contra un GROUP BY por faceta sobre un catálogo sintético"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=200000, help="Tamaño del catálogo sintético")
+        parser.add_argument('--categories', type=int, default=40)
+        parser.add_argument('--repeat', type=int, default=5, help="Repeticiones por escenario")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--keep', action='store_true', help="No borrar el catálogo sintético al terminar")
+
+    def handle(self, *args, **options):
+        self.seed(options['products'], options['categories'], options['batch_size'])
+        try:
+            self.stdout.write(f"{'escenario':<48}{'por faceta ms':>15}{'motor ms':>12}{'caché ms':>12}{'consultas':>11}")
+            for params in SCENARIOS:
+                naive = self.measure(lambda: self.naive_facets(params), options['repeat'])
+                engine = self.measure(lambda: compute_facets(params, use_cache=False), options['repeat'])
+                compute_facets(params)
+                cached = self.measure(lambda: compute_facets(params), options['repeat'])
+                queries = self.count_queries(lambda: compute_facets(params, use_cache=False))
+                label = str(params) if params else 'sin filtros'
+                self.stdout.write(f"{label:<48}{naive:>15.2f}{engine:>12.2f}{cached:>12.3f}{queries:>11}")
+        finally:
+            if not options['keep']:
+                Product.objects.filter(sku__startswith=BENCH_SKU_PREFIX).delete()
+                ProductCategory.objects.filter(slug__startswith=BENCH_SLUG_PREFIX).delete()
+
+    def seed(self, total, categories, batch_size):
+        rng = random.Random(42)
+        start = time.perf_counter()
+        with transaction.atomic():
+            category_ids = [
+                ProductCategory.objects.create(name=f"Bench facet {i}", slug=f"{BENCH_SLUG_PREFIX}{i}").pk
+                for i in range(categories)
+            ]
+            for offset in range(0, total, batch_size):
+                products = Product.objects.bulk_create([
+                    Product(
+                        name=f"Producto {i}",
+                        brand=rng.choice(BRANDS),
+                        sku=f"{BENCH_SKU_PREFIX}{i}",
+                        price=Decimal(rng.randint(5, 600)) * 1000,
+                        color_options=rng.sample(COLORS, rng.randint(1, 4)),
+                    )
+                    for i in range(offset, min(offset + batch_size, total))
+                ])
+                ProductCategoryAssignment.objects.bulk_create([
+                    ProductCategoryAssignment(product_id=product.pk, category_id=category_id)
+                    for product in products
+                    for category_id in rng.sample(category_ids, rng.randint(1, 2))
+                ])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"{total} productos sintéticos creados en {elapsed:.1f}s")
+
+    @staticmethod
+    def naive_facets(params):
+        """Una consulta GROUP BY por faceta, como se haría sin el motor."""
+        queryset = filter_products(normalize_filters(params)).order_by()
+        brands = list(queryset.values('brand').annotate(count=Count('id')))
+        categories = list(
+            ProductCategoryAssignment.objects.filter(product__in=queryset)
+            .values('category_id').annotate(count=Count('product_id', distinct=True))
+        )
+        buckets = list(
+            queryset.annotate(bucket=Case(
+                *[When(price__gte=limit, then=Value(i)) for i, limit in reversed(list(enumerate(PRICE_BUCKETS, start=1)))],
+                default=Value(0),
+                output_field=IntegerField(),
+            )).values('bucket').annotate(count=Count('id'))
+        )
+        colors = Counter(
+            color
+            for options in queryset.values_list('color_options', flat=True).iterator(chunk_size=2000)
+            for color in options or ()
+        )
+        return brands, categories, buckets, colors
+
+    @staticmethod
+    def measure(func, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        return min(timings)
+
+    @staticmethod
+    def count_queries(func):
+        debug = connection.force_debug_cursor
+        connection.force_debug_cursor = True
+        reset_queries()
+        try:
+            func()
+            return len(connection.queries)
+        finally:
+            connection.force_debug_cursor = debug
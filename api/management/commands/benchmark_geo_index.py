@@ -0,0 +1,66 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models.locations.models_locations import Barrio, Departamento, Municipio
+from api.services.locations.geo_index import get_geo_index, normalize
+
+PREFIXES = ['bo', 'san', 'cart', 'ibag', 'monteria', 'pop']
+
+
+class Command(BaseCommand):
+    help = "Compara la latencia (µs) del índice geográfico en memoria contra el ORM"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=2000, help="Repeticiones por operación")
+
+    def handle(self, *args, **options):
+        municipio = Municipio.objects.order_by('codigo_dane').first()
+        if municipio is None:
+            raise CommandError("No hay municipios cargados; ejecute primero `load_dane`.")
+        departamento = municipio.departamento_id
+        repeat = options['repeat']
+
+        start = time.perf_counter()
+        get_geo_index()
+        self.stdout.write(
+            f"Índice construido en {(time.perf_counter() - start) * 1000:.1f} ms "
+            f"({Departamento.objects.count()} departamentos, {Municipio.objects.count()} municipios, "
+            f"{Barrio.objects.count()} barrios)"
+        )
+
+        operations = [
+            (
+                'municipio por código',
+                lambda: get_geo_index().municipio(municipio.codigo_dane),
+                lambda: Municipio.objects.filter(codigo_dane=municipio.codigo_dane).values('codigo_dane', 'nombre', 'departamento_id').first(),
+            ),
+            (
+                'municipios de un departamento',
+                lambda: get_geo_index().municipios(departamento),
+                lambda: list(Municipio.objects.filter(departamento_id=departamento).values('codigo_dane', 'nombre')),
+            ),
+            (
+                'barrios de un municipio',
+                lambda: get_geo_index().barrios(municipio.codigo_dane),
+                lambda: list(Barrio.objects.filter(municipio_id=municipio.codigo_dane).values('pk', 'nombre')),
+            ),
+        ]
+        for prefix in PREFIXES:
+            operations.append((
+                f"autocompletar '{prefix}'",
+                lambda prefix=prefix: get_geo_index().autocomplete(prefix),
+                # El ORM no ignora tildes sin `unaccent`; es la consulta más cercana
+                lambda prefix=prefix: list(Municipio.objects.filter(nombre__istartswith=normalize(prefix)).values('codigo_dane', 'nombre')[:10]),
+            ))
+
+        self.stdout.write(f"{'operación':<32}{'índice µs':>12}{'ORM µs':>12}")
+        for label, indexed, orm in operations:
+            self.stdout.write(f"{label:<32}{self.measure(indexed, repeat):>12.2f}{self.measure(orm, max(repeat // 10, 1)):>12.2f}")
+
+    @staticmethod
+    def measure(func, repeat):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - start) / repeat * 1_000_000
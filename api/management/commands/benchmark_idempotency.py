@@ -0,0 +1,105 @@
+import threading
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.http import JsonResponse
+from django.test import RequestFactory
+
+from api.models.orders.models_orders import IdempotencyKey
+from utils.idempotency import _fingerprint, _lru, run_idempotent
+
+BENCH_PATH = '/api/bench-idempotency/'
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide lo que agrega la capa de idempotencia por petición (clave nueva, repetición desde el LRU "
+        "y desde la base) y comprueba que duplicados simultáneos ejecutan la vista una sola vez"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--duplicates', type=int, default=8, help="Peticiones simultáneas con la misma clave")
+        parser.add_argument('--view-ms', type=int, default=200, help="Duración simulada de la vista en la prueba de duplicados")
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        body = b'{"cart": 1}'
+        executed = []
+
+        def view(request):
+            executed.append(1)
+            return JsonResponse({'order': len(executed)}, status=201)
+
+        def request(key):
+            return factory.post(BENCH_PATH, body, content_type='application/json', HTTP_IDEMPOTENCY_KEY=key)
+
+        n = options['requests']
+        keys = [f"bench-{uuid.uuid4()}" for _ in range(n)]
+        try:
+            baseline = self.measure(lambda key: view(request(key)), keys)
+            fresh = self.measure(lambda key: run_idempotent(request(key), view), keys)
+            lru = self.measure(lambda key: run_idempotent(request(key), view), keys)
+            _lru.clear()
+            database = self.measure(lambda key: run_idempotent(request(key), view), keys)
+            lru_after_db = self.measure(lambda key: run_idempotent(request(key), view), keys)
+
+            self.stdout.write(f"Vista sin idempotencia:          {baseline:.3f} ms/petición")
+            self.stdout.write(f"Clave nueva (INSERT + UPDATE):  {fresh - baseline:+.3f} ms")
+            self.stdout.write(f"Repetición desde el LRU:        {lru - baseline:+.3f} ms")
+            self.stdout.write(f"Repetición desde la base:       {database - baseline:+.3f} ms")
+            self.stdout.write(f"LRU tras cargarla de la base:   {lru_after_db - baseline:+.3f} ms")
+
+            calls, responses = self.race(request, options['duplicates'], options['view_ms'] / 1000)
+        finally:
+            IdempotencyKey.objects.filter(fingerprint__in=self.fingerprints(request, keys + [self.race_key])).delete()
+            _lru.clear()
+
+        self.stdout.write(
+            f"{options['duplicates']} duplicados simultáneos: vista ejecutada {calls} vez/veces; "
+            f"{len(set(responses))} respuesta(s) distinta(s): {sorted(set(responses))}"
+        )
+        if calls != 1 or len(set(responses)) != 1:
+            raise CommandError("Los duplicados simultáneos no recibieron una única respuesta")
+        self.stdout.write(self.style.SUCCESS("Duplicados resueltos con una sola ejecución."))
+
+    @staticmethod
+    def measure(call, keys):
+        start = time.perf_counter()
+        for key in keys:
+            call(key)
+        return (time.perf_counter() - start) / len(keys) * 1000
+
+    race_key = 'bench-race'
+
+    def race(self, request, duplicates, view_seconds):
+        """Hilos con la misma clave contra una vista lenta"""
+        calls = []
+        results = []
+        lock = threading.Lock()
+
+        def slow_view(request):
+            calls.append(1)
+            time.sleep(view_seconds)
+            return JsonResponse({'order': len(calls)}, status=201)
+
+        def run():
+            try:
+                response = run_idempotent(request(self.race_key), slow_view)
+                with lock:
+                    results.append((response.status_code, response.content.decode()))
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=run) for _ in range(duplicates)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return len(calls), results
+
+    @staticmethod
+    def fingerprints(request, keys):
+        return [_fingerprint(request(key), key) for key in keys]
@@ -0,0 +1,110 @@
+import random
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F, FloatField
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+from api.models.locations.models_locations import Address, Municipio
+from api.services.locations.geohash import EARTH_RADIUS_KM, encode
+from api.services.locations.nearby import PointTree, addresses_within, nearest_addresses
+
+BENCH_USERNAME = 'bench-nearby'
+
+# Bogotá, Medellín, Cali, Barranquilla, Bucaramanga
+CENTERS = [(4.711, -74.072), (6.244, -75.581), (3.451, -76.532), (10.968, -74.781), (7.119, -73.122)]
+
+
+def haversine_expression(latitude, longitude):
+    """Distancia en km calculada en SQL para cada fila (recorrido completo)."""
+    lat, lon = Radians(float(latitude)), Radians(float(longitude))
+    a = (
+        Power(Sin((Radians(F('latitud')) - lat) / 2), 2)
+        + Cos(lat) * Cos(Radians(F('latitud'))) * Power(Sin((Radians(F('longitud')) - lon) / 2), 2)
+    )
+    return 2 * EARTH_RADIUS_KM * ASin(Sqrt(a), output_field=FloatField())
+
+
+class Command(BaseCommand):
+    help = "Compara búsquedas por geohash contra un recorrido completo con haversine"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--addresses', type=int, default=1000000, help="Direcciones sintéticas")
+        parser.add_argument('--radius', type=float, default=2.0, help="Radio en km")
+        parser.add_argument('--k', type=int, default=5, help="Vecinos más cercanos")
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--keep', action='store_true', help="No borrar las direcciones sintéticas al terminar")
+
+    def handle(self, *args, **options):
+        municipio = Municipio.objects.order_by('codigo_dane').first()
+        if municipio is None:
+            raise CommandError("No hay municipios cargados; ejecute primero `load_dane`.")
+        user, _ = get_user_model().objects.get_or_create(username=BENCH_USERNAME)
+        rng = random.Random(42)
+
+        start = time.perf_counter()
+        with transaction.atomic():
+            for offset in range(0, options['addresses'], options['batch_size']):
+                batch = []
+                for _ in range(min(options['batch_size'], options['addresses'] - offset)):
+                    center_lat, center_lon = rng.choice(CENTERS)
+                    lat = Decimal(f"{center_lat + rng.gauss(0, 0.15):.6f}")
+                    lon = Decimal(f"{center_lon + rng.gauss(0, 0.15):.6f}")
+                    batch.append(Address(
+                        user=user, municipio=municipio, tipo_via='CL', numero_via='1',
+                        latitud=lat, longitud=lon, geohash=encode(lat, lon),
+                    ))
+                Address.objects.bulk_create(batch)
+        self.stdout.write(f"{options['addresses']} direcciones sintéticas creadas en {time.perf_counter() - start:.1f}s")
+
+        queryset = Address.objects.filter(user=user)
+        try:
+            points = [(lat + rng.gauss(0, 0.05), lon + rng.gauss(0, 0.05)) for lat, lon in CENTERS]
+            radius, k = options['radius'], options['k']
+
+            def scan_within(lat, lon):
+                return list(
+                    queryset.annotate(distance=haversine_expression(lat, lon))
+                    .filter(distance__lte=radius).order_by('distance').values_list('pk', 'distance')
+                )
+
+            def scan_nearest(lat, lon):
+                return list(
+                    queryset.annotate(distance=haversine_expression(lat, lon))
+                    .order_by('distance').values_list('pk', 'distance')[:k]
+                )
+
+            self.stdout.write(f"{'consulta':<28}{'recorrido ms':>14}{'geohash ms':>12}{'resultados':>12}")
+            rows = [
+                (f"radio {radius} km", scan_within, lambda lat, lon: addresses_within(lat, lon, radius, queryset)),
+                (f"{k} más cercanas", scan_nearest, lambda lat, lon: nearest_addresses(lat, lon, k, queryset)),
+            ]
+            for label, scan, indexed in rows:
+                scan_ms = self.measure(lambda: [scan(lat, lon) for lat, lon in points], options['repeat'])
+                indexed_ms = self.measure(lambda: [indexed(lat, lon) for lat, lon in points], options['repeat'])
+                results = sum(len(indexed(lat, lon)) for lat, lon in points)
+                self.stdout.write(
+                    f"{label:<28}{scan_ms / len(points):>14.2f}{indexed_ms / len(points):>12.2f}{results:>12}"
+                )
+
+            # Conjunto pequeño (p. ej. puntos de recogida) en un árbol k-d en memoria
+            sample = list(queryset.values_list('pk', 'latitud', 'longitud')[:1000])
+            tree = PointTree(sample)
+            tree_ms = self.measure(lambda: [tree.nearest(lat, lon, k) for lat, lon in points], options['repeat'] * 20)
+            self.stdout.write(f"{f'árbol k-d ({len(tree)} puntos)':<28}{'':>14}{tree_ms / len(points):>12.3f}")
+        finally:
+            if not options['keep']:
+                queryset.delete()
+
+    @staticmethod
+    def measure(func, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        return min(timings)
@@ -0,0 +1,113 @@
+import threading
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, transaction
+
+from api.models.locations.models_locations import Address, Municipio
+from api.models.orders.models_orders import Order, OrderStatusHistory
+from api.services.orders.status import transition_orders
+
+BENCH_USERNAME = 'bench-transitions'
+BENCH_NUMBER_PREFIX = 'BT-'
+
+
+class Command(BaseCommand):
+    help = "Mide transiciones de estado por lotes contra save() por orden y prueba transiciones concurrentes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=100000)
+        parser.add_argument('--naive-sample', type=int, default=2000, help="Órdenes para medir save() por fila")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--keep', action='store_true', help="No borrar las órdenes sintéticas al terminar")
+
+    def handle(self, *args, **options):
+        ids = self.seed(options['orders'], options['batch_size'])
+        try:
+            sample = ids[:options['naive_sample']]
+            start = time.perf_counter()
+            for order in Order.objects.filter(pk__in=sample):
+                order.status = Order.Status.PAID
+                order.save()
+                OrderStatusHistory.objects.create(order=order, old_status=Order.Status.PENDING,
+                                                  new_status=order.status, changed_by='benchmark')
+            naive = time.perf_counter() - start
+            self.stdout.write(
+                f"save() por orden: {len(sample)} órdenes en {naive:.2f}s "
+                f"({len(sample) / naive:.0f} órdenes/s, ~{naive / len(sample) * len(ids):.0f}s para {len(ids)})"
+            )
+
+            rest = ids[len(sample):]
+            start = time.perf_counter()
+            result = transition_orders(rest, Order.Status.PAID, 'benchmark', batch_size=options['batch_size'])
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f"transition_orders: {len(result.updated)} órdenes en {elapsed:.2f}s "
+                f"({len(result.updated) / elapsed:.0f} órdenes/s), {result.history} filas de historial, "
+                f"{len(result.rejected)} rechazadas"
+            )
+            self.race(ids, options['batch_size'])
+        finally:
+            if not options['keep']:
+                self.cleanup()
+
+    def race(self, ids, batch_size):
+        """
+        Dos procesos compiten por las mismas órdenes pagadas con destinos
+        finales excluyentes (cancelada/reembolsada): cada una cambia una sola vez.
+        """
+        outcomes = {}
+
+        def worker(new_status):
+            try:
+                while True:
+                    try:
+                        outcomes[new_status] = transition_orders(ids, new_status, 'race', batch_size=batch_size)
+                        return
+                    except OperationalError:
+                        continue  # SQLite: base bloqueada por otro escritor; PostgreSQL: deadlock entre los dos lotes
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(status,)) for status in (Order.Status.CANCELLED, Order.Status.REFUNDED)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        cancelled, refunded = outcomes[Order.Status.CANCELLED], outcomes[Order.Status.REFUNDED]
+        both = set(cancelled.updated) & set(refunded.updated)
+        self.stdout.write(
+            f"carrera cancelada/reembolsada en {elapsed:.2f}s: {len(cancelled.updated)} canceladas, "
+            f"{len(refunded.updated)} reembolsadas, {len(cancelled.rejected)} + {len(refunded.rejected)} rechazadas"
+        )
+        if both or len(cancelled.updated) + len(refunded.updated) != len(ids):
+            raise CommandError(f"Transiciones perdidas o duplicadas: {len(both)} órdenes cambiadas dos veces.")
+        self.stdout.write(self.style.SUCCESS("Cada orden cambió exactamente una vez; las perdedoras se informaron como rechazadas."))
+
+    def seed(self, total, batch_size):
+        municipio = Municipio.objects.order_by('codigo_dane').first()
+        if municipio is None:
+            raise CommandError("No hay municipios cargados; ejecute primero `load_dane`.")
+        user, _ = get_user_model().objects.get_or_create(username=BENCH_USERNAME, defaults={'email': 'bench-transitions@example.com'})
+        address = Address.objects.create(user=user, municipio=municipio, tipo_via='CL', numero_via='1')
+        start = time.perf_counter()
+        with transaction.atomic():
+            for offset in range(0, total, batch_size):
+                Order.objects.bulk_create([
+                    Order(
+                        user=user, shipping_address=address, billing_address=address,
+                        order_number=f"{BENCH_NUMBER_PREFIX}{i:09d}", subtotal=Decimal('1000'), total=Decimal('1000'),
+                    )
+                    for i in range(offset, min(offset + batch_size, total))
+                ])
+        self.stdout.write(f"{total} órdenes sintéticas creadas en {time.perf_counter() - start:.1f}s")
+        return list(Order.objects.filter(order_number__startswith=BENCH_NUMBER_PREFIX).order_by('pk').values_list('pk', flat=True))
+
+    def cleanup(self):
+        Order.objects.filter(order_number__startswith=BENCH_NUMBER_PREFIX).delete()
+        Address.objects.filter(user__username=BENCH_USERNAME).delete()
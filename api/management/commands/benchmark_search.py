@@ -0,0 +1,81 @@
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from api.models.products.models_products import Product
+from api.services.products.search import get_search_index, reset_search_index, search_products, update_search_vectors
+
+BENCH_SKU_PREFIX = 'BENCH-SEARCH-'
+
+NOUNS = ['camiseta', 'buzo', 'gorra', 'taza', 'chaqueta', 'pantalón', 'mochila', 'termo', 'sudadera', 'bolso']
+ADJECTIVES = ['estampada', 'clásica', 'deportiva', 'oversize', 'básica', 'bordada', 'vintage', 'térmica', 'urbana', 'premium']
+COLORS = ['negro', 'blanco', 'azul', 'rojo', 'verde', 'gris', 'amarillo', 'morado']
+BRANDS = ['Hollsen', 'Andina', 'Caribe', 'Pacífico', 'Llanos', 'Sierra', 'Macondo', 'Tayrona']
+
+QUERIES = ['camiseta', 'gorra azul', 'chaqeta', 'sudadera vintage', 'termo macondo', 'mochila urbana roja']
+
+
+class Command(BaseCommand):
+    help = "Compara la búsqueda de productos contra icontains sobre un catálogo sintético"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=1000000, help="Tamaño del catálogo sintético")
+        parser.add_argument('--repeat', type=int, default=5, help="Repeticiones por consulta")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--keep', action='store_true', help="No borrar el catálogo sintético al terminar")
+
+    def handle(self, *args, **options):
+        self.seed(options['products'], options['batch_size'])
+        try:
+            reset_search_index()
+            get_search_index()  # Construcción del índice fuera de la medición
+            self.stdout.write(f"{'consulta':<22}{'icontains ms':>14}{'búsqueda ms':>14}{'resultados':>12}")
+            for query in QUERIES:
+                baseline = self.measure(lambda: list(self.icontains(query)[:50]), options['repeat'])
+                search, results = self.measure(lambda: list(search_products(query)), options['repeat'], keep=True)
+                self.stdout.write(f"{query:<22}{baseline:>14.2f}{search:>14.2f}{len(results):>12}")
+        finally:
+            if not options['keep']:
+                Product.objects.filter(sku__startswith=BENCH_SKU_PREFIX).delete()
+                reset_search_index()
+
+    def seed(self, total, batch_size):
+        rng = random.Random(42)
+        start = time.perf_counter()
+        with transaction.atomic():
+            for offset in range(0, total, batch_size):
+                Product.objects.bulk_create([
+                    Product(
+                        name=f"{rng.choice(NOUNS).capitalize()} {rng.choice(ADJECTIVES)} {rng.choice(COLORS)}",
+                        brand=rng.choice(BRANDS),
+                        description=f"{rng.choice(NOUNS)} {rng.choice(ADJECTIVES)} de la colección {rng.randint(2018, 2025)}",
+                        sku=f"{BENCH_SKU_PREFIX}{i}",
+                        price=Decimal(rng.randint(10, 300)) * 1000,
+                    )
+                    for i in range(offset, min(offset + batch_size, total))
+                ])
+            update_search_vectors(Product.objects.filter(sku__startswith=BENCH_SKU_PREFIX))
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"{total} productos sintéticos creados en {elapsed:.1f}s")
+
+    @staticmethod
+    def icontains(query):
+        queryset = Product.objects.filter(is_active=True)
+        for term in query.split():
+            queryset = queryset.filter(Q(name__icontains=term) | Q(description__icontains=term) | Q(brand__icontains=term))
+        return queryset
+
+    @staticmethod
+    def measure(func, repeat, keep=False):
+        timings = []
+        result = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            timings.append((time.perf_counter() - start) * 1000)
+        best = min(timings)
+        return (best, result) if keep else best
@@ -0,0 +1,32 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.services.orders.rollups import ROLLUPS, check_rollups
+
+
+class Command(BaseCommand):
+    help = "Compara SalesDaily/SalesHourly con las órdenes y falla si hay diferencias"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=date.fromisoformat, help="Primera fecha (AAAA-MM-DD); por defecto hace 30 días")
+        parser.add_argument('--end', type=date.fromisoformat, help="Última fecha (AAAA-MM-DD); por defecto hoy")
+        parser.add_argument('--limit', type=int, default=20, help="Diferencias a mostrar por agregado")
+
+    def handle(self, *args, **options):
+        end = options['end'] or date.today()
+        start = options['start'] or end - timedelta(days=30)
+
+        total = 0
+        for rollup in ROLLUPS:
+            mismatches = check_rollups(start, end, rollup)
+            total += len(mismatches)
+            for key, expected, actual in mismatches[:options['limit']]:
+                self.stdout.write(f"  {rollup} {key}: esperado {expected}, almacenado {actual}")
+            self.stdout.write(f"{rollup}: {len(mismatches)} diferencias")
+
+        if total:
+            raise CommandError(
+                f"{total} claves no coinciden; ejecute `rebuild_sales_rollups --start {start} --end {end}`"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Agregados consistentes de {start} a {end}."))
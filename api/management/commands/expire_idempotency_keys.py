@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from utils.idempotency import expire_idempotency_keys
+
+
+class Command(BaseCommand):
+    help = "Borra por lotes las claves de idempotencia vencidas (una vez o en bucle como proceso de fondo)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Claves por DELETE")
+        parser.add_argument('--interval', type=int, default=0, help="Segundos entre barridos; 0 ejecuta una sola vez")
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            deleted = expire_idempotency_keys(batch_size=options['batch_size'])
+            if deleted or not options['interval']:
+                self.stdout.write(f"{deleted} claves de idempotencia vencidas borradas.")
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,142 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.models.locations.models_locations import Address, Municipio
+from api.models.orders.models_orders import Order, OrderStatusHistory
+from api.models.products.models_products import Product
+
+BENCH_USERNAME_PREFIX = 'bench-explain-'
+BENCH_NUMBER_PREFIX = 'BX-'
+BENCH_SKU_PREFIX = 'BENCH-EXPLAIN-'
+
+
+def hot_queries(user_id, order_id, since):
+    """
+    (descripción, queryset, índice que el planificador debe usar, solo PostgreSQL).
+
+    SQLite no puede probar que `status IN (?, ?)` con parámetros implica
+    la condición de un índice parcial, así que esa verificación solo
+    aplica en PostgreSQL.
+    """
+    return [
+        ("órdenes del usuario, recientes primero",
+         Order.objects.filter(user_id=user_id).order_by('-created_at')[:20],
+         'idx_order_user_created', False),
+        ("órdenes pendientes/pagadas por fecha",
+         Order.objects.filter(status__in=['pending', 'paid'], created_at__gte=since).order_by('created_at')[:100],
+         'idx_order_open_created', True),
+        ("órdenes entregadas antes de una fecha",
+         Order.objects.filter(status='delivered', created_at__lt=since).order_by('created_at')[:100],
+         'idx_order_status_created', False),
+        ("productos activos, recientes primero",
+         Product.objects.filter(is_active=True).order_by('-created_at')[:20],
+         'idx_product_active_created', False),
+        ("dirección principal del usuario",
+         Address.objects.filter(user_id=user_id, es_principal=True),
+         'unique_principal_address_per_user', False),
+        ("historial de estados de una orden",
+         OrderStatusHistory.objects.filter(order_id=order_id).order_by('-changed_at'),
+         'idx_status_history_order_date', False),
+    ]
+
+
+class Command(BaseCommand):
+    help = "Siembra datos, ejecuta EXPLAIN sobre las consultas calientes y verifica que el planificador use los índices del plan"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=500)
+        parser.add_argument('--orders-per-user', type=int, default=100)
+        parser.add_argument('--products', type=int, default=20000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--verbose-plans', action='store_true', help="Mostrar el plan completo de cada consulta")
+        parser.add_argument('--keep', action='store_true', help="No borrar los datos sintéticos al terminar")
+
+    def handle(self, *args, **options):
+        user_id, order_id, since = self.seed(options)
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')  # estadísticas frescas tras la siembra
+            failures = []
+            for label, queryset, index, postgresql_only in hot_queries(user_id, order_id, since):
+                if postgresql_only and connection.vendor != 'postgresql':
+                    self.stdout.write(f"--  {label:<42} {index} (solo se verifica en PostgreSQL)")
+                    continue
+                plan = queryset.explain()
+                used = index in plan
+                self.stdout.write(f"{'OK ' if used else 'NO '} {label:<42} {index}")
+                if options['verbose_plans'] or not used:
+                    self.stdout.write('    ' + plan.replace('\n', '\n    '))
+                if not used:
+                    failures.append(index)
+            if failures:
+                raise CommandError(f"El planificador no usó: {', '.join(failures)}")
+            self.stdout.write(self.style.SUCCESS("Todas las consultas calientes usan su índice."))
+        finally:
+            if not options['keep']:
+                self.cleanup()
+
+    def seed(self, options):
+        municipio = Municipio.objects.order_by('codigo_dane').first()
+        if municipio is None:
+            raise CommandError("No hay municipios cargados; ejecute primero `load_dane`.")
+        rng = random.Random(42)
+        now = timezone.now()
+        batch_size = options['batch_size']
+        start = time.perf_counter()
+        with transaction.atomic():
+            User = get_user_model()
+            users = User.objects.bulk_create([
+                User(username=f"{BENCH_USERNAME_PREFIX}{i}", email=f"{BENCH_USERNAME_PREFIX}{i}@example.com")
+                for i in range(options['users'])
+            ])
+            addresses = Address.objects.bulk_create([
+                Address(user=user, municipio=municipio, tipo_via='CL', numero_via=str(n), es_principal=n == 0)
+                for user in users for n in range(3)
+            ], batch_size=batch_size)
+            principal = {address.user_id: address for address in addresses if address.es_principal}
+
+            # La mayoría de las órdenes ya se entregaron: las abiertas son pocas, como en producción
+            statuses = ['delivered'] * 90 + ['pending'] * 3 + ['paid'] * 2 + ['cancelled'] * 5
+            orders = []
+            number = 0
+            for user in users:
+                for _ in range(options['orders_per_user']):
+                    number += 1
+                    orders.append(Order(
+                        user=user, shipping_address=principal[user.pk], billing_address=principal[user.pk],
+                        order_number=f"{BENCH_NUMBER_PREFIX}{number:09d}", status=rng.choice(statuses),
+                        subtotal=Decimal('1000'), total=Decimal('1000'),
+                    ))
+            Order.objects.bulk_create(orders, batch_size=batch_size)
+            # `auto_now_add` ignora valores explícitos: repartir las fechas en el último año
+            for order in orders:
+                order.created_at = now - timedelta(minutes=rng.randint(0, 525600))
+            Order.objects.bulk_update(orders, ['created_at'], batch_size=batch_size)
+            OrderStatusHistory.objects.bulk_create([
+                OrderStatusHistory(order=order, old_status=None, new_status='pending', changed_by='seed')
+                for order in orders
+            ], batch_size=batch_size)
+
+            Product.objects.bulk_create([
+                Product(name=f"Producto explain {i}", sku=f"{BENCH_SKU_PREFIX}{i}", price=Decimal(1000 + i),
+                        is_active=rng.random() < 0.9)
+                for i in range(options['products'])
+            ], batch_size=batch_size)
+        self.stdout.write(
+            f"{len(users)} usuarios, {len(orders)} órdenes y {options['products']} productos "
+            f"sembrados en {time.perf_counter() - start:.1f}s"
+        )
+        return users[0].pk, orders[0].pk, now - timedelta(days=30)
+
+    def cleanup(self):
+        Order.objects.filter(order_number__startswith=BENCH_NUMBER_PREFIX).delete()
+        Address.objects.filter(user__username__startswith=BENCH_USERNAME_PREFIX).delete()
+        Product.objects.filter(sku__startswith=BENCH_SKU_PREFIX).delete()
+        get_user_model().objects.filter(username__startswith=BENCH_USERNAME_PREFIX).delete()
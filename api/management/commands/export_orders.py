@@ -0,0 +1,44 @@
+import resource
+import sys
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models.orders.models_orders import Order
+from api.services.orders.export import FORMATS, export_orders, export_querysets
+
+
+class Command(BaseCommand):
+    help = "Exporta órdenes, también las archivadas, con sus líneas y pagos en streaming (CSV o NDJSON, opcionalmente gzip)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Archivo de salida; '-' para la salida estándar")
+        parser.add_argument('--output', choices=list(FORMATS), default='csv')
+        parser.add_argument('--gzip', action='store_true', help="Comprimir al vuelo")
+        parser.add_argument('--start', type=date.fromisoformat, help="Creadas desde (AAAA-MM-DD)")
+        parser.add_argument('--end', type=date.fromisoformat, help="Creadas hasta (AAAA-MM-DD)")
+        parser.add_argument('--status', action='append', choices=Order.Status.values, help="Repetible")
+        parser.add_argument('--chunk-size', type=int, help="Órdenes por lectura del cursor y por lote de líneas")
+
+    def handle(self, *args, **options):
+        if options['start'] and options['end'] and options['start'] > options['end']:
+            raise CommandError("--start debe ser anterior o igual a --end")
+        querysets = export_querysets(options['start'], options['end'], options['status'])
+        chunks = export_orders(querysets, options['output'], options['gzip'], options['chunk_size'])
+
+        started = time.perf_counter()
+        written = 0
+        target = sys.stdout.buffer if options['path'] == '-' else open(options['path'], 'wb')
+        try:
+            for chunk in chunks:
+                target.write(chunk)
+                written += len(chunk)
+        finally:
+            if target is not sys.stdout.buffer:
+                target.close()
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB en Linux
+        self.stderr.write(self.style.SUCCESS(
+            f"{written / 1024 / 1024:.1f} MB en {time.perf_counter() - started:.1f}s; RSS máximo {peak:.0f} MB"
+        ))
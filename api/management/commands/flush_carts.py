@@ -0,0 +1,37 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from api.services.orders.cart_store import cache_is_shared, flush_dirty
+
+
+class Command(BaseCommand):
+    help = "Persiste por lotes los carritos con cambios en caché (una vez o en bucle como proceso de fondo)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Carritos por transacción")
+        parser.add_argument('--interval', type=int, default=0, help="Segundos entre barridos; 0 ejecuta una sola vez")
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not cache_is_shared():
+            raise CommandError(
+                "La caché de carritos es local a cada proceso: este comando no vería los carritos de los workers. "
+                "Configure CART_CACHE_BACKEND con una caché compartida."
+            )
+        while True:
+            close_old_connections()
+            report = flush_dirty(batch_size=options['batch_size'])
+            if report.carts or not options['interval']:
+                self.stdout.write(
+                    f"{report.carts} carritos persistidos: {report.created} líneas nuevas, {report.updated} "
+                    f"actualizadas, {report.deleted} borradas ({report.skipped} ocupados, al próximo barrido)."
+                )
+            if report.dropped:
+                self.stdout.write(f"{report.dropped} líneas descartadas: su producto o diseño ya no existe.")
+            if report.failed:
+                self.stderr.write(f"Carritos que no se pudieron guardar (siguen en caché): {report.failed}")
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
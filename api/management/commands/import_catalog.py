@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.services.products.catalog_import import import_catalog
+
+
+class Command(BaseCommand):
+    help = "Importa un catálogo de productos, variantes e imágenes desde CSV o JSONL"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Archivo .csv, .jsonl o .ndjson")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help="Por defecto se deduce de la extensión")
+        parser.add_argument('--chunk-size', type=int, default=2000, help="Filas por bloque")
+        parser.add_argument('--max-errors', type=int, default=50, help="Errores a mostrar")
+
+    def handle(self, *args, **options):
+        try:
+            report = import_catalog(options['path'], options['format'], options['chunk_size'])
+        except OSError as exc:
+            raise CommandError(f"No se pudo leer el archivo: {exc}")
+
+        for number, message in report.errors[:options['max_errors']]:
+            self.stderr.write(f"Fila {number}: {message}")
+        if report.error_count > options['max_errors']:
+            self.stderr.write(f"... y {report.error_count - options['max_errors']} errores más")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{report.rows} filas en {report.elapsed:.1f}s ({report.rows_per_second:.0f} filas/s): "
+            f"{report.products} productos, {report.variants} variantes, {report.images} imágenes, "
+            f"{report.assignments} asignaciones de categoría, {report.error_count} errores."
+        ))
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.services.locations.dane import load_dane
+
+
+class Command(BaseCommand):
+    help = "Carga departamentos, municipios y barrios del DANE de forma idempotente"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', help="Directorio con departamentos.csv, municipios.csv y barrios.csv")
+        parser.add_argument(
+            '--municipios',
+            help="Listado DIVIPOLA oficial del DANE (CSV); reemplaza la muestra de municipios.csv",
+        )
+        parser.add_argument('--force', action='store_true', help="Cargar aunque el checksum no haya cambiado")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            counts = load_dane(
+                options['path'], force=options['force'], batch_size=options['batch_size'],
+                municipios=options['municipios'],
+            )
+        except (OSError, KeyError, ValueError) as exc:
+            raise CommandError(f"Conjunto de datos inválido: {exc}")
+        elapsed = time.perf_counter() - start
+
+        if counts is None:
+            self.stdout.write("Sin cambios desde la última carga (mismo checksum).")
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"{counts['departamentos']} departamentos, {counts['municipios']} municipios y "
+            f"{counts['barrios']} barrios cargados en {elapsed:.2f}s."
+        ))
@@ -0,0 +1,53 @@
+import csv
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.models.orders.models_orders import Order, ShippingRate
+from api.services.orders.shipping import invalidate_rate_table
+
+
+class Command(BaseCommand):
+    help = (
+        "Reemplaza las tarifas de envío desde un CSV con columnas: destino (código DANE de "
+        "municipio o departamento, vacío = nacional), metodo, max_weight_grams, cost, extra_kg_cost, delivery_days"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Archivo .csv")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], newline='', encoding='utf-8-sig') as handle:
+                rates = [self.build(number, row) for number, row in enumerate(csv.DictReader(handle), start=2)]
+        except OSError as exc:
+            raise CommandError(f"No se pudo leer el archivo: {exc}")
+
+        with transaction.atomic():
+            deleted, _ = ShippingRate.objects.all().delete()
+            ShippingRate.objects.bulk_create(rates, batch_size=1000)
+            # bulk_create no emite señales
+            transaction.on_commit(invalidate_rate_table)
+        self.stdout.write(self.style.SUCCESS(f"{len(rates)} tarifas cargadas ({deleted} reemplazadas)."))
+
+    def build(self, number, row):
+        destino = (row.get('destino') or '').strip()
+        method = (row.get('metodo') or '').strip()
+        if len(destino) not in (0, 2, 5):
+            raise CommandError(f"Fila {number}: destino '{destino}' no es un código DANE.")
+        if method not in Order.ShippingMethod.values:
+            raise CommandError(f"Fila {number}: método de envío desconocido '{method}'.")
+        try:
+            return ShippingRate(
+                # Los municipios tienen cinco dígitos y los departamentos dos
+                municipio_id=destino if len(destino) == 5 else None,
+                departamento_id=destino if len(destino) == 2 else None,
+                shipping_method=method,
+                max_weight_grams=int(row['max_weight_grams']) if (row.get('max_weight_grams') or '').strip() else None,
+                cost=Decimal(row['cost']),
+                extra_kg_cost=Decimal((row.get('extra_kg_cost') or '').strip() or 0),
+                delivery_days=int(row['delivery_days']) if (row.get('delivery_days') or '').strip() else None,
+            )
+        except (KeyError, ValueError, InvalidOperation) as exc:
+            raise CommandError(f"Fila {number}: valor inválido ({exc}).")
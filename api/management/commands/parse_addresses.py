@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from api.models.locations.models_locations import Address
+from api.services.locations.address_parser import parse_stored_addresses
+
+
+class Command(BaseCommand):
+    help = "Desglosa Address.direccion_original en tipo de vía, número, placa y complementos"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Direcciones por bulk_update")
+        parser.add_argument('--pending', action='store_true', help="Solo direcciones sin número de vía")
+
+    def handle(self, *args, **options):
+        queryset = Address.objects.filter(numero_via='') if options['pending'] else None
+        report = parse_stored_addresses(queryset, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{report.rows} direcciones en {report.elapsed:.1f}s ({report.rows_per_second:.0f} filas/s): "
+            f"{report.parse_rate:.1%} analizadas ({report.parsed} completas, {report.partial} con texto sobrante), "
+            f"{report.failed} sin reconocer, {report.updated} actualizadas."
+        ))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.models.products.models_products import ProductCategory
+from api.services.products.category_tree import CategoryTree, invalidate_category_tree
+
+
+class Command(BaseCommand):
+    help = "Recalcula ProductCategory.path para todas las categorías"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            categories = list(ProductCategory.objects.select_for_update().order_by('pk'))
+            tree = CategoryTree([
+                {'id': c.pk, 'name': c.name, 'slug': c.slug, 'parent_id': c.parent_id, 'path': c.path}
+                for c in categories
+            ])
+            paths = {}
+            for root in tree.roots:
+                for pk in tree.descendants(root):
+                    parent_id = tree.nodes[pk]['parent_id']
+                    paths[pk] = f"{paths.get(parent_id, '/')}{pk}/"
+
+            changed = [c for c in categories if c.path != paths.get(c.pk, c.path)]
+            for category in changed:
+                category.path = paths[category.pk]
+            ProductCategory.objects.bulk_update(changed, ['path'], batch_size=500)
+
+        invalidate_category_tree()
+        self.stdout.write(self.style.SUCCESS(f"{len(changed)} rutas de categoría actualizadas."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api.models.products.models_products import ProductRatingSummary
+
+
+class Command(BaseCommand):
+    help = "Recalcula desde cero los resúmenes de calificaciones de productos"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Filas por upsert")
+
+    def handle(self, *args, **options):
+        total = ProductRatingSummary.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{total} resúmenes de calificación recalculados."))
@@ -0,0 +1,23 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.services.orders.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Reconstruye SalesDaily y SalesHourly para un rango de fechas con INSERT ... SELECT"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=date.fromisoformat, help="Primera fecha (AAAA-MM-DD); por defecto hace 30 días")
+        parser.add_argument('--end', type=date.fromisoformat, help="Última fecha (AAAA-MM-DD); por defecto hoy")
+
+    def handle(self, *args, **options):
+        end = options['end'] or date.today()
+        start = options['start'] or end - timedelta(days=30)
+        if start > end:
+            raise CommandError("--start debe ser anterior o igual a --end")
+        inserted = rebuild_rollups(start, end)
+        self.stdout.write(self.style.SUCCESS(
+            f"Agregados {start} a {end}: " + ", ".join(f"{rows} filas {rollup}" for rollup, rows in inserted.items())
+        ))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from api.models.products.models_products import Product
+from api.services.products.search import reset_search_index, update_search_vectors
+
+
+class Command(BaseCommand):
+    help = "Recalcula Product.search_vector (p. ej. tras cargas masivas con bulk_create)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10000, help="Productos por UPDATE")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        ids = Product.objects.order_by('pk').values_list('pk', flat=True)
+        updated = 0
+        last_pk = 0
+        while True:
+            batch = list(ids.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            updated += update_search_vectors(Product.objects.filter(pk__gte=batch[0], pk__lte=batch[-1]))
+            last_pk = batch[-1]
+
+        reset_search_index()
+        self.stdout.write(self.style.SUCCESS(f"{updated} productos reindexados."))
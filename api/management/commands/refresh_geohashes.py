@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api.services.locations.nearby import refresh_geohashes
+
+
+class Command(BaseCommand):
+    help = "Recalcula Address.geohash a partir de latitud y longitud"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Direcciones por bulk_update")
+
+    def handle(self, *args, **options):
+        changed = refresh_geohashes(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{changed} direcciones actualizadas."))
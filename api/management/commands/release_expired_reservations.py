@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from api.services.inventory.reservations import release_expired
+
+
+class Command(BaseCommand):
+    help = "Libera las reservas de stock vencidas (una vez o en bucle como proceso de fondo)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Reservas por transacción")
+        parser.add_argument('--interval', type=int, default=0, help="Segundos entre barridos; 0 ejecuta una sola vez")
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            released = release_expired(batch_size=options['batch_size'])
+            if released or not options['interval']:
+                self.stdout.write(f"{released} reservas vencidas liberadas.")
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,90 @@
+import multiprocessing
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+
+from api.models.orders.models_orders import OrderNumberCounter
+
+from api.services.orders.order_numbers import OrderNumberAllocator, is_valid_order_number
+
+BENCH_COUNTER = 'bench-order-numbers'
+
+
+def _worker(args):
+    """Proceso hijo: varios hilos comparten un asignador, como un worker de gunicorn con hilos"""
+    block_size, threads, per_thread = args
+    allocator = OrderNumberAllocator(BENCH_COUNTER, block_size)
+    numbers, timings = [], []
+    lock = threading.Lock()
+
+    def run():
+        local_numbers, local_timings = [], []
+        try:
+            for _ in range(per_thread):
+                while True:
+                    start = time.perf_counter()
+                    try:
+                        number = allocator.next_number()
+                    except OperationalError:
+                        continue  # SQLite: base bloqueada por otro escritor; PostgreSQL: deadlock o conflicto de serialización
+                    break
+                local_timings.append(time.perf_counter() - start)
+                local_numbers.append(number)
+        finally:
+            connections.close_all()
+        with lock:
+            numbers.extend(local_numbers)
+            timings.extend(local_timings)
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return numbers, timings, allocator.blocks_reserved
+
+
+class Command(BaseCommand):
+    help = "Prueba de concurrencia multiproceso del asignador de números de orden: cero colisiones y < 1 ms por número"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=8)
+        parser.add_argument('--threads', type=int, default=4, help="Hilos por proceso")
+        parser.add_argument('--numbers', type=int, default=2500, help="Números por hilo")
+        parser.add_argument('--block-size', type=int, default=100)
+
+    def handle(self, *args, **options):
+        # Los hijos no deben heredar la conexión abierta del padre
+        connections.close_all()
+        job = (options['block_size'], options['threads'], options['numbers'])
+        start = time.perf_counter()
+        try:
+            with multiprocessing.get_context('fork').Pool(options['processes']) as pool:
+                results = pool.map(_worker, [job] * options['processes'])
+        finally:
+            OrderNumberCounter.objects.filter(name=BENCH_COUNTER).delete()
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute(f'DROP SEQUENCE IF EXISTS "{OrderNumberAllocator(BENCH_COUNTER).sequence}"')
+        elapsed = time.perf_counter() - start
+
+        numbers = [number for result in results for number in result[0]]
+        timings = sorted(timing for result in results for timing in result[1])
+        blocks = sum(result[2] for result in results)
+        duplicates = len(numbers) - len(set(numbers))
+        invalid = sum(1 for number in numbers if not is_valid_order_number(number))
+        mean_ms = sum(timings) / len(timings) * 1000
+        p99_ms = timings[int(len(timings) * 0.99)] * 1000
+
+        self.stdout.write(
+            f"{len(numbers)} números en {elapsed:.2f}s desde {options['processes']} procesos x {options['threads']} hilos "
+            f"({blocks} bloques de {options['block_size']}): media {mean_ms:.3f} ms, p99 {p99_ms:.3f} ms, "
+            f"máx {timings[-1] * 1000:.1f} ms"
+        )
+        if duplicates or invalid:
+            raise CommandError(f"{duplicates} colisiones y {invalid} números con dígito verificador inválido.")
+        if mean_ms >= 1:
+            raise CommandError(f"Costo medio por asignación {mean_ms:.3f} ms (objetivo < 1 ms).")
+        self.stdout.write(self.style.SUCCESS("Cero colisiones y costo medio por debajo de 1 ms."))
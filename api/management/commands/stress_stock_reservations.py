@@ -0,0 +1,87 @@
+import random
+import threading
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+
+from api.models.inventory.models_inventory import StockReservation
+from api.models.products.models_products import Product, ProductVariant
+from api.services.inventory.reservations import InsufficientStock, reserve_stock
+
+BENCH_SKU_PREFIX = 'BENCH-STOCK-'
+
+
+class Command(BaseCommand):
+    help = "Prueba de estrés multihilo de reservas de stock: verifica que no haya sobreventa"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--attempts', type=int, default=200, help="Carritos por hilo")
+        parser.add_argument('--variants', type=int, default=5)
+        parser.add_argument('--stock', type=int, default=500, help="Stock inicial por variante")
+        parser.add_argument('--keep', action='store_true', help="No borrar los datos de prueba al terminar")
+
+    def handle(self, *args, **options):
+        product = Product.objects.create(name="Producto estrés", sku=f"{BENCH_SKU_PREFIX}{time.time_ns()}", price=Decimal('1000'))
+        variants = ProductVariant.objects.bulk_create([
+            ProductVariant(product=product, sku=f"{product.sku}-{i}", stock_quantity=options['stock'])
+            for i in range(options['variants'])
+        ])
+        variant_ids = [variant.pk for variant in variants]
+        stats = {'reserved': 0, 'rejected': 0, 'retried': 0}
+        lock = threading.Lock()
+
+        def worker(seed):
+            rng = random.Random(seed)
+            try:
+                for attempt in range(options['attempts']):
+                    lines = [(variant_id, rng.randint(1, 3)) for variant_id in rng.sample(variant_ids, rng.randint(1, 3))]
+                    while True:
+                        try:
+                            reserve_stock(lines, reference=f"stress-{seed}-{attempt}")
+                            outcome = 'reserved'
+                        except InsufficientStock:
+                            outcome = 'rejected'
+                        except OperationalError:
+                            # SQLite: base bloqueada por otro escritor; PostgreSQL: deadlock entre los UPDATE de
+                            # carritos que cruzan variantes. La transacción se revirtió completa: se reintenta
+                            with lock:
+                                stats['retried'] += 1
+                            continue
+                        break
+                    with lock:
+                        stats[outcome] += 1
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(options['threads'])]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        try:
+            final = dict(ProductVariant.objects.filter(pk__in=variant_ids).values_list('pk', 'stock_quantity'))
+            reserved = {variant_id: 0 for variant_id in variant_ids}
+            for variant_id, quantity in StockReservation.objects.filter(variant_id__in=variant_ids).values_list('variant_id', 'quantity'):
+                reserved[variant_id] += quantity
+
+            attempts = stats['reserved'] + stats['rejected']
+            self.stdout.write(
+                f"{attempts} carritos en {elapsed:.2f}s ({attempts / elapsed:.0f} reservas/s): "
+                f"{stats['reserved']} reservados, {stats['rejected']} rechazados, {stats['retried']} reintentos"
+            )
+            for variant_id in variant_ids:
+                self.stdout.write(
+                    f"  variante {variant_id}: stock final {final[variant_id]}, reservado {reserved[variant_id]}"
+                )
+                if final[variant_id] < 0 or final[variant_id] + reserved[variant_id] != options['stock']:
+                    raise CommandError(f"Sobreventa o stock inconsistente en la variante {variant_id}")
+            self.stdout.write(self.style.SUCCESS("Sin sobreventa: stock final + reservado = stock inicial en todas las variantes."))
+        finally:
+            if not options['keep']:
+                product.delete()
@@ -0,0 +1,814 @@
+# Generated by Django 5.2 on 2026-10-17 20:27
+
+import django.contrib.auth.models
+import django.contrib.auth.validators
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.core.validators
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Barrio',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=70)),
+                ('comuna', models.CharField(blank=True, max_length=2, null=True)),
+                ('estrato_promedio', models.PositiveSmallIntegerField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['nombre'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Departamento',
+            fields=[
+                ('codigo_dane', models.CharField(max_length=2, primary_key=True, serialize=False)),
+                ('nombre', models.CharField(max_length=50, unique=True)),
+                ('indicativo_telefonico', models.CharField(blank=True, max_length=3, null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'departamentos',
+                'ordering': ['nombre'],
+            },
+        ),
+        migrations.CreateModel(
+            name='OrderNumberCounter',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='Nombre')),
+                ('value', models.BigIntegerField(default=0, verbose_name='Último valor reservado')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización')),
+            ],
+            options={
+                'verbose_name': 'Contador de números de orden',
+                'verbose_name_plural': 'Contadores de números de orden',
+                'db_table': 'order_number_counters',
+            },
+        ),
+        migrations.CreateModel(
+            name='Product',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('brand', models.CharField(blank=True, max_length=50, null=True)),
+                ('sku', models.CharField(max_length=50, unique=True)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_customizable', models.BooleanField(default=False, help_text='Si acepta personalización')),
+                ('base_price', models.DecimalField(blank=True, decimal_places=2, help_text='Precio base sin personalización', max_digits=12, null=True)),
+                ('weight_grams', models.PositiveIntegerField(blank=True, help_text='Peso de envío en gramos', null=True)),
+                ('color_options', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=50), blank=True, help_text='Colores disponibles: JSON array', null=True, size=None)),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, help_text='name (A), brand (B), description (C); mantenido por api.services.products.search', null=True)),
+            ],
+            options={
+                'db_table': 'products',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReferenceDataset',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True)),
+                ('checksum', models.CharField(max_length=64)),
+                ('filas', models.PositiveIntegerField(default=0)),
+                ('cargado', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'conjuntos de datos de referencia',
+            },
+        ),
+        migrations.CreateModel(
+            name='User',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('password', models.CharField(max_length=128, verbose_name='password')),
+                ('last_login', models.DateTimeField(blank=True, null=True, verbose_name='last login')),
+                ('is_superuser', models.BooleanField(default=False, help_text='Designates that this user has all permissions without explicitly assigning them.', verbose_name='superuser status')),
+                ('username', models.CharField(error_messages={'unique': 'A user with that username already exists.'}, help_text='Required. 150 characters or fewer. Letters, digits and @/./+/-/_ only.', max_length=150, unique=True, validators=[django.contrib.auth.validators.UnicodeUsernameValidator()], verbose_name='username')),
+                ('first_name', models.CharField(blank=True, max_length=150, verbose_name='first name')),
+                ('last_name', models.CharField(blank=True, max_length=150, verbose_name='last name')),
+                ('email', models.EmailField(blank=True, max_length=254, verbose_name='email address')),
+                ('is_staff', models.BooleanField(default=False, help_text='Designates whether the user can log into this admin site.', verbose_name='staff status')),
+                ('date_joined', models.DateTimeField(default=django.utils.timezone.now, verbose_name='date joined')),
+                ('phone', models.CharField(blank=True, max_length=20, null=True)),
+                ('avatar_url', models.URLField(blank=True, null=True)),
+                ('email_verified', models.BooleanField(default=False)),
+                ('verification_token', models.CharField(blank=True, max_length=100, null=True)),
+                ('reset_password_token', models.CharField(blank=True, max_length=100, null=True)),
+                ('reset_token_expires', models.DateTimeField(blank=True, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('last_login_at', models.DateTimeField(blank=True, null=True)),
+                ('accepted_terms_at', models.DateTimeField(blank=True, null=True)),
+                ('marketing_opt_in', models.BooleanField(default=False)),
+                ('groups', models.ManyToManyField(blank=True, help_text='The groups this user belongs to. A user will get all permissions granted to each of their groups.', related_name='custom_user_set', related_query_name='user', to='auth.group', verbose_name='groups')),
+                ('user_permissions', models.ManyToManyField(blank=True, help_text='Specific permissions for this user.', related_name='custom_user_set', related_query_name='user', to='auth.permission', verbose_name='user permissions')),
+            ],
+            options={
+                'db_table': 'users',
+            },
+            managers=[
+                ('objects', django.contrib.auth.models.UserManager()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Address',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo_via', models.CharField(choices=[('AV', 'Avenida'), ('CL', 'Calle'), ('KR', 'Carrera'), ('DG', 'Diagonal'), ('TV', 'Transversal')], max_length=3, verbose_name='Tipo de vía')),
+                ('numero_via', models.CharField(max_length=10, verbose_name='Número')),
+                ('letra_via', models.CharField(blank=True, max_length=1, null=True, verbose_name='Letra')),
+                ('bis', models.BooleanField(default=False, verbose_name='Tiene bis?')),
+                ('sector', models.CharField(blank=True, choices=[('NORTE', 'Norte'), ('SUR', 'Sur'), ('ESTE', 'Este'), ('OESTE', 'Oeste')], max_length=5, null=True, verbose_name='Sector')),
+                ('placa', models.CharField(blank=True, help_text="Número de placa, p. ej. '45-12'", max_length=12, null=True, verbose_name='Placa')),
+                ('complemento', models.JSONField(blank=True, help_text="Estructura: [{'tipo': 'AP', 'valor': '101'}, ...]", null=True, verbose_name='Complementos')),
+                ('direccion_original', models.CharField(blank=True, default='', max_length=255, verbose_name='Dirección original')),
+                ('codigo_postal', models.CharField(blank=True, max_length=6, null=True, verbose_name='Código Postal')),
+                ('estrato', models.PositiveSmallIntegerField(blank=True, choices=[(1, '1'), (2, '2'), (3, '3'), (4, '4'), (5, '5'), (6, '6')], null=True, verbose_name='Estrato')),
+                ('latitud', models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True)),
+                ('longitud', models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True)),
+                ('precision_geoloc', models.CharField(blank=True, max_length=10, null=True, verbose_name='Precisión')),
+                ('fuente_geoloc', models.CharField(blank=True, choices=[('DAPM', 'Datos Oficiales'), ('GOOGLE', 'Google Maps'), ('MANUAL', 'Manual')], max_length=20, null=True, verbose_name='Fuente')),
+                ('geohash', models.CharField(blank=True, editable=False, max_length=12, null=True, verbose_name='Geohash')),
+                ('verificada', models.BooleanField(default=False, verbose_name='Verificada')),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('VERIFICADO', 'Verificado'), ('INVALIDO', 'Inválido')], default='PENDIENTE', max_length=20, verbose_name='Estado')),
+                ('es_principal', models.BooleanField(default=False, verbose_name='Principal')),
+                ('creado', models.DateTimeField(auto_now_add=True, verbose_name='Creado')),
+                ('actualizado', models.DateTimeField(auto_now=True, verbose_name='Actualizado')),
+                ('direccion_formateada', models.CharField(blank=True, default='', editable=False, max_length=255, verbose_name='Dirección formateada')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='direcciones', to=settings.AUTH_USER_MODEL)),
+                ('barrio', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='api.barrio')),
+            ],
+            options={
+                'verbose_name': 'Dirección',
+                'verbose_name_plural': 'Direcciones',
+                'ordering': ['-es_principal', 'municipio__nombre', 'barrio__nombre'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_number', models.CharField(max_length=20, unique=True, verbose_name='Número de orden')),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('paid', 'Pagado'), ('processing', 'Procesando'), ('shipped', 'Enviado'), ('delivered', 'Entregado'), ('cancelled', 'Cancelado'), ('refunded', 'Reembolsado')], default='pending', max_length=20, verbose_name='Estado')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización')),
+                ('paid_at', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de pago')),
+                ('cancelled_at', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de cancelación')),
+                ('delivered_at', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de entrega')),
+                ('subtotal', models.DecimalField(decimal_places=2, max_digits=12, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Subtotal')),
+                ('tax_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Impuestos')),
+                ('shipping_cost', models.DecimalField(decimal_places=2, default=0, max_digits=12, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Costo de envío')),
+                ('discount_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Descuento')),
+                ('total', models.DecimalField(decimal_places=2, max_digits=12, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Total')),
+                ('payment_method', models.CharField(blank=True, choices=[('credit_card', 'Tarjeta de crédito'), ('paypal', 'PayPal'), ('bank_transfer', 'Transferencia bancaria'), ('cash', 'Efectivo'), ('nequi', 'Nequi'), ('daviplata', 'Daviplata')], max_length=30, null=True, verbose_name='Método de pago')),
+                ('shipping_method', models.CharField(blank=True, choices=[('standard', 'Estándar'), ('express', 'Express'), ('pickup', 'Recoger en tienda')], max_length=30, null=True, verbose_name='Método de envío')),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True, verbose_name='Dirección IP')),
+                ('user_agent', models.TextField(blank=True, null=True, verbose_name='Agente de usuario')),
+                ('notes', models.TextField(blank=True, null=True, verbose_name='Notas')),
+                ('internal_notes', models.TextField(blank=True, null=True, verbose_name='Notas internas')),
+                ('billing_address', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='api.address', verbose_name='Dirección de facturación')),
+                ('shipping_address', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='api.address', verbose_name='Dirección de envío')),
+                ('user', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Pedido (archivo)',
+                'verbose_name_plural': 'Pedidos (archivo)',
+                'db_table': 'orders_archive',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedOrderPayment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('payment_method', models.CharField(max_length=30)),
+                ('transaction_id', models.CharField(blank=True, max_length=100, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('completed', 'Completado'), ('failed', 'Fallido'), ('refunded', 'Reembolsado')], default='pending', max_length=20)),
+                ('payment_date', models.DateTimeField(auto_now_add=True)),
+                ('gateway_response', models.JSONField(blank=True, help_text='Respuesta cruda del pasarela', null=True)),
+                ('order', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='payments', to='api.archivedorder', verbose_name='order')),
+            ],
+            options={
+                'verbose_name': 'order payment (archivo)',
+                'verbose_name_plural': 'order payments (archivo)',
+                'db_table': 'order_payments_archive',
+                'ordering': [],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedOrderStatusHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('old_status', models.CharField(blank=True, max_length=20, null=True, verbose_name='Estado anterior')),
+                ('new_status', models.CharField(max_length=20, verbose_name='Nuevo estado')),
+                ('changed_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de cambio')),
+                ('changed_by', models.CharField(max_length=50, verbose_name='Cambiado por')),
+                ('notes', models.TextField(blank=True, null=True, verbose_name='Notas')),
+                ('order', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='status_history', to='api.archivedorder', verbose_name='Pedido')),
+            ],
+            options={
+                'verbose_name': 'Historial de estado de pedido (archivo)',
+                'verbose_name_plural': 'Historiales de estados de pedidos (archivo)',
+                'db_table': 'order_status_history_archive',
+                'ordering': ['-changed_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedPayment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('paypal_id', models.CharField(max_length=50)),
+                ('status', models.CharField(choices=[('created', 'Creado'), ('approved', 'Aprobado'), ('pending', 'Pendiente'), ('rejected', 'Rechazado'), ('refunded', 'Reembolsado')], default='created', max_length=20)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('order', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='paypal_payments', to='api.archivedorder', verbose_name='order')),
+            ],
+            options={
+                'verbose_name': 'payment (archivo)',
+                'verbose_name_plural': 'payments (archivo)',
+                'db_table': 'payments_archive',
+                'ordering': [],
+            },
+        ),
+        migrations.CreateModel(
+            name='CustomDesign',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('design_image_url', models.URLField()),
+                ('thumbnail_url', models.URLField(blank=True, null=True)),
+                ('colors', models.CharField(blank=True, help_text='Colores usados en el diseño', max_length=100, null=True)),
+                ('design_parameters', models.JSONField(help_text='Configuración del editor')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='designs', to=settings.AUTH_USER_MODEL)),
+                ('base_product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='custom_designs', to='api.product')),
+            ],
+            options={
+                'db_table': 'custom_designs',
+            },
+        ),
+        migrations.CreateModel(
+            name='Direccion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo_via', models.CharField(choices=[('AV', 'Avenida'), ('CL', 'Calle'), ('KR', 'Carrera'), ('DG', 'Diagonal')], max_length=3)),
+                ('numero_via', models.CharField(max_length=10)),
+                ('complemento_tipo', models.CharField(blank=True, choices=[('AP', 'Apartamento'), ('BLQ', 'Bloque'), ('ED', 'Edificio')], max_length=3, null=True)),
+                ('complemento_valor', models.CharField(blank=True, max_length=10, null=True)),
+                ('latitud', models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True)),
+                ('longitud', models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True)),
+                ('es_principal', models.BooleanField(default=False)),
+                ('creado', models.DateTimeField(auto_now_add=True)),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+                ('barrio', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='api.barrio')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='direcciones_barrio', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'direcciones',
+            },
+        ),
+        migrations.CreateModel(
+            name='IdempotencyKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=64, unique=True, verbose_name='Huella (usuario, método, ruta y clave)')),
+                ('request_hash', models.CharField(max_length=64, verbose_name='Hash del cuerpo de la petición')),
+                ('status_code', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Código HTTP')),
+                ('content_type', models.CharField(blank=True, default='', max_length=100, verbose_name='Content-Type')),
+                ('body', models.BinaryField(blank=True, null=True, verbose_name='Cuerpo de la respuesta')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('expires_at', models.DateTimeField(verbose_name='Fecha de vencimiento')),
+                ('heartbeat_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Último latido de la petición en curso')),
+            ],
+            options={
+                'verbose_name': 'Clave de idempotencia',
+                'verbose_name_plural': 'Claves de idempotencia',
+                'db_table': 'idempotency_keys',
+                'indexes': [models.Index(fields=['expires_at'], name='idx_idempotency_expires')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Municipio',
+            fields=[
+                ('codigo_dane', models.CharField(max_length=5, primary_key=True, serialize=False)),
+                ('nombre', models.CharField(max_length=60)),
+                ('tipo', models.CharField(choices=[('MUNICIPIO', 'Municipio'), ('DISTRITO', 'Distrito')], default='MUNICIPIO', max_length=10)),
+                ('categoria', models.CharField(blank=True, choices=[('A', 'Categoría A'), ('B', 'Categoría B'), ('C', 'Categoría C')], max_length=1, null=True)),
+                ('departamento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='municipios', to='api.departamento')),
+            ],
+            options={
+                'ordering': ['nombre'],
+            },
+        ),
+        migrations.AddField(
+            model_name='barrio',
+            name='municipio',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='barrios', to='api.municipio'),
+        ),
+        migrations.AddField(
+            model_name='address',
+            name='municipio',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='api.municipio'),
+        ),
+        migrations.CreateModel(
+            name='Order',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_number', models.CharField(max_length=20, unique=True, verbose_name='Número de orden')),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('paid', 'Pagado'), ('processing', 'Procesando'), ('shipped', 'Enviado'), ('delivered', 'Entregado'), ('cancelled', 'Cancelado'), ('refunded', 'Reembolsado')], default='pending', max_length=20, verbose_name='Estado')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización')),
+                ('paid_at', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de pago')),
+                ('cancelled_at', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de cancelación')),
+                ('delivered_at', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de entrega')),
+                ('subtotal', models.DecimalField(decimal_places=2, max_digits=12, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Subtotal')),
+                ('tax_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Impuestos')),
+                ('shipping_cost', models.DecimalField(decimal_places=2, default=0, max_digits=12, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Costo de envío')),
+                ('discount_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Descuento')),
+                ('total', models.DecimalField(decimal_places=2, max_digits=12, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Total')),
+                ('payment_method', models.CharField(blank=True, choices=[('credit_card', 'Tarjeta de crédito'), ('paypal', 'PayPal'), ('bank_transfer', 'Transferencia bancaria'), ('cash', 'Efectivo'), ('nequi', 'Nequi'), ('daviplata', 'Daviplata')], max_length=30, null=True, verbose_name='Método de pago')),
+                ('shipping_method', models.CharField(blank=True, choices=[('standard', 'Estándar'), ('express', 'Express'), ('pickup', 'Recoger en tienda')], max_length=30, null=True, verbose_name='Método de envío')),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True, verbose_name='Dirección IP')),
+                ('user_agent', models.TextField(blank=True, null=True, verbose_name='Agente de usuario')),
+                ('notes', models.TextField(blank=True, null=True, verbose_name='Notas')),
+                ('internal_notes', models.TextField(blank=True, null=True, verbose_name='Notas internas')),
+                ('billing_address', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='billing_orders', to='api.address', verbose_name='Dirección de facturación')),
+                ('shipping_address', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='shipping_orders', to='api.address', verbose_name='Dirección de envío')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='orders', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Pedido',
+                'verbose_name_plural': 'Pedidos',
+                'db_table': 'orders',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='OrderPayment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('payment_method', models.CharField(max_length=30)),
+                ('transaction_id', models.CharField(blank=True, max_length=100, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('completed', 'Completado'), ('failed', 'Fallido'), ('refunded', 'Reembolsado')], default='pending', max_length=20)),
+                ('payment_date', models.DateTimeField(auto_now_add=True)),
+                ('gateway_response', models.JSONField(blank=True, help_text='Respuesta cruda del pasarela', null=True)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payments', to='api.order')),
+            ],
+            options={
+                'db_table': 'order_payments',
+            },
+        ),
+        migrations.CreateModel(
+            name='OrderStatusHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('old_status', models.CharField(blank=True, max_length=20, null=True, verbose_name='Estado anterior')),
+                ('new_status', models.CharField(max_length=20, verbose_name='Nuevo estado')),
+                ('changed_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de cambio')),
+                ('changed_by', models.CharField(max_length=50, verbose_name='Cambiado por')),
+                ('notes', models.TextField(blank=True, null=True, verbose_name='Notas')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_history', to='api.order', verbose_name='Pedido')),
+            ],
+            options={
+                'verbose_name': 'Historial de estado de pedido',
+                'verbose_name_plural': 'Historiales de estados de pedidos',
+                'db_table': 'order_status_history',
+                'ordering': ['-changed_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Payment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('paypal_id', models.CharField(max_length=50)),
+                ('status', models.CharField(choices=[('created', 'Creado'), ('approved', 'Aprobado'), ('pending', 'Pendiente'), ('rejected', 'Rechazado'), ('refunded', 'Reembolsado')], default='created', max_length=20)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='paypal_payments', to='api.order')),
+            ],
+            options={
+                'db_table': 'payments',
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductRatingSummary',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating_summary', serialize=False, to='api.product')),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+                ('average_rating', models.DecimalField(decimal_places=2, default=0, max_digits=3)),
+                ('stars_1', models.PositiveIntegerField(default=0)),
+                ('stars_2', models.PositiveIntegerField(default=0)),
+                ('stars_3', models.PositiveIntegerField(default=0)),
+                ('stars_4', models.PositiveIntegerField(default=0)),
+                ('stars_5', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'product_rating_summaries',
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductCategory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('slug', models.SlugField(unique=True)),
+                ('path', models.CharField(blank=True, default='', editable=False, help_text='Ruta materializada de ids: /1/5/12/', max_length=255)),
+                ('parent', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='children', to='api.productcategory')),
+            ],
+            options={
+                'verbose_name_plural': 'product categories',
+                'db_table': 'product_categories',
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductCategoryAssignment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.productcategory')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.product')),
+            ],
+            options={
+                'db_table': 'product_category_assignments',
+            },
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='categories',
+            field=models.ManyToManyField(through='api.ProductCategoryAssignment', to='api.productcategory'),
+        ),
+        migrations.CreateModel(
+            name='ProductImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField()),
+                ('alt_text', models.CharField(blank=True, max_length=100, null=True)),
+                ('is_main', models.BooleanField(default=False)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='images', to='api.product')),
+            ],
+            options={
+                'db_table': 'product_images',
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductReview',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.IntegerField(choices=[(1, '1 Estrella'), (2, '2 Estrellas'), (3, '3 Estrellas'), (4, '4 Estrellas'), (5, '5 Estrellas')])),
+                ('comment', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='api.product')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'product_reviews',
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductVariant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sku', models.CharField(max_length=50, unique=True)),
+                ('description', models.CharField(blank=True, max_length=100, null=True)),
+                ('price_override', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('stock_quantity', models.IntegerField(default=0)),
+                ('is_active', models.BooleanField(default=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='variants', to='api.product')),
+            ],
+            options={
+                'db_table': 'product_variants',
+            },
+        ),
+        migrations.CreateModel(
+            name='OrderItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_name', models.CharField(max_length=100, verbose_name='Nombre del producto')),
+                ('variant_description', models.CharField(blank=True, max_length=100, null=True, verbose_name='Descripción de la variante')),
+                ('unit_price', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Precio unitario')),
+                ('quantity', models.PositiveIntegerField(verbose_name='Cantidad')),
+                ('design_preview_url', models.URLField(blank=True, null=True, verbose_name='URL de vista previa del diseño')),
+                ('subtotal', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Subtotal')),
+                ('custom_design', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='api.customdesign', verbose_name='Diseño personalizado')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='api.order', verbose_name='Pedido')),
+                ('original_product', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='replaced_in_orders', to='api.product', verbose_name='Producto original')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='api.product', verbose_name='Producto')),
+                ('variant', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='api.productvariant', verbose_name='Variante')),
+            ],
+            options={
+                'verbose_name': 'Ítem de pedido',
+                'verbose_name_plural': 'Ítems de pedido',
+                'db_table': 'order_items',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedOrderItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_name', models.CharField(max_length=100, verbose_name='Nombre del producto')),
+                ('variant_description', models.CharField(blank=True, max_length=100, null=True, verbose_name='Descripción de la variante')),
+                ('unit_price', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Precio unitario')),
+                ('quantity', models.PositiveIntegerField(verbose_name='Cantidad')),
+                ('design_preview_url', models.URLField(blank=True, null=True, verbose_name='URL de vista previa del diseño')),
+                ('subtotal', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Subtotal')),
+                ('order', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='items', to='api.archivedorder', verbose_name='Pedido')),
+                ('custom_design', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='api.customdesign', verbose_name='Diseño personalizado')),
+                ('original_product', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='api.product', verbose_name='Producto original')),
+                ('product', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='api.product', verbose_name='Producto')),
+                ('variant', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='api.productvariant', verbose_name='Variante')),
+            ],
+            options={
+                'verbose_name': 'Ítem de pedido (archivo)',
+                'verbose_name_plural': 'Ítems de pedido (archivo)',
+                'db_table': 'order_items_archive',
+                'ordering': [],
+            },
+        ),
+        migrations.CreateModel(
+            name='SalesDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('payment_method', models.CharField(blank=True, default='', max_length=30, verbose_name='Método de pago')),
+                ('orders', models.IntegerField(default=0, verbose_name='Órdenes')),
+                ('units', models.IntegerField(default=0, verbose_name='Unidades')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Ingresos')),
+                ('refunds', models.IntegerField(default=0, verbose_name='Órdenes revertidas')),
+                ('refunded_units', models.IntegerField(default=0, verbose_name='Unidades revertidas')),
+                ('refunded_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Monto revertido')),
+                ('date', models.DateField(verbose_name='Fecha')),
+                ('municipio', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.municipio', verbose_name='Municipio de envío')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.product', verbose_name='Producto')),
+            ],
+            options={
+                'verbose_name': 'Ventas diarias',
+                'verbose_name_plural': 'Ventas diarias',
+                'db_table': 'sales_daily',
+            },
+        ),
+        migrations.CreateModel(
+            name='SalesHourly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('payment_method', models.CharField(blank=True, default='', max_length=30, verbose_name='Método de pago')),
+                ('orders', models.IntegerField(default=0, verbose_name='Órdenes')),
+                ('units', models.IntegerField(default=0, verbose_name='Unidades')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Ingresos')),
+                ('refunds', models.IntegerField(default=0, verbose_name='Órdenes revertidas')),
+                ('refunded_units', models.IntegerField(default=0, verbose_name='Unidades revertidas')),
+                ('refunded_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Monto revertido')),
+                ('hour', models.DateTimeField(verbose_name='Hora')),
+                ('municipio', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.municipio', verbose_name='Municipio de envío')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.product', verbose_name='Producto')),
+            ],
+            options={
+                'verbose_name': 'Ventas por hora',
+                'verbose_name_plural': 'Ventas por hora',
+                'db_table': 'sales_hourly',
+            },
+        ),
+        migrations.CreateModel(
+            name='ShippingRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shipping_method', models.CharField(choices=[('standard', 'Estándar'), ('express', 'Express'), ('pickup', 'Recoger en tienda')], max_length=30, verbose_name='Método de envío')),
+                ('max_weight_grams', models.PositiveIntegerField(blank=True, null=True, verbose_name='Peso máximo (g)')),
+                ('cost', models.DecimalField(decimal_places=2, max_digits=12, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Costo')),
+                ('extra_kg_cost', models.DecimalField(decimal_places=2, default=0, max_digits=12, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Costo por kilo adicional')),
+                ('delivery_days', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Días de entrega')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Activa')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización')),
+                ('departamento', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='shipping_rates', to='api.departamento', verbose_name='Departamento')),
+                ('municipio', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='shipping_rates', to='api.municipio', verbose_name='Municipio')),
+            ],
+            options={
+                'verbose_name': 'Tarifa de envío',
+                'verbose_name_plural': 'Tarifas de envío',
+                'db_table': 'shipping_rates',
+            },
+        ),
+        migrations.CreateModel(
+            name='ShoppingCart',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session_id', models.CharField(blank=True, max_length=100, null=True, verbose_name='ID de sesión')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='carts', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Carrito de compras',
+                'verbose_name_plural': 'Carritos de compras',
+                'db_table': 'shopping_carts',
+            },
+        ),
+        migrations.CreateModel(
+            name='CartItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField(default=1, verbose_name='Cantidad')),
+                ('price', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Precio')),
+                ('added_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de agregado')),
+                ('custom_design', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='api.customdesign', verbose_name='Diseño personalizado')),
+                ('product', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='api.product', verbose_name='Producto')),
+                ('cart', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='api.shoppingcart', verbose_name='Carrito')),
+            ],
+            options={
+                'verbose_name': 'Ítem de carrito',
+                'verbose_name_plural': 'Ítems de carrito',
+                'db_table': 'cart_items',
+            },
+        ),
+        migrations.CreateModel(
+            name='StockReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField(verbose_name='Cantidad')),
+                ('reference', models.CharField(help_text='Carrito, sesión u orden que retiene el stock', max_length=100, verbose_name='Referencia')),
+                ('status', models.CharField(choices=[('active', 'Activa'), ('committed', 'Confirmada'), ('released', 'Liberada')], default='active', max_length=20, verbose_name='Estado')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('expires_at', models.DateTimeField(verbose_name='Fecha de expiración')),
+                ('variant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='api.productvariant', verbose_name='Variante')),
+            ],
+            options={
+                'verbose_name': 'Reserva de stock',
+                'verbose_name_plural': 'Reservas de stock',
+                'db_table': 'stock_reservations',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['email'], name='idx_email'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['is_active'], name='idx_active_users'),
+        ),
+        migrations.AddIndex(
+            model_name='direccion',
+            index=models.Index(fields=['user', 'es_principal'], name='api_direcci_user_id_d41edf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='direccion',
+            index=models.Index(fields=['barrio'], name='api_direcci_barrio__16aac7_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='municipio',
+            unique_together={('departamento', 'nombre')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='barrio',
+            unique_together={('municipio', 'nombre')},
+        ),
+        migrations.AddIndex(
+            model_name='address',
+            index=models.Index(fields=['municipio', 'barrio'], name='api_address_municip_cb1962_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='address',
+            index=models.Index(fields=['codigo_postal'], name='api_address_codigo__7d8579_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='address',
+            index=models.Index(fields=['geohash'], name='idx_address_geohash', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddConstraint(
+            model_name='address',
+            constraint=models.UniqueConstraint(condition=models.Q(('es_principal', True)), fields=('user',), name='unique_principal_address_per_user'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['user', '-created_at'], include=('status', 'total'), name='idx_order_user_created'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', 'created_at'], name='idx_order_status_created'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'paid'])), fields=['created_at'], include=('status', 'user'), name='idx_order_open_created'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['created_at'], name='idx_order_created_at'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['payment_method'], name='idx_order_payment_method'),
+        ),
+        migrations.AddIndex(
+            model_name='orderpayment',
+            index=models.Index(fields=['order'], name='order_payme_order_i_a62659_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderpayment',
+            index=models.Index(fields=['transaction_id'], name='order_payme_transac_b67c8b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderstatushistory',
+            index=models.Index(fields=['order', '-changed_at'], name='idx_status_history_order_date'),
+        ),
+        migrations.AddIndex(
+            model_name='orderstatushistory',
+            index=models.Index(fields=['changed_at'], name='idx_status_history_changed_at'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['order'], name='payments_order_i_b32b33_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['paypal_id'], name='payments_paypal__3502a1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productratingsummary',
+            index=models.Index(fields=['-average_rating', '-review_count'], name='idx_rating_summary_average'),
+        ),
+        migrations.AddIndex(
+            model_name='customdesign',
+            index=models.Index(fields=['user'], name='custom_desi_user_id_6f2e0c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customdesign',
+            index=models.Index(fields=['base_product'], name='custom_desi_base_pr_ef0311_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productcategory',
+            index=models.Index(fields=['path'], name='idx_category_path', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AlterUniqueTogether(
+            name='productcategoryassignment',
+            unique_together={('product', 'category')},
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='idx_product_search_vector'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at'], include=('price',), name='idx_product_active_created'),
+        ),
+        migrations.AddIndex(
+            model_name='orderitem',
+            index=models.Index(fields=['order'], name='idx_order_item_order'),
+        ),
+        migrations.AddIndex(
+            model_name='orderitem',
+            index=models.Index(fields=['product'], name='idx_order_item_product'),
+        ),
+        migrations.AddConstraint(
+            model_name='salesdaily',
+            constraint=models.UniqueConstraint(fields=('date', 'product', 'payment_method', 'municipio'), name='unique_sales_daily_key'),
+        ),
+        migrations.AddConstraint(
+            model_name='saleshourly',
+            constraint=models.UniqueConstraint(fields=('hour', 'product', 'payment_method', 'municipio'), name='unique_sales_hourly_key'),
+        ),
+        migrations.AddConstraint(
+            model_name='shippingrate',
+            constraint=models.UniqueConstraint(fields=('municipio', 'departamento', 'shipping_method', 'max_weight_grams'), name='unique_shipping_rate_bracket'),
+        ),
+        migrations.AddIndex(
+            model_name='shoppingcart',
+            index=models.Index(fields=['user'], name='idx_cart_user'),
+        ),
+        migrations.AddIndex(
+            model_name='shoppingcart',
+            index=models.Index(fields=['session_id'], name='idx_cart_session'),
+        ),
+        migrations.AddIndex(
+            model_name='cartitem',
+            index=models.Index(fields=['cart'], name='idx_cart_item_cart'),
+        ),
+        migrations.AddConstraint(
+            model_name='cartitem',
+            constraint=models.CheckConstraint(condition=models.Q(('product__isnull', False), ('custom_design__isnull', False), _connector='OR'), name='product_or_design_required'),
+        ),
+        migrations.AddIndex(
+            model_name='stockreservation',
+            index=models.Index(fields=['reference', 'status'], name='idx_reservation_reference'),
+        ),
+        migrations.AddIndex(
+            model_name='stockreservation',
+            index=models.Index(fields=['status', 'expires_at'], name='idx_reservation_expiry'),
+        ),
+    ]
@@ -0,0 +1,15 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # `pg_trgm` es confiable desde PostgreSQL 13: basta con ser dueño de la base. En otros
+    # motores la operación no hace nada
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+    ]
@@ -0,0 +1,17 @@
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # `gin_trgm_ops` necesita la extensión de 0002_pg_trgm
+
+    dependencies = [
+        ('api', '0002_pg_trgm'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='idx_product_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
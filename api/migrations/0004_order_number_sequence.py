@@ -0,0 +1,27 @@
+from django.db import migrations
+
+# `OrderNumberAllocator('orders')`; ver api.services.orders.order_numbers
+SEQUENCE = 'orders_number_seq'
+
+
+def create_sequence(apps, schema_editor):
+    # Creada y confirmada aquí, no en la primera orden: dentro de la transacción del checkout un
+    # rollback la borraría mientras el proceso conserva su bloque, y el siguiente empezaría desde 1
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'CREATE SEQUENCE IF NOT EXISTS "{SEQUENCE}"')
+
+
+def drop_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP SEQUENCE IF EXISTS "{SEQUENCE}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_product_name_trgm'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_sequence, drop_sequence),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-17 20:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_order_number_sequence'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='shippingrate',
+            name='unique_shipping_rate_bracket',
+        ),
+        migrations.AddConstraint(
+            model_name='shippingrate',
+            constraint=models.UniqueConstraint(fields=('municipio', 'departamento', 'shipping_method', 'max_weight_grams'), name='unique_shipping_rate_bracket', nulls_distinct=False),
+        ),
+    ]
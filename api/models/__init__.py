@@ -0,0 +1,9 @@
+# Django solo registra los modelos importados desde `api.models`; `api.User` debe existir antes de
+# que `django.contrib.auth` resuelva AUTH_USER_MODEL
+from .users.models_users import *  # noqa: F401,F403
+from .products.models_products import *  # noqa: F401,F403
+from .editor.models_editor import *  # noqa: F401,F403
+from .inventory.models_inventory import *  # noqa: F401,F403
+from .locations.models_locations import *  # noqa: F401,F403
+from .orders.models_orders import *  # noqa: F401,F403
+from .payments.models_payments import *  # noqa: F401,F403
@@ -0,0 +1,49 @@
+from django.db import models
+from api.models.products.models_products import ProductVariant
+
+
+class StockReservation(models.Model):
+    class Status(models.TextChoices):
+        ACTIVE = 'active', 'Activa'
+        COMMITTED = 'committed', 'Confirmada'
+        RELEASED = 'released', 'Liberada'
+
+    variant = models.ForeignKey(
+        ProductVariant,
+        on_delete=models.CASCADE,
+        related_name='reservations',
+        verbose_name='Variante'
+    )
+    quantity = models.PositiveIntegerField(
+        verbose_name='Cantidad'
+    )
+    reference = models.CharField(
+        max_length=100,
+        verbose_name='Referencia',
+        help_text="Carrito, sesión u orden que retiene el stock"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.ACTIVE,
+        verbose_name='Estado'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Fecha de creación'
+    )
+    expires_at = models.DateTimeField(
+        verbose_name='Fecha de expiración'
+    )
+
+    class Meta:
+        db_table = 'stock_reservations'
+        verbose_name = 'Reserva de stock'
+        verbose_name_plural = 'Reservas de stock'
+        indexes = [
+            models.Index(fields=['reference', 'status'], name='idx_reservation_reference'),
+            models.Index(fields=['status', 'expires_at'], name='idx_reservation_expiry'),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity}x variante {self.variant_id} para {self.reference} ({self.status})"
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 
 class Departamento(models.Model):
@@ -52,6 +53,19 @@ class Barrio(models.Model):
     def __str__(self):
         return f"{self.nombre}, {self.municipio}"
 
+class ReferenceDataset(models.Model):
+    """Checksum del último conjunto de datos de referencia cargado (p. ej. DANE)"""
+    nombre = models.CharField(max_length=50, unique=True)
+    checksum = models.CharField(max_length=64)
+    filas = models.PositiveIntegerField(default=0)
+    cargado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'conjuntos de datos de referencia'
+
+    def __str__(self):
+        return f"{self.nombre} ({self.checksum[:12]})"
+
 class Direccion(models.Model):
     TIPO_VIA_CHOICES = [
         ('AV', 'Avenida'),
@@ -66,7 +80,7 @@ class Direccion(models.Model):
         ('ED', 'Edificio'),
     ]
     
-    user = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name='direcciones')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='direcciones_barrio')
     barrio = models.ForeignKey(Barrio, on_delete=models.PROTECT)
     
     # Dirección básica
@@ -142,7 +156,7 @@ class Address(models.Model):
     ]
 
     # Relaciones (jerarquía geográfica)
-    user = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name='direcciones')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='direcciones')
     municipio = models.ForeignKey('Municipio', on_delete=models.PROTECT)
     barrio = models.ForeignKey('Barrio', on_delete=models.SET_NULL, blank=True, null=True)
 
@@ -152,9 +166,13 @@ class Address(models.Model):
     letra_via = models.CharField('Letra', max_length=1, blank=True, null=True)
     bis = models.BooleanField('Tiene bis?', default=False)
     sector = models.CharField('Sector', max_length=5, choices=SECTOR_CHOICES, blank=True, null=True)
+    placa = models.CharField('Placa', max_length=12, blank=True, null=True, help_text="Número de placa, p. ej. '45-12'")
     
     # Complemento de dirección (estructura flexible)
     complemento = models.JSONField('Complementos', blank=True, null=True, help_text="Estructura: [{'tipo': 'AP', 'valor': '101'}, ...]")
+
+    # Texto libre tal como llegó (importaciones, checkout); se analiza con `address_parser`
+    direccion_original = models.CharField('Dirección original', max_length=255, blank=True, default='')
     
     # Datos de localización
     codigo_postal = models.CharField('Código Postal', max_length=6, blank=True, null=True)
@@ -165,6 +183,7 @@ class Address(models.Model):
     longitud = models.DecimalField(max_digits=9, decimal_places=6, blank=True, null=True)
     precision_geoloc = models.CharField('Precisión', max_length=10, blank=True, null=True)
     fuente_geoloc = models.CharField('Fuente', max_length=20, choices=FUENTE_GEOLOCALIZACION, blank=True, null=True)
+    geohash = models.CharField('Geohash', max_length=12, blank=True, null=True, editable=False)
     
     # Estado y metadatos
     verificada = models.BooleanField('Verificada', default=False)
@@ -173,29 +192,50 @@ class Address(models.Model):
     creado = models.DateTimeField('Creado', auto_now_add=True)
     actualizado = models.DateTimeField('Actualizado', auto_now=True)
 
+    # Dirección completa desnormalizada (se recalcula al guardar y al renombrar municipios o barrios)
+    direccion_formateada = models.CharField('Dirección formateada', max_length=255, blank=True, default='', editable=False)
+
     class Meta:
         verbose_name = 'Dirección'
         verbose_name_plural = 'Direcciones'
         indexes = [
-            models.Index(fields=['user', 'es_principal']),
             models.Index(fields=['municipio', 'barrio']),
             models.Index(fields=['codigo_postal']),
+            models.Index(fields=['geohash'], name='idx_address_geohash', opclasses=['varchar_pattern_ops']),
+        ]
+        constraints = [
+            # Una sola dirección principal por usuario; el índice parcial también resuelve la búsqueda
+            models.UniqueConstraint(
+                fields=['user'],
+                condition=models.Q(es_principal=True),
+                name='unique_principal_address_per_user',
+            ),
         ]
         ordering = ['-es_principal', 'municipio__nombre', 'barrio__nombre']
 
     def direccion_completa(self):
         """Genera la dirección completa en formato estándar"""
+        if self.direccion_formateada:
+            return self.direccion_formateada
         parts = [
             f"{self.get_tipo_via_display()} {self.numero_via}{self.letra_via or ''}",
             "BIS" if self.bis else None,
             f"{self.get_sector_display()}" if self.sector else None,
+            f"# {self.placa}" if self.placa else None,
             f"Barrio {self.barrio.nombre}" if self.barrio else None,
             f"{self.municipio.nombre}, {self.municipio.departamento.nombre}"
         ]
         return " ".join(filter(None, parts))
 
     def __str__(self):
-        return f"Dirección de {self.user} en {self.municipio}"
+        # Solo campos propios: listados y admin no cargan usuario, municipio ni departamento
+        return self.direccion_formateada or f"{self.get_tipo_via_display()} {self.numero_via}"
+
+    def compute_geohash(self):
+        if self.latitud is None or self.longitud is None:
+            return None
+        from api.services.locations.geohash import encode
+        return encode(self.latitud, self.longitud)
 
     def save(self, *args, **kwargs):
         """Lógica adicional al guardar"""
@@ -203,4 +243,22 @@ class Address(models.Model):
         if self.latitud and self.longitud and self.fuente_geoloc in ['DAPM', 'GOOGLE']:
             self.verificada = True
             self.estado = 'VERIFICADO'
+
+        # Dirección en texto libre sin desglosar: analizarla en línea (resultados memorizados)
+        if self.direccion_original and not self.numero_via:
+            from api.services.locations.address_parser import apply_parsed, parse_address
+            parsed = parse_address(self.direccion_original)
+            if parsed is not None:
+                apply_parsed(self, parsed)
+
+        # Al marcar una dirección como principal, la anterior deja de serlo
+        if self.es_principal and self.user_id:
+            Address.objects.filter(user_id=self.user_id, es_principal=True).exclude(pk=self.pk).update(es_principal=False)
+
+        # Persistir la dirección formateada con los nombres actuales de la base
+        from api.services.locations.addresses import format_address
+        self.direccion_formateada = format_address(self)
+        self.geohash = self.compute_geohash()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'direccion_formateada', 'geohash'}
         super().save(*args, **kwargs)
\ No newline at end of file
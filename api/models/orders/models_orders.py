@@ -1,14 +1,36 @@
 from django.db import models
 from django.core.validators import MinValueValidator
 from django.utils import timezone
-from ..locations.models_locations import Address
+from ..locations.models_locations import Address, Departamento, Municipio
 from ..products.models_products import Product, ProductVariant
 from api.models.editor.models_editor import CustomDesign
+from api.services.products.pricing import get_unit_price, resolve_prices
 from django.conf import settings
+from utils.archive import archive_model
 
 
 User = settings.AUTH_USER_MODEL 
 
+class OrderManager(models.Manager):
+    def archived(self):
+        """Órdenes movidas al archivo (`api.services.orders.archive`)"""
+        return ArchivedOrder.objects.all()
+
+    def get_or_archived(self, **lookup):
+        """
+        Como `get`, pero si la orden ya fue archivada devuelve la
+        `ArchivedOrder` equivalente (mismos campos, `items`,
+        `status_history` y pagos). Solo busca en el archivo si no está en
+        `orders`, así que la ruta caliente sigue siendo una consulta.
+        """
+        try:
+            return self.get(**lookup)
+        except self.model.DoesNotExist:
+            try:
+                return ArchivedOrder.objects.get(**lookup)
+            except ArchivedOrder.DoesNotExist:
+                raise self.model.DoesNotExist(f"No existe la orden {lookup} ni en el archivo") from None
+
 class Order(models.Model):
     class Status(models.TextChoices):
         PENDING = 'pending', 'Pendiente'
@@ -163,15 +185,25 @@ class Order(models.Model):
         verbose_name='Notas internas'
     )
 
+    objects = OrderManager()
+
     class Meta:
         db_table = 'orders'
         verbose_name = 'Pedido'
         verbose_name_plural = 'Pedidos'
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['user'], name='idx_order_user'),
-            models.Index(fields=['order_number'], name='idx_order_number'),
-            models.Index(fields=['status'], name='idx_order_status'),
+            # Historial del usuario, más recientes primero (sustituye al índice solo por `user`)
+            models.Index(fields=['user', '-created_at'], name='idx_order_user_created', include=['status', 'total']),
+            # Filtros por estado con rango de fechas (sustituye al índice solo por `status`)
+            models.Index(fields=['status', 'created_at'], name='idx_order_status_created'),
+            # Cola de trabajo: solo órdenes abiertas, una fracción pequeña de la tabla
+            models.Index(
+                fields=['created_at'],
+                name='idx_order_open_created',
+                condition=models.Q(status__in=['pending', 'paid']),
+                include=['status', 'user'],
+            ),
             models.Index(fields=['created_at'], name='idx_order_created_at'),
             models.Index(fields=['payment_method'], name='idx_order_payment_method'),
         ]
@@ -180,6 +212,11 @@ class Order(models.Model):
         return f"Orden #{self.order_number} - {self.user.email}"
 
     def save(self, *args, **kwargs):
+        # Número de orden desde bloques preasignados (sin reintentos por IntegrityError)
+        if not self.order_number:
+            from api.services.orders.order_numbers import next_order_number
+            self.order_number = next_order_number()
+
         # Actualizar automáticamente la fecha de actualización
         self.updated_at = timezone.now()
         
@@ -197,6 +234,174 @@ class Order(models.Model):
         
         super().save(*args, **kwargs)
 
+    def transition_to(self, new_status, changed_by='system', notes=None):
+        """Cambia el estado validando la transición y registra el historial"""
+        from api.services.orders.status import transition_order
+        return transition_order(self, new_status, changed_by, notes)
+
+class OrderNumberCounter(models.Model):
+    """
+    Contador de números de orden para bases sin secuencias (SQLite en
+    desarrollo). En PostgreSQL se usa una secuencia; ver
+    `api.services.orders.order_numbers`.
+    """
+    name = models.CharField(
+        max_length=50,
+        primary_key=True,
+        verbose_name='Nombre'
+    )
+    value = models.BigIntegerField(
+        default=0,
+        verbose_name='Último valor reservado'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Fecha de actualización'
+    )
+
+    class Meta:
+        db_table = 'order_number_counters'
+        verbose_name = 'Contador de números de orden'
+        verbose_name_plural = 'Contadores de números de orden'
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
+
+class IdempotencyKey(models.Model):
+    """
+    Respuesta guardada para una `Idempotency-Key`; ver `utils.idempotency`.
+    `status_code` vacío significa que la primera petición sigue en curso;
+    mientras corre renueva `heartbeat_at`.
+    """
+    fingerprint = models.CharField(
+        max_length=64,
+        unique=True,
+        verbose_name='Huella (usuario, método, ruta y clave)'
+    )
+    request_hash = models.CharField(
+        max_length=64,
+        verbose_name='Hash del cuerpo de la petición'
+    )
+    status_code = models.PositiveSmallIntegerField(
+        blank=True,
+        null=True,
+        verbose_name='Código HTTP'
+    )
+    content_type = models.CharField(
+        max_length=100,
+        blank=True,
+        default='',
+        verbose_name='Content-Type'
+    )
+    body = models.BinaryField(
+        blank=True,
+        null=True,
+        verbose_name='Cuerpo de la respuesta'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Fecha de creación'
+    )
+    expires_at = models.DateTimeField(
+        verbose_name='Fecha de vencimiento'
+    )
+    heartbeat_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Último latido de la petición en curso'
+    )
+
+    class Meta:
+        db_table = 'idempotency_keys'
+        verbose_name = 'Clave de idempotencia'
+        verbose_name_plural = 'Claves de idempotencia'
+        indexes = [
+            # Barrido por lotes de las vencidas
+            models.Index(fields=['expires_at'], name='idx_idempotency_expires'),
+        ]
+
+    def __str__(self):
+        return f"{self.fingerprint[:12]}… ({self.status_code or 'en curso'})"
+
+class ShippingRate(models.Model):
+    """
+    Tarifa de envío por destino, método y tramo de peso.
+
+    El destino es un municipio, un departamento completo o, si ambos están
+    vacíos, la tarifa nacional. Gana la más específica. Cada fila cubre
+    los pesos hasta `max_weight_grams`; la fila sin tope cubre el resto y
+    suma `extra_kg_cost` por cada kilo adicional sobre el tramo anterior.
+    """
+    municipio = models.ForeignKey(
+        Municipio,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name='shipping_rates',
+        verbose_name='Municipio'
+    )
+    departamento = models.ForeignKey(
+        Departamento,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name='shipping_rates',
+        verbose_name='Departamento'
+    )
+    shipping_method = models.CharField(
+        max_length=30,
+        choices=Order.ShippingMethod.choices,
+        verbose_name='Método de envío'
+    )
+    max_weight_grams = models.PositiveIntegerField(
+        blank=True,
+        null=True,
+        verbose_name='Peso máximo (g)'
+    )
+    cost = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        validators=[MinValueValidator(0)],
+        verbose_name='Costo'
+    )
+    extra_kg_cost = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        validators=[MinValueValidator(0)],
+        verbose_name='Costo por kilo adicional'
+    )
+    delivery_days = models.PositiveSmallIntegerField(
+        blank=True,
+        null=True,
+        verbose_name='Días de entrega'
+    )
+    is_active = models.BooleanField(
+        default=True,
+        verbose_name='Activa'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Fecha de actualización'
+    )
+
+    class Meta:
+        db_table = 'shipping_rates'
+        verbose_name = 'Tarifa de envío'
+        verbose_name_plural = 'Tarifas de envío'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['municipio', 'departamento', 'shipping_method', 'max_weight_grams'],
+                name='unique_shipping_rate_bracket',
+                # Destino y tope vacíos son valores (nacional, sin tope), no desconocidos
+                nulls_distinct=False,
+            )
+        ]
+
+    def __str__(self):
+        destino = self.municipio_id or self.departamento_id or 'nacional'
+        tope = f"hasta {self.max_weight_grams} g" if self.max_weight_grams is not None else "sin tope"
+        return f"{self.get_shipping_method_display()} {destino} {tope}: {self.cost}"
+
 class OrderItem(models.Model):
     # Relaciones principales
     order = models.ForeignKey(
@@ -331,7 +536,8 @@ class OrderStatusHistory(models.Model):
         verbose_name_plural = 'Historiales de estados de pedidos'
         ordering = ['-changed_at']
         indexes = [
-            models.Index(fields=['order'], name='idx_status_history_order'),
+            # Historial de una orden en el orden del Meta (sustituye al índice solo por `order`)
+            models.Index(fields=['order', '-changed_at'], name='idx_status_history_order_date'),
             models.Index(fields=['changed_at'], name='idx_status_history_changed_at'),
         ]
 
@@ -376,6 +582,14 @@ class ShoppingCart(models.Model):
             return f"Carrito de {self.user.email}"
         return f"Carrito de sesión {self.session_id}"
 
+    def priced_items(self):
+        """Líneas del carrito con su precio vigente, en un número fijo de consultas"""
+        # Cambios aún en la caché del carrito (escritura diferida) primero a la base
+        from api.services.orders.cart_store import flush_cart
+        flush_cart(self.pk)
+        items = list(self.items.values('id', 'product_id', 'custom_design_id', 'quantity'))
+        return list(zip(items, resolve_prices(items)))
+
 class CartItem(models.Model):
     cart = models.ForeignKey(
         ShoppingCart,
@@ -432,10 +646,83 @@ class CartItem(models.Model):
 
     def save(self, *args, **kwargs):
         # Establecer el precio basado en el producto o diseño personalizado
-        if not self.price:
-            if self.product:
-                self.price = self.product.price
-            elif self.custom_design and self.custom_design.base_product:
-                self.price = self.custom_design.base_product.price
+        if not self.price and (self.product_id or self.custom_design_id):
+            self.price = get_unit_price(product_id=self.product_id, custom_design_id=self.custom_design_id)
         
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+class SalesRollup(models.Model):
+    """
+    Agregado de ventas por producto, método de pago y municipio de envío.
+
+    Una orden cuenta en el periodo de su `paid_at`. Si luego se cancela o
+    reembolsa, sale de `orders/units/revenue` y pasa a `refunds/refunded_*`
+    en ese mismo periodo. Mantenido por `api.services.orders.rollups`.
+    """
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Producto'
+    )
+    payment_method = models.CharField(
+        max_length=30,
+        blank=True,
+        default='',
+        verbose_name='Método de pago'
+    )
+    municipio = models.ForeignKey(
+        Municipio,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Municipio de envío'
+    )
+    orders = models.IntegerField(default=0, verbose_name='Órdenes')
+    units = models.IntegerField(default=0, verbose_name='Unidades')
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='Ingresos')
+    refunds = models.IntegerField(default=0, verbose_name='Órdenes revertidas')
+    refunded_units = models.IntegerField(default=0, verbose_name='Unidades revertidas')
+    refunded_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='Monto revertido')
+
+    class Meta:
+        abstract = True
+
+
+class SalesDaily(SalesRollup):
+    date = models.DateField(verbose_name='Fecha')
+
+    class Meta:
+        db_table = 'sales_daily'
+        verbose_name = 'Ventas diarias'
+        verbose_name_plural = 'Ventas diarias'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'product', 'payment_method', 'municipio'],
+                name='unique_sales_daily_key'
+            )
+        ]
+
+
+class SalesHourly(SalesRollup):
+    hour = models.DateTimeField(verbose_name='Hora')
+
+    class Meta:
+        db_table = 'sales_hourly'
+        verbose_name = 'Ventas por hora'
+        verbose_name_plural = 'Ventas por hora'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['hour', 'product', 'payment_method', 'municipio'],
+                name='unique_sales_hourly_key'
+            )
+        ]
+
+
+# Archivo frío: órdenes entregadas o canceladas antiguas con sus líneas e
+# historial, movidas por `api.services.orders.archive`. Mismas columnas que
+# las tablas calientes, sin sus índices de consulta.
+ArchivedOrder = archive_model(Order, 'ArchivedOrder', 'orders_archive')
+ArchivedOrderItem = archive_model(OrderItem, 'ArchivedOrderItem', 'order_items_archive', {Order: ArchivedOrder})
+ArchivedOrderStatusHistory = archive_model(
+    OrderStatusHistory, 'ArchivedOrderStatusHistory', 'order_status_history_archive', {Order: ArchivedOrder}
+)
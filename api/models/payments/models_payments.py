@@ -1,5 +1,6 @@
 from django.db import models
-from api.models.orders.models_orders import Order
+from api.models.orders.models_orders import ArchivedOrder, Order
+from utils.archive import archive_model
 
 class OrderPayment(models.Model):
     STATUS_CHOICES = [
@@ -50,4 +51,8 @@ class Payment(models.Model):
         ]
 
     def __str__(self):
-        return f"Pago PayPal {self.paypal_id} - {self.status}"
\ No newline at end of file
+        return f"Pago PayPal {self.paypal_id} - {self.status}"
+
+# Pagos de órdenes archivadas (ver `api.services.orders.archive`)
+ArchivedOrderPayment = archive_model(OrderPayment, 'ArchivedOrderPayment', 'order_payments_archive', {Order: ArchivedOrder})
+ArchivedPayment = archive_model(Payment, 'ArchivedPayment', 'payments_archive', {Order: ArchivedOrder})
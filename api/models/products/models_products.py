@@ -1,19 +1,97 @@
-from django.db import models
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Cast, Coalesce, Concat, NullIf, Substr
+from django.utils import timezone
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 
 class ProductCategory(models.Model):
     name = models.CharField(max_length=50, unique=True)
     description = models.TextField(blank=True, null=True)
     slug = models.SlugField(max_length=50, unique=True)
     parent = models.ForeignKey('self', on_delete=models.SET_NULL, blank=True, null=True, related_name='children')
+    path = models.CharField(max_length=255, blank=True, default='', editable=False, help_text="Ruta materializada de ids: /1/5/12/")
 
     class Meta:
         db_table = 'product_categories'
         verbose_name_plural = 'product categories'
+        indexes = [
+            models.Index(fields=['path'], name='idx_category_path', opclasses=['varchar_pattern_ops']),
+        ]
 
     def __str__(self):
         return self.name
 
+    def build_path(self):
+        parent_path = self.parent.path if self.parent_id else '/'
+        return f"{parent_path}{self.pk}/"
+
+    def save(self, *args, **kwargs):
+        """Mantiene `path` del nodo y de todo su subárbol en la misma transacción"""
+        with transaction.atomic():
+            if self.parent_id:
+                if self.pk and self.parent_id == self.pk:
+                    raise ValidationError("Una categoría no puede ser su propio padre.")
+                # Leer la ruta del padre desde la base de datos por si se movió
+                self.parent = ProductCategory.objects.select_for_update().get(pk=self.parent_id)
+                if self.pk and self.path and self.parent.path.startswith(self.path):
+                    raise ValidationError("Una categoría no puede moverse dentro de su propio subárbol.")
+
+            old_path = self.path
+            super().save(*args, **kwargs)
+
+            new_path = self.build_path()
+            if new_path != old_path:
+                ProductCategory.objects.filter(pk=self.pk).update(path=new_path)
+                if old_path:
+                    ProductCategory.objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+                        path=Concat(Value(new_path), Substr('path', len(old_path) + 1))
+                    )
+                self.path = new_path
+
+    def detach_subtree(self):
+        """
+        Convierte a los hijos en raíces tras borrar la categoría
+        (`parent` es SET_NULL, que no pasa por `save`).
+        """
+        if self.path:
+            ProductCategory.objects.filter(path__startswith=self.path).exclude(pk=self.pk).update(
+                path=Concat(Value('/'), Substr('path', len(self.path) + 1))
+            )
+
+class ProductQuerySet(models.QuerySet):
+    def in_category(self, category, include_descendants=True):
+        """
+        Productos asignados a `category` y, por defecto, a todo su subárbol,
+        en una sola consulta sobre el índice de `ProductCategory.path`.
+        """
+        if include_descendants and category.path:
+            assignments = ProductCategoryAssignment.objects.filter(category__path__startswith=category.path)
+        else:
+            assignments = ProductCategoryAssignment.objects.filter(category=category)
+        return self.filter(pk__in=assignments.values('product_id'))
+
+    def by_rating(self, min_rating=None, min_reviews=None):
+        """
+        Ordena (y opcionalmente filtra) por calificación usando
+        `ProductRatingSummary`, sin agregar `product_reviews`.
+        """
+        queryset = self
+        if min_rating is not None:
+            queryset = queryset.filter(rating_summary__average_rating__gte=min_rating)
+        if min_reviews is not None:
+            queryset = queryset.filter(rating_summary__review_count__gte=min_reviews)
+        return queryset.order_by(
+            F('rating_summary__average_rating').desc(nulls_last=True),
+            F('rating_summary__review_count').desc(nulls_last=True),
+            '-created_at',
+        )
+
 class Product(models.Model):
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True, null=True)
@@ -25,12 +103,28 @@ class Product(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_customizable = models.BooleanField(default=False, help_text="Si acepta personalización")
     base_price = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True, help_text="Precio base sin personalización")
+    weight_grams = models.PositiveIntegerField(blank=True, null=True, help_text="Peso de envío en gramos")
     color_options = ArrayField(models.CharField(max_length=50), blank=True, null=True, help_text="Colores disponibles: JSON array")
     categories = models.ManyToManyField(ProductCategory, through='ProductCategoryAssignment')
+    search_vector = SearchVectorField(blank=True, null=True, editable=False, help_text="name (A), brand (B), description (C); mantenido por api.services.products.search")
+
+    objects = ProductQuerySet.as_manager()
 
     class Meta:
         db_table = 'products'
         ordering = ['-created_at']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='idx_product_search_vector'),
+            # Requiere la extensión pg_trgm (migración `0002_pg_trgm`)
+            GinIndex(fields=['name'], name='idx_product_name_trgm', opclasses=['gin_trgm_ops']),
+            # Catálogo público: productos activos, más recientes primero
+            models.Index(
+                fields=['-created_at'],
+                name='idx_product_active_created',
+                condition=models.Q(is_active=True),
+                include=['price'],
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -82,7 +176,7 @@ class ProductReview(models.Model):
     ]
     
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='reviews')
-    user = models.ForeignKey('users.User', on_delete=models.CASCADE)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     rating = models.IntegerField(choices=RATING_CHOICES)
     comment = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -92,3 +186,112 @@ class ProductReview(models.Model):
 
     def __str__(self):
         return f"Reseña de {self.user.email} para {self.product.name}"
+
+    def save(self, *args, **kwargs):
+        """Actualiza el resumen de calificaciones con el cambio de esta reseña"""
+        with transaction.atomic():
+            previous = None
+            if self.pk:
+                # Con la fila bloqueada, dos guardados simultáneos no restan la misma calificación anterior
+                previous = (
+                    ProductReview.objects.select_for_update().filter(pk=self.pk).values('product_id', 'rating').first()
+                )
+            super().save(*args, **kwargs)
+
+            if previous and (previous['product_id'], previous['rating']) == (self.product_id, self.rating):
+                return
+            if previous:
+                ProductRatingSummary.apply_review(previous['product_id'], previous['rating'], -1)
+            ProductRatingSummary.apply_review(self.product_id, self.rating, 1)
+
+class ProductRatingSummary(models.Model):
+    """
+    Agregados de reseñas por producto, mantenidos de forma incremental.
+    Permite ordenar y filtrar listados por calificación sin leer `product_reviews`.
+    """
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, primary_key=True, related_name='rating_summary')
+    review_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    average_rating = models.DecimalField(max_digits=3, decimal_places=2, default=0)
+    stars_1 = models.PositiveIntegerField(default=0)
+    stars_2 = models.PositiveIntegerField(default=0)
+    stars_3 = models.PositiveIntegerField(default=0)
+    stars_4 = models.PositiveIntegerField(default=0)
+    stars_5 = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'product_rating_summaries'
+        indexes = [
+            models.Index(fields=['-average_rating', '-review_count'], name='idx_rating_summary_average'),
+        ]
+
+    def __str__(self):
+        return f"{self.average_rating} ({self.review_count} reseñas) para producto {self.product_id}"
+
+    @property
+    def histogram(self):
+        return {stars: getattr(self, f'stars_{stars}') for stars, _ in ProductReview.RATING_CHOICES}
+
+    @classmethod
+    def apply_review(cls, product_id, rating, sign):
+        """
+        Suma (`sign=1`) o resta (`sign=-1`) una reseña con un UPDATE atómico
+        basado en expresiones F, seguro ante escrituras concurrentes.
+        """
+        new_count = F('review_count') + sign
+        new_sum = F('rating_sum') + sign * rating
+        values = {
+            'review_count': new_count,
+            'rating_sum': new_sum,
+            f'stars_{rating}': F(f'stars_{rating}') + sign,
+            'average_rating': Coalesce(
+                Cast(new_sum, models.FloatField()) / NullIf(new_count, 0),
+                Value(Decimal('0')),
+                output_field=models.DecimalField(max_digits=3, decimal_places=2),
+            ),
+            'updated_at': timezone.now(),
+        }
+        updated = cls.objects.filter(product_id=product_id).update(**values)
+        if not updated and sign > 0:
+            cls.objects.get_or_create(product_id=product_id)
+            cls.objects.filter(product_id=product_id).update(**values)
+
+    @classmethod
+    def rebuild(cls, batch_size=1000):
+        """
+        Recalcula todos los resúmenes desde `product_reviews` con una sola
+        agregación y escrituras por lotes (upsert).
+        """
+        rows = (
+            ProductReview.objects
+            .order_by('product_id')
+            .values('product_id')
+            .annotate(
+                review_count=Count('id'),
+                rating_sum=Sum('rating'),
+                **{f'stars_{stars}': Count('id', filter=Q(rating=stars)) for stars, _ in ProductReview.RATING_CHOICES},
+            )
+        )
+        fields = ['review_count', 'rating_sum', 'average_rating', 'updated_at'] + [f'stars_{stars}' for stars, _ in ProductReview.RATING_CHOICES]
+        now = timezone.now()
+        total = 0
+        with transaction.atomic():
+            batch = []
+            for row in rows.iterator(chunk_size=batch_size):
+                row['average_rating'] = (Decimal(row['rating_sum']) / row['review_count']).quantize(Decimal('0.01'))
+                batch.append(cls(updated_at=now, **row))
+                if len(batch) >= batch_size:
+                    cls.objects.bulk_create(batch, update_conflicts=True, unique_fields=['product'], update_fields=fields)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                cls.objects.bulk_create(batch, update_conflicts=True, unique_fields=['product'], update_fields=fields)
+                total += len(batch)
+
+            # Productos que ya no tienen reseñas
+            cls.objects.exclude(product_id__in=ProductReview.objects.values('product_id')).update(
+                review_count=0, rating_sum=0, average_rating=0, updated_at=now,
+                **{f'stars_{stars}': 0 for stars, _ in ProductReview.RATING_CHOICES},
+            )
+        return total
@@ -0,0 +1,159 @@
+"""
+Reservas de stock de `ProductVariant` seguras ante concurrencia.
+
+El stock se descuenta con un único UPDATE condicional
+(`SET stock_quantity = stock_quantity - n WHERE stock_quantity >= n`) para
+todas las líneas del carrito a la vez: si alguna no alcanza, la
+transacción se revierte completa y no se reserva nada. Las reservas
+tienen vencimiento; `release_expired` devuelve el stock de las vencidas.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, Sum, Value, When
+from django.utils import timezone
+
+from api.models.inventory.models_inventory import StockReservation
+from api.models.products.models_products import ProductVariant
+from api.services.products.read_model import invalidate_product_document
+
+
+class InsufficientStock(Exception):
+    def __init__(self, shortages):
+        # {variant_id: (solicitado, disponible)}
+        self.shortages = shortages
+        super().__init__(f"Stock insuficiente para las variantes {sorted(shortages)}")
+
+
+def _merge_lines(lines):
+    quantities = defaultdict(int)
+    for variant_id, quantity in lines:
+        if quantity <= 0:
+            raise ValueError("La cantidad a reservar debe ser positiva.")
+        quantities[variant_id] += quantity
+    return dict(quantities)
+
+
+def _stock_delta(quantities, sign):
+    """Expresión `stock_quantity ± cantidad` por variante para un solo UPDATE."""
+    return F('stock_quantity') + Case(
+        *[When(pk=variant_id, then=Value(sign * quantity)) for variant_id, quantity in quantities.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def _invalidate_documents(variant_ids):
+    product_ids = ProductVariant.objects.filter(pk__in=variant_ids).values_list('product_id', flat=True).distinct()
+    for product_id in product_ids:
+        invalidate_product_document(product_id)
+
+
+def reserve_stock(lines, reference, ttl=None):
+    """
+    Reserva todas las líneas `(variant_id, cantidad)` o ninguna.
+
+    Lanza `InsufficientStock` con el detalle de las variantes sin stock.
+    """
+    quantities = _merge_lines(lines)
+    if not quantities:
+        return []
+    ttl = ttl or timedelta(seconds=getattr(settings, 'STOCK_RESERVATION_TTL', 900))
+    expires_at = timezone.now() + ttl
+
+    with transaction.atomic():
+        available = reduce(or_, [
+            Q(pk=variant_id, is_active=True, stock_quantity__gte=quantity)
+            for variant_id, quantity in quantities.items()
+        ])
+        updated = ProductVariant.objects.filter(available).update(stock_quantity=_stock_delta(quantities, -1))
+        if updated == len(quantities):
+            reservations = StockReservation.objects.bulk_create([
+                StockReservation(variant_id=variant_id, quantity=quantity, reference=reference, expires_at=expires_at)
+                for variant_id, quantity in quantities.items()
+            ])
+        else:
+            transaction.set_rollback(True)
+            reservations = None
+
+    if reservations is None:
+        # Consultado tras el rollback para ver el stock real de cada variante
+        stock = dict(ProductVariant.objects.filter(pk__in=quantities, is_active=True).values_list('pk', 'stock_quantity'))
+        raise InsufficientStock({
+            variant_id: (quantity, stock.get(variant_id, 0))
+            for variant_id, quantity in quantities.items()
+            if stock.get(variant_id, 0) < quantity
+        })
+
+    _invalidate_documents(list(quantities))
+    return reservations
+
+
+def _release(queryset):
+    """
+    Libera las reservas activas del queryset y devuelve su stock en un
+    UPDATE. Las filas bloqueadas por otro proceso se omiten.
+    """
+    with transaction.atomic():
+        rows = list(
+            queryset.filter(status=StockReservation.Status.ACTIVE)
+            .select_for_update(skip_locked=True)
+            .values_list('pk', 'variant_id', 'quantity')
+        )
+        if not rows:
+            return 0
+
+        StockReservation.objects.filter(pk__in=[pk for pk, _, _ in rows]).update(
+            status=StockReservation.Status.RELEASED,
+        )
+        quantities = defaultdict(int)
+        for _, variant_id, quantity in rows:
+            quantities[variant_id] += quantity
+        ProductVariant.objects.filter(pk__in=quantities).update(stock_quantity=_stock_delta(quantities, 1))
+
+    _invalidate_documents(list(quantities))
+    return len(rows)
+
+
+def release_reservations(reference):
+    """Devuelve al inventario el stock retenido por `reference`."""
+    return _release(StockReservation.objects.filter(reference=reference))
+
+
+def commit_reservations(reference):
+    """
+    Confirma las reservas de `reference` (p. ej. al crear la orden): el
+    stock queda descontado definitivamente.
+    """
+    return StockReservation.objects.filter(
+        reference=reference,
+        status=StockReservation.Status.ACTIVE,
+    ).update(status=StockReservation.Status.COMMITTED)
+
+
+def reserved_quantity(variant_id):
+    return StockReservation.objects.filter(
+        variant_id=variant_id,
+        status=StockReservation.Status.ACTIVE,
+    ).aggregate(total=Sum('quantity'))['total'] or 0
+
+
+def release_expired(batch_size=1000, now=None):
+    """
+    Libera reservas vencidas por lotes. Devuelve cuántas se liberaron.
+    """
+    now = now or timezone.now()
+    released = 0
+    while True:
+        batch = StockReservation.objects.filter(
+            status=StockReservation.Status.ACTIVE,
+            expires_at__lte=now,
+        ).order_by('expires_at')[:batch_size]
+        count = _release(StockReservation.objects.filter(pk__in=list(batch.values_list('pk', flat=True))))
+        released += count
+        if count < batch_size:
+            return released
@@ -0,0 +1,216 @@
+"""
+Parser de direcciones colombianas en texto libre.
+
+Convierte entradas como "Cra 7 # 45-12 Apto 301 Bis Sur" en los campos
+estructurados de `Address` (`tipo_via`, `numero_via`, `letra_via`, `bis`,
+`sector`, `placa` y la lista `complemento`). Las expresiones regulares se
+compilan una sola vez al importar el módulo y los resultados se memorizan
+por texto normalizado, de modo que las entradas repetidas (muy comunes en
+importaciones) no se vuelven a analizar.
+
+`parse_address` sirve para uso en línea (checkout, formularios) y
+`parse_stored_addresses` recorre en streaming las filas con
+`direccion_original` y escribe con `bulk_update` por bloques.
+"""
+import re
+import time
+import unicodedata
+from dataclasses import dataclass
+from functools import lru_cache
+
+from api.models.locations.models_locations import Address
+from .addresses import ADDRESS_FORMAT_FIELDS, format_address, with_names
+
+PARSED_FIELDS = ['tipo_via', 'numero_via', 'letra_via', 'bis', 'sector', 'placa', 'complemento']
+
+TIPO_VIA_ALIASES = {
+    'AV': ['AV', 'AVE', 'AVENIDA', 'AVDA'],
+    'CL': ['CL', 'CLL', 'CALLE', 'CALL', 'CA'],
+    'KR': ['KR', 'KRA', 'CR', 'CRA', 'CRR', 'CARRERA', 'CARERA', 'K'],
+    'DG': ['DG', 'DIAG', 'DIAGONAL'],
+    'TV': ['TV', 'TR', 'TRV', 'TRANSV', 'TRANSVERSAL'],
+}
+
+COMPLEMENTO_ALIASES = {
+    'AP': ['AP', 'APT', 'APTO', 'APARTAMENTO', 'DPTO'],
+    'BLQ': ['BLQ', 'BL', 'BLOQ', 'BLOQUE'],
+    'ED': ['ED', 'EDIF', 'EDIFICIO'],
+    'PN': ['PN', 'PISO', 'PI'],
+    'UR': ['UR', 'URB', 'URBANIZACION'],
+}
+
+def _lookup(aliases):
+    return {alias: code for code, values in aliases.items() for alias in values}
+
+
+def _alternation(lookup):
+    # Los alias más largos primero para que "CARRERA" no se corte en "CA"
+    return '|'.join(sorted(lookup, key=len, reverse=True))
+
+
+TIPO_VIA = _lookup(TIPO_VIA_ALIASES)
+COMPLEMENTO = _lookup(COMPLEMENTO_ALIASES)
+
+# Solo nombres completos: "N", "S" o "E" se confunden con letras de vía
+SECTOR_WORD = r'NORTE|SUR|ESTE|OESTE'
+
+PUNCTUATION_RE = re.compile(r'[.,;:]')
+NUMBER_SIGN_RE = re.compile(r'\s*(?:#|N[O°º]\.?(?=\s*\d)|NUMERO)\s*')
+SPACES_RE = re.compile(r'\s+')
+
+VIA_RE = re.compile(
+    rf'^(?P<tipo>{_alternation(TIPO_VIA)})(?![A-Z])\s*'
+    r'(?P<numero>\d{1,3}|[A-Z]{3,10}(?<!BIS))\s*'  # número o nombre ("Av Boyacá 68-23")
+    r'(?P<letra>[A-Z](?![A-Z]))?\s*'
+    r'(?P<bis>BIS(?:\s*[A-Z](?![A-Z]))?)?\s*'
+    rf'(?P<sector>{SECTOR_WORD})?\s*'
+    r'#?\s*'
+    r'(?P<placa>\d{1,3}\s*[A-Z]?(?:\s*BIS)?)\s*(?:-|\s)\s*(?P<casa>\d{1,3}[A-Z]?)'
+    r'(?P<resto>.*)$'
+)
+COMPLEMENTO_RE = re.compile(rf'\b(?P<tipo>{_alternation(COMPLEMENTO)})\s*(?P<valor>[A-Z0-9-]+)\b')
+BIS_RE = re.compile(r'\bBIS\b')
+SECTOR_RE = re.compile(rf'\b(?P<sector>{SECTOR_WORD})\b')
+
+
+@dataclass(frozen=True)
+class ParsedAddress:
+    tipo_via: str
+    numero_via: str
+    letra_via: str = None
+    bis: bool = False
+    sector: str = None
+    placa: str = None
+    complemento: tuple = ()  # ((tipo, valor), ...) inmutable para poder memorizarlo
+    sobrante: str = ''       # texto que no se reconoció
+
+    @property
+    def complete(self):
+        return not self.sobrante
+
+    def as_fields(self):
+        """Valores listos para asignar a un `Address`"""
+        return {
+            'tipo_via': self.tipo_via,
+            'numero_via': self.numero_via,
+            'letra_via': self.letra_via,
+            'bis': self.bis,
+            'sector': self.sector,
+            'placa': self.placa,
+            'complemento': [{'tipo': tipo, 'valor': valor} for tipo, valor in self.complemento] or None,
+        }
+
+
+def normalize(text):
+    """Mayúsculas, sin tildes, sin puntuación y con "#" como separador de placa"""
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii').upper()
+    text = PUNCTUATION_RE.sub(' ', text)
+    text = NUMBER_SIGN_RE.sub(' # ', text)
+    return SPACES_RE.sub(' ', text).strip()
+
+
+def parse_address(text):
+    """
+    Devuelve un `ParsedAddress` o `None` si el texto no tiene la forma
+    "<vía> <número> # <placa>-<casa>". Los resultados se memorizan.
+    """
+    return _parse_normalized(normalize(text))
+
+
+@lru_cache(maxsize=65536)
+def _parse_normalized(text):
+    match = VIA_RE.match(text)
+    if match is None:
+        return None
+
+    resto = match['resto']
+    complemento = tuple((COMPLEMENTO[m['tipo']], m['valor']) for m in COMPLEMENTO_RE.finditer(resto))
+    resto = COMPLEMENTO_RE.sub(' ', resto)
+
+    bis = bool(match['bis']) or bool(BIS_RE.search(resto))
+    resto = BIS_RE.sub(' ', resto)
+
+    sector = match['sector']
+    sector_match = SECTOR_RE.search(resto)
+    if sector_match:
+        sector = sector or sector_match['sector']
+        resto = SECTOR_RE.sub(' ', resto, count=1)
+
+    placa = f"{match['placa'].replace(' ', '')}-{match['casa']}"
+    return ParsedAddress(
+        tipo_via=TIPO_VIA[match['tipo']],
+        numero_via=match['numero'],
+        letra_via=match['letra'],
+        bis=bis,
+        sector=sector,
+        placa=placa,
+        complemento=complemento,
+        sobrante=SPACES_RE.sub(' ', resto).strip(),
+    )
+
+
+def apply_parsed(address, parsed):
+    """Copia los campos analizados al objeto; devuelve True si algo cambió"""
+    changed = False
+    for name, value in parsed.as_fields().items():
+        if getattr(address, name) != value:
+            setattr(address, name, value)
+            changed = True
+    return changed
+
+
+@dataclass
+class ParseReport:
+    rows: int = 0
+    parsed: int = 0
+    partial: int = 0  # analizadas pero con texto sobrante
+    failed: int = 0
+    updated: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def parse_rate(self):
+        return (self.parsed + self.partial) / self.rows if self.rows else 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+def parse_stored_addresses(queryset=None, batch_size=1000):
+    """
+    Analiza `direccion_original` de las filas del queryset en streaming y
+    guarda los campos estructurados con `bulk_update` por bloques. Las
+    direcciones que no se reconocen se dejan como están.
+    """
+    queryset = Address.objects.all() if queryset is None else queryset
+    update_fields = [*PARSED_FIELDS, 'direccion_formateada']
+    report = ParseReport()
+    start = time.perf_counter()
+    batch = []
+    rows = with_names(
+        queryset.exclude(direccion_original='').order_by()
+        .only(*ADDRESS_FORMAT_FIELDS, 'complemento', 'direccion_original', 'direccion_formateada')
+    )
+    for address in rows.iterator(chunk_size=batch_size):
+        report.rows += 1
+        parsed = parse_address(address.direccion_original)
+        if parsed is None:
+            report.failed += 1
+            continue
+        if parsed.complete:
+            report.parsed += 1
+        else:
+            report.partial += 1
+        if apply_parsed(address, parsed):
+            address.direccion_formateada = format_address(address)
+            batch.append(address)
+        if len(batch) >= batch_size:
+            Address.objects.bulk_update(batch, update_fields)
+            report.updated += len(batch)
+            batch = []
+    if batch:
+        Address.objects.bulk_update(batch, update_fields)
+        report.updated += len(batch)
+    report.elapsed = time.perf_counter() - start
+    return report
@@ -0,0 +1,102 @@
+"""
+Formato de direcciones sin consultas por fila.
+
+Los nombres de barrio, municipio y departamento salen de las filas
+unidas en la misma consulta (`with_names`), nunca del índice geográfico
+en memoria: lo que se persiste en `Address.direccion_formateada` siempre
+refleja la base, aunque el índice del proceso esté desactualizado.
+Formatear N direcciones cuesta un número constante de consultas.
+"""
+from django.db.models import F
+
+from api.models.locations.models_locations import Address, Barrio, Municipio
+
+ADDRESS_FORMAT_FIELDS = [
+    'id', 'tipo_via', 'numero_via', 'letra_via', 'bis', 'sector', 'placa', 'barrio_id', 'municipio_id',
+]
+
+NAME_ANNOTATIONS = {
+    'barrio_nombre': F('barrio__nombre'),
+    'municipio_nombre': F('municipio__nombre'),
+    'departamento_nombre': F('municipio__departamento__nombre'),
+}
+
+
+def with_names(queryset):
+    """Anota los nombres de barrio, municipio y departamento con JOIN en la misma consulta"""
+    return queryset.annotate(**NAME_ANNOTATIONS)
+
+
+def _names(address):
+    if hasattr(address, 'municipio_nombre'):
+        return address.barrio_nombre, address.municipio_nombre, address.departamento_nombre
+    # Una sola dirección (p. ej. `Address.save`): dos consultas como máximo
+    municipio, departamento = (
+        Municipio.objects.filter(pk=address.municipio_id).values_list('nombre', 'departamento__nombre').get()
+    )
+    barrio = (
+        Barrio.objects.filter(pk=address.barrio_id).values_list('nombre', flat=True).first()
+        if address.barrio_id else None
+    )
+    return barrio, municipio, departamento
+
+
+def _compose(address, barrio, municipio, departamento):
+    parts = [
+        f"{address.get_tipo_via_display()} {address.numero_via}{address.letra_via or ''}",
+        "BIS" if address.bis else None,
+        f"{address.get_sector_display()}" if address.sector else None,
+        f"# {address.placa}" if address.placa else None,
+        f"Barrio {barrio}" if barrio else None,
+        f"{municipio}, {departamento}",
+    ]
+    return " ".join(filter(None, parts))
+
+
+def format_address(address):
+    """
+    Mismo formato que `Address.direccion_completa`. Usa los nombres
+    anotados por `with_names` si están; si no, los consulta.
+    """
+    return _compose(address, *_names(address))
+
+
+def format_addresses(addresses):
+    """Formatea un lote de direcciones con dos consultas en total"""
+    addresses = list(addresses)
+    municipios = {
+        pk: (nombre, departamento)
+        for pk, nombre, departamento in Municipio.objects.filter(
+            pk__in={address.municipio_id for address in addresses},
+        ).values_list('pk', 'nombre', 'departamento__nombre')
+    }
+    barrio_ids = {address.barrio_id for address in addresses} - {None}
+    barrios = dict(Barrio.objects.filter(pk__in=barrio_ids).values_list('pk', 'nombre')) if barrio_ids else {}
+    return [
+        _compose(address, barrios.get(address.barrio_id), *municipios[address.municipio_id])
+        for address in addresses
+    ]
+
+
+def refresh_formatted_addresses(queryset=None, batch_size=1000):
+    """
+    Recalcula `direccion_formateada` por lotes con `bulk_update`.
+    Devuelve cuántas direcciones cambiaron.
+    """
+    queryset = Address.objects.all() if queryset is None else queryset
+    changed = 0
+    batch = []
+    rows = with_names(queryset.order_by().only(*ADDRESS_FORMAT_FIELDS, 'direccion_formateada'))
+    for address in rows.iterator(chunk_size=batch_size):
+        formatted = format_address(address)
+        if formatted != address.direccion_formateada:
+            address.direccion_formateada = formatted
+            batch.append(address)
+        if len(batch) >= batch_size:
+            Address.objects.bulk_update(batch, ['direccion_formateada'])
+            changed += len(batch)
+            batch = []
+    if batch:
+        Address.objects.bulk_update(batch, ['direccion_formateada'])
+        changed += len(batch)
+    return changed
@@ -0,0 +1,227 @@
+"""
+Carga de la división político-administrativa del DANE (DIVIPOLA).
+
+Lee `departamentos.csv`, `municipios.csv` y, si existe, `barrios.csv` de un
+directorio (por defecto `api/fixtures/dane`) y los inserta en orden de
+dependencia con `bulk_create(update_conflicts=True)`, de modo que la carga
+es idempotente. Si el checksum de los archivos coincide con el de la
+última carga, no se toca la base de datos.
+
+Columnas:
+    departamentos.csv: codigo_dane, nombre, indicativo_telefonico
+    municipios.csv:    codigo_dane, departamento, nombre, tipo, categoria
+    barrios.csv:       municipio, nombre, comuna, estrato_promedio
+
+`api/fixtures/dane` trae los 33 departamentos completos pero solo una
+muestra de municipios (las capitales) y ningún barrio. Para la lista
+completa de municipios se pasa `municipios=` con el listado oficial
+DIVIPOLA tal como lo publica el DANE (CSV del geoportal o de
+datos.gov.co): se reconocen sus encabezados (`cod_mpio`/`Código
+Municipio`, `cod_dpto`/`Código Departamento`, `nom_mpio`/`Nombre
+Municipio`, `tipo_municipio`...) y los nombres en mayúsculas se pasan a
+nombre propio. El DANE no publica barrios: `barrios.csv` viene de las
+alcaldías.
+"""
+import csv
+import hashlib
+import unicodedata
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+
+from django.db.models import Q
+
+from api.models.locations.models_locations import Address, Barrio, Departamento, Municipio, ReferenceDataset
+from .addresses import refresh_formatted_addresses
+from .geo_index import invalidate_geo_index
+
+DATASET_NAME = 'dane'
+DEFAULT_PATH = Path(settings.BASE_DIR) / 'api' / 'fixtures' / 'dane'
+FILES = ('departamentos.csv', 'municipios.csv', 'barrios.csv')
+
+
+def _read(path):
+    with open(path, newline='', encoding='utf-8-sig') as handle:
+        for row in csv.DictReader(handle):
+            yield {key: (value.strip() or None) if isinstance(value, str) else value for key, value in row.items()}
+
+
+# Encabezados aceptados para cada columna de municipios, ya normalizados (ver `_header`)
+MUNICIPIO_COLUMNS = {
+    'codigo_dane': ('codigo_dane', 'cod_mpio', 'codigo_municipio'),
+    'departamento': ('departamento', 'cod_dpto', 'codigo_departamento'),
+    'nombre': ('nombre', 'nom_mpio', 'nombre_municipio'),
+    'tipo': ('tipo', 'tipo_municipio', 'tipo_municipio_isla_area_no_municipalizada'),
+    'categoria': ('categoria',),
+}
+LOWERCASE_WORDS = {'de', 'del', 'el', 'la', 'las', 'los', 'y', 'e'}
+
+
+def dataset_checksum(path, municipios=None):
+    digest = hashlib.sha256()
+    files = [(name, Path(path) / name) for name in FILES]
+    if municipios:
+        files[1] = (FILES[1], Path(municipios))
+    for name, file_path in files:
+        if file_path.exists():
+            digest.update(name.encode('utf-8'))
+            digest.update(file_path.read_bytes())
+    return digest.hexdigest()
+
+
+def _header(name):
+    """`Código Municipio` → `codigo_municipio`"""
+    name = unicodedata.normalize('NFKD', name or '').encode('ascii', 'ignore').decode('ascii').lower()
+    return '_'.join(''.join(c if c.isalnum() else ' ' for c in name).split())
+
+
+def _proper_name(nombre):
+    """`CARTAGENA DE INDIAS` → `Cartagena de Indias`; los nombres ya escritos así no cambian"""
+    if not nombre or nombre != nombre.upper():
+        return nombre
+    words = nombre.lower().split()
+    return ' '.join(
+        word if index and word in LOWERCASE_WORDS else word[:1].upper() + word[1:]
+        for index, word in enumerate(words)
+    )
+
+
+def _municipio_rows(path):
+    """
+    Filas de `municipios.csv` o del listado DIVIPOLA con las columnas de
+    `MUNICIPIO_COLUMNS`. El código de municipio puede venir completo
+    (5001, 05001) o solo su parte local (001) junto al del departamento.
+    """
+    for row in _read(path):
+        values = {_header(key): value for key, value in row.items() if key}
+        row = {
+            column: next((values[name] for name in names if values.get(name)), None)
+            for column, names in MUNICIPIO_COLUMNS.items()
+        }
+        if row['codigo_dane'] is None or row['departamento'] is None:
+            raise KeyError(f"{path.name}: faltan el código del municipio o el del departamento")
+        row['departamento'] = row['departamento'].zfill(2)
+        if len(row['codigo_dane']) <= 3:
+            row['codigo_dane'] = row['departamento'] + row['codigo_dane'].zfill(3)
+        tipo = (row['tipo'] or '').upper()
+        row['tipo'] = Municipio.TIPO_DISTRITO if 'DISTRITO' in tipo else Municipio.TIPO_MUNICIPIO
+        row['nombre'] = _proper_name(row['nombre'])
+        yield row
+
+
+def _build(model, path, make, rows=None):
+    """
+    Instancias de `model` a partir de las filas del CSV (o de `rows`, ya
+    leídas de `path`). Rechaza antes del INSERT los textos más largos que
+    el campo: PostgreSQL abortaría la transacción completa y SQLite los
+    guardaría sin avisar.
+    """
+    limits = [
+        (field.attname, field.max_length)
+        for field in model._meta.concrete_fields
+        if getattr(field, 'max_length', None)
+    ]
+    objects = []
+    for line, row in enumerate(_read(path) if rows is None else rows, start=2):
+        obj = make(row)
+        for attname, max_length in limits:
+            value = getattr(obj, attname)
+            if isinstance(value, str) and len(value) > max_length:
+                raise ValueError(
+                    f"{path.name}, línea {line}: '{attname}' tiene {len(value)} caracteres "
+                    f"(máximo {max_length}): {value!r}"
+                )
+        objects.append(obj)
+    return objects
+
+
+def _upsert(model, objects, unique_fields, update_fields, batch_size):
+    model.objects.bulk_create(
+        objects,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=unique_fields,
+        update_fields=update_fields,
+    )
+    return len(objects)
+
+
+def load_dane(path=None, force=False, batch_size=1000, municipios=None):
+    """
+    Carga el conjunto de datos. `municipios` reemplaza `municipios.csv` por
+    otro archivo, normalmente el listado DIVIPOLA oficial. Devuelve
+    `{modelo: filas}` o None si no hubo cambios desde la última carga.
+    """
+    path = Path(path or DEFAULT_PATH)
+    municipios_path = Path(municipios) if municipios else path / 'municipios.csv'
+    checksum = dataset_checksum(path, municipios)
+    if not force and ReferenceDataset.objects.filter(nombre=DATASET_NAME, checksum=checksum).exists():
+        return None
+
+    counts = {}
+    # Nombres actuales, para refrescar las direcciones de lo que se renombre
+    old_departamentos = dict(Departamento.objects.values_list('codigo_dane', 'nombre'))
+    old_municipios = dict(Municipio.objects.values_list('codigo_dane', 'nombre'))
+    with transaction.atomic():
+        counts['departamentos'] = _upsert(
+            Departamento,
+            _build(Departamento, path / 'departamentos.csv', lambda row: Departamento(
+                codigo_dane=row['codigo_dane'].zfill(2),
+                nombre=row['nombre'],
+                indicativo_telefonico=row.get('indicativo_telefonico'),
+            )),
+            unique_fields=['codigo_dane'],
+            update_fields=['nombre', 'indicativo_telefonico'],
+            batch_size=batch_size,
+        )
+
+        counts['municipios'] = _upsert(
+            Municipio,
+            _build(Municipio, municipios_path, lambda row: Municipio(
+                codigo_dane=row['codigo_dane'].zfill(5),
+                departamento_id=row['departamento'],
+                nombre=row['nombre'],
+                tipo=row['tipo'],
+                categoria=row['categoria'],
+            ), rows=_municipio_rows(municipios_path)),
+            unique_fields=['codigo_dane'],
+            update_fields=['departamento', 'nombre', 'tipo', 'categoria'],
+            batch_size=batch_size,
+        )
+
+        counts['barrios'] = 0
+        if (path / 'barrios.csv').exists():
+            counts['barrios'] = _upsert(
+                Barrio,
+                _build(Barrio, path / 'barrios.csv', lambda row: Barrio(
+                    municipio_id=row['municipio'].zfill(5),
+                    nombre=row['nombre'],
+                    comuna=row.get('comuna'),
+                    estrato_promedio=int(row['estrato_promedio']) if row.get('estrato_promedio') else None,
+                )),
+                unique_fields=['municipio', 'nombre'],
+                update_fields=['comuna', 'estrato_promedio'],
+                batch_size=batch_size,
+            )
+
+        ReferenceDataset.objects.update_or_create(
+            nombre=DATASET_NAME,
+            defaults={'checksum': checksum, 'filas': sum(counts.values())},
+        )
+
+    # bulk_create no emite señales
+    invalidate_geo_index()
+    renamed_departamentos = [
+        code for code, nombre in Departamento.objects.values_list('codigo_dane', 'nombre')
+        if code in old_departamentos and old_departamentos[code] != nombre
+    ]
+    renamed_municipios = [
+        code for code, nombre in Municipio.objects.values_list('codigo_dane', 'nombre')
+        if code in old_municipios and old_municipios[code] != nombre
+    ]
+    if renamed_departamentos or renamed_municipios:
+        refresh_formatted_addresses(Address.objects.filter(
+            Q(municipio__departamento__in=renamed_departamentos) | Q(municipio__in=renamed_municipios)
+        ))
+    return counts
@@ -0,0 +1,149 @@
+"""
+Índice en memoria de la jerarquía departamento → municipio → barrio.
+
+Son datos de referencia estáticos: se cargan una vez por proceso con tres
+consultas y se guardan en arreglos ordenados. Los hijos de cada nodo son
+un rango contiguo del arreglo del nivel inferior y el autocompletado usa
+un trie plano (claves normalizadas ordenadas + búsqueda binaria), sin
+tildes ni mayúsculas. El índice se recarga cuando cambia la versión
+compartida en la caché (señales de los modelos y `load_dane`); cada
+proceso lee esa versión como mucho una vez cada `IN_PROCESS_TABLE_TTL`
+segundos, o recarga siempre si la caché es local al proceso.
+"""
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+
+from django.core.cache import cache
+
+from api.models.locations.models_locations import Barrio, Departamento, Municipio
+from utils.caches import is_shared_cache, refresh_due
+
+GEO_INDEX_VERSION_KEY = 'geo_index_version'
+
+DEPARTAMENTO = 'departamento'
+MUNICIPIO = 'municipio'
+BARRIO = 'barrio'
+
+_index = None
+_index_version = None
+_index_checked_at = None  # `time.monotonic()` de la última lectura de la versión
+_index_lock = threading.Lock()
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in text if not unicodedata.combining(c)).lower().strip()
+
+
+class GeoIndex:
+    def __init__(self, departamentos, municipios, barrios):
+        # Cada nivel: tuplas (código, nombre, código del padre) ordenadas por padre y nombre
+        self.levels = {
+            DEPARTAMENTO: sorted(departamentos, key=lambda row: normalize(row[1])),
+            MUNICIPIO: sorted(municipios, key=lambda row: (row[2], normalize(row[1]))),
+            BARRIO: sorted(barrios, key=lambda row: (row[2], normalize(row[1]))),
+        }
+        self.positions = {
+            kind: {row[0]: position for position, row in enumerate(rows)}
+            for kind, rows in self.levels.items()
+        }
+        self.ranges = {kind: self._child_ranges(rows) for kind, rows in self.levels.items()}
+
+        keys = []
+        for kind, rows in self.levels.items():
+            for position, row in enumerate(rows):
+                words = normalize(row[1]).split()
+                # Cada palabra inicia una clave: "indias" encuentra "Cartagena de Indias"
+                for start in range(len(words)):
+                    keys.append((' '.join(words[start:]), kind, position))
+        keys.sort()
+        self.keys = [key for key, _, _ in keys]
+        self.targets = [(kind, position) for _, kind, position in keys]
+
+    @staticmethod
+    def _child_ranges(rows):
+        ranges = {}
+        for position, row in enumerate(rows):
+            start, _ = ranges.get(row[2], (position, position))
+            ranges[row[2]] = (start, position + 1)
+        return ranges
+
+    def _entry(self, kind, position):
+        code, nombre, parent = self.levels[kind][position]
+        return {'tipo': kind, 'codigo': code, 'nombre': nombre, 'padre': parent}
+
+    def get(self, kind, code):
+        position = self.positions[kind].get(code)
+        return self._entry(kind, position) if position is not None else None
+
+    def departamento(self, codigo_dane):
+        return self.get(DEPARTAMENTO, codigo_dane)
+
+    def municipio(self, codigo_dane):
+        return self.get(MUNICIPIO, codigo_dane)
+
+    def municipios(self, departamento_codigo):
+        start, end = self.ranges[MUNICIPIO].get(departamento_codigo, (0, 0))
+        return [self._entry(MUNICIPIO, position) for position in range(start, end)]
+
+    def barrios(self, municipio_codigo):
+        start, end = self.ranges[BARRIO].get(municipio_codigo, (0, 0))
+        return [self._entry(BARRIO, position) for position in range(start, end)]
+
+    def autocomplete(self, prefix, kind=None, parent=None, limit=10):
+        """
+        Entradas cuyo nombre (o alguna de sus palabras) empieza por `prefix`,
+        sin distinguir tildes ni mayúsculas.
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        results = []
+        seen = set()
+        position = bisect_left(self.keys, prefix)
+        while position < len(self.keys) and self.keys[position].startswith(prefix):
+            target = self.targets[position]
+            position += 1
+            if target in seen or (kind and target[0] != kind):
+                continue
+            entry = self._entry(*target)
+            if parent is not None and entry['padre'] != parent:
+                continue
+            seen.add(target)
+            results.append(entry)
+            if len(results) >= limit:
+                break
+        return results
+
+
+def _current_version():
+    return cache.get_or_set(GEO_INDEX_VERSION_KEY, 0, None)
+
+
+def get_geo_index():
+    global _index, _index_version, _index_checked_at
+    if _index is not None and not refresh_due(_index_checked_at):
+        return _index
+    with _index_lock:
+        if _index is None or refresh_due(_index_checked_at):
+            version = _current_version()
+            if _index is None or _index_version != version or not is_shared_cache():
+                _index = GeoIndex(
+                    [(code, nombre, None) for code, nombre in Departamento.objects.values_list('codigo_dane', 'nombre')],
+                    list(Municipio.objects.values_list('codigo_dane', 'nombre', 'departamento_id')),
+                    list(Barrio.objects.values_list('pk', 'nombre', 'municipio_id')),
+                )
+                _index_version = version
+            _index_checked_at = time.monotonic()
+    return _index
+
+
+def invalidate_geo_index():
+    global _index_checked_at
+    try:
+        cache.incr(GEO_INDEX_VERSION_KEY)
+    except ValueError:
+        cache.set(GEO_INDEX_VERSION_KEY, 1, None)
+    _index_checked_at = None  # este proceso revisa en el siguiente acceso; los demás al vencer el plazo
@@ -0,0 +1,105 @@
+"""
+Geohash en Python puro (sin GDAL).
+
+Las celdas comparten prefijo cuando están contenidas unas en otras, así
+que una búsqueda por prefijo indexada (`LIKE 'd2g6%'`) acota los
+candidatos antes del cálculo exacto de distancia.
+"""
+import math
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+DECODE = {char: index for index, char in enumerate(BASE32)}
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def encode(latitude, longitude, precision=12):
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    latitude, longitude = float(latitude), float(longitude)
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        interval, value = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (interval[0] + interval[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            interval[0] = mid
+        else:
+            interval[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def bounds(geohash):
+    """`(lat_min, lat_max, lon_min, lon_max)` de la celda."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = DECODE[char]
+        for shift in range(4, -1, -1):
+            interval = lon_range if even else lat_range
+            mid = (interval[0] + interval[1]) / 2
+            if value >> shift & 1:
+                interval[0] = mid
+            else:
+                interval[1] = mid
+            even = not even
+    return lat_range[0], lat_range[1], lon_range[0], lon_range[1]
+
+
+def cell_size(precision):
+    """Alto y ancho de una celda en grados."""
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def coverage_km(precision, latitude):
+    """
+    Radio garantizado por el bloque de 3x3 celdas alrededor de un punto:
+    todo lo que está a esa distancia o menos cae dentro del bloque.
+    """
+    lat_size, lon_size = cell_size(precision)
+    return min(lat_size * KM_PER_DEGREE, lon_size * KM_PER_DEGREE * math.cos(math.radians(float(latitude))))
+
+
+def precision_for_radius(radius_km, latitude):
+    """Mayor precisión cuyo bloque de 3x3 celdas cubre `radius_km`."""
+    for precision in range(12, 0, -1):
+        if coverage_km(precision, latitude) >= radius_km:
+            return precision
+    return 1
+
+
+def neighbors(geohash):
+    """La celda y sus 8 vecinas."""
+    lat_min, lat_max, lon_min, lon_max = bounds(geohash)
+    lat_size, lon_size = lat_max - lat_min, lon_max - lon_min
+    lat_center, lon_center = (lat_min + lat_max) / 2, (lon_min + lon_max) / 2
+    cells = []
+    for dlat in (-1, 0, 1):
+        latitude = lat_center + dlat * lat_size
+        if not -90 < latitude < 90:
+            continue
+        for dlon in (-1, 0, 1):
+            longitude = (lon_center + dlon * lon_size + 180) % 360 - 180
+            cell = encode(latitude, longitude, len(geohash))
+            if cell not in cells:
+                cells.append(cell)
+    return cells
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (float(lat1), float(lon1), float(lat2), float(lon2)))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
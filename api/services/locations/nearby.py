@@ -0,0 +1,191 @@
+"""
+Búsquedas por cercanía sobre `Address.latitud` / `Address.longitud`.
+
+Las consultas filtran primero por los prefijos de geohash del bloque de
+3x3 celdas alrededor del punto (índice `idx_address_geohash`) y luego
+aplican haversine exacto en Python sobre esos pocos candidatos. Para
+conjuntos pequeños de puntos (puntos de recogida, zonas de entrega) hay
+un árbol k-d en memoria.
+"""
+import heapq
+import math
+import threading
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+
+from api.models.locations.models_locations import Address
+from utils.counts import get_model_version
+from .geohash import EARTH_RADIUS_KM, coverage_km, encode, haversine_km, neighbors, precision_for_radius
+
+GEOHASH_PRECISION = 12
+
+_trees = {}
+_trees_lock = threading.Lock()
+
+
+def _candidates(queryset, latitude, longitude, precision):
+    cells = neighbors(encode(latitude, longitude, precision))
+    return (
+        queryset
+        .filter(reduce(or_, [Q(geohash__startswith=cell) for cell in cells]))
+        .values_list('pk', 'latitud', 'longitud')
+    )
+
+
+def addresses_within(latitude, longitude, radius_km, queryset=None):
+    """
+    `[(address_id, distancia_km), ...]` dentro de `radius_km`, ordenado por distancia.
+    """
+    queryset = Address.objects.all() if queryset is None else queryset
+    precision = precision_for_radius(radius_km, latitude)
+    results = []
+    for pk, lat, lon in _candidates(queryset, latitude, longitude, precision).iterator(chunk_size=2000):
+        distance = haversine_km(latitude, longitude, lat, lon)
+        if distance <= radius_km:
+            results.append((pk, distance))
+    results.sort(key=lambda item: item[1])
+    return results
+
+
+def nearest_addresses(latitude, longitude, k=1, queryset=None, max_radius_km=None):
+    """
+    Las `k` direcciones más cercanas como `[(address_id, distancia_km), ...]`.
+
+    Empieza con celdas pequeñas y las agranda hasta que el k-ésimo
+    candidato está dentro del radio que el bloque de celdas garantiza.
+    """
+    queryset = Address.objects.all() if queryset is None else queryset
+    start = precision_for_radius(0.1, latitude)
+    stop = precision_for_radius(max_radius_km, latitude) if max_radius_km else 1
+    best = []
+    for precision in range(start, stop - 1, -1):
+        candidates = [
+            (haversine_km(latitude, longitude, lat, lon), pk)
+            for pk, lat, lon in _candidates(queryset, latitude, longitude, precision).iterator(chunk_size=2000)
+        ]
+        best = heapq.nsmallest(k, candidates)
+        if len(best) == k and best[-1][0] <= coverage_km(precision, latitude):
+            break
+    if max_radius_km:
+        best = [(distance, pk) for distance, pk in best if distance <= max_radius_km]
+    return [(pk, distance) for distance, pk in best]
+
+
+def refresh_geohashes(queryset=None, batch_size=1000):
+    """Completa `Address.geohash` por lotes con `bulk_update`."""
+    queryset = Address.objects.all() if queryset is None else queryset
+    changed = 0
+    batch = []
+    rows = queryset.order_by().only('id', 'latitud', 'longitud', 'geohash')
+    for address in rows.iterator(chunk_size=batch_size):
+        geohash = address.compute_geohash()
+        if geohash != address.geohash:
+            address.geohash = geohash
+            batch.append(address)
+        if len(batch) >= batch_size:
+            Address.objects.bulk_update(batch, ['geohash'])
+            changed += len(batch)
+            batch = []
+    if batch:
+        Address.objects.bulk_update(batch, ['geohash'])
+        changed += len(batch)
+    return changed
+
+
+def _to_xyz(latitude, longitude):
+    lat, lon = math.radians(float(latitude)), math.radians(float(longitude))
+    return (math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat))
+
+
+class PointTree:
+    """
+    Árbol k-d sobre coordenadas cartesianas de la esfera unitaria: la
+    distancia de cuerda crece igual que la distancia sobre la superficie.
+    """
+
+    def __init__(self, points):
+        # points: [(clave, latitud, longitud), ...]
+        self.nodes = []  # (xyz, clave, izquierda, derecha, eje)
+        items = [(_to_xyz(lat, lon), key) for key, lat, lon in points if lat is not None and lon is not None]
+        self.root = self._build(items, 0)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def _build(self, items, depth):
+        if not items:
+            return -1
+        axis = depth % 3
+        items.sort(key=lambda item: item[0][axis])
+        middle = len(items) // 2
+        index = len(self.nodes)
+        self.nodes.append(None)
+        left = self._build(items[:middle], depth + 1)
+        right = self._build(items[middle + 1:], depth + 1)
+        self.nodes[index] = (items[middle][0], items[middle][1], left, right, axis)
+        return index
+
+    def nearest(self, latitude, longitude, k=1):
+        """`[(clave, distancia_km), ...]` de los `k` puntos más cercanos."""
+        target = _to_xyz(latitude, longitude)
+        heap = []  # (-distancia², clave)
+
+        def visit(index):
+            if index < 0:
+                return
+            point, key, left, right, axis = self.nodes[index]
+            distance = sum((a - b) ** 2 for a, b in zip(point, target))
+            if len(heap) < k:
+                heapq.heappush(heap, (-distance, key))
+            elif distance < -heap[0][0]:
+                heapq.heapreplace(heap, (-distance, key))
+            diff = target[axis] - point[axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            visit(near)
+            if len(heap) < k or diff ** 2 < -heap[0][0]:
+                visit(far)
+
+        visit(self.root)
+        return [
+            (key, 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(-distance) / 2)))
+            for distance, key in sorted(heap, reverse=True)
+        ]
+
+    def within(self, latitude, longitude, radius_km):
+        target = _to_xyz(latitude, longitude)
+        chord = 2 * math.sin(min(radius_km / EARTH_RADIUS_KM, math.pi) / 2)
+        limit = chord ** 2
+        results = []
+        stack = [self.root]
+        while stack:
+            index = stack.pop()
+            if index < 0:
+                continue
+            point, key, left, right, axis = self.nodes[index]
+            distance = sum((a - b) ** 2 for a, b in zip(point, target))
+            if distance <= limit:
+                results.append((key, 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(distance) / 2))))
+            diff = target[axis] - point[axis]
+            stack.append(left if diff < 0 else right)
+            if diff ** 2 <= limit:
+                stack.append(right if diff < 0 else left)
+        results.sort(key=lambda item: item[1])
+        return results
+
+
+def get_point_tree(name, queryset, lat_field='latitud', lon_field='longitud'):
+    """
+    Árbol k-d cacheado en el proceso para un conjunto pequeño de puntos.
+    Se reconstruye cuando cambia cualquier fila del modelo del queryset.
+    """
+    version = get_model_version(queryset.model)
+    cached = _trees.get(name)
+    if cached is None or cached[0] != version:
+        with _trees_lock:
+            cached = _trees.get(name)
+            if cached is None or cached[0] != version:
+                tree = PointTree(queryset.values_list('pk', lat_field, lon_field))
+                cached = _trees[name] = (version, tree)
+    return cached[1]
@@ -0,0 +1,155 @@
+"""
+Archivo frío de órdenes.
+
+Las órdenes entregadas o canceladas con más de `ORDER_ARCHIVE_AFTER_DAYS`
+días se mueven, con sus líneas, historial y pagos, a tablas `*_archive`
+con las mismas columnas (ver `utils.archive.archive_model`). Las tablas
+calientes y sus índices quedan con las órdenes vivas.
+
+Cada lote es una transacción: `INSERT INTO <archivo> SELECT ... FROM
+<tabla> WHERE order_id IN (...)` por tabla y luego `DELETE` de las
+tablas calientes, hijas primero. Un corte a mitad de camino deja el lote
+entero en un lado o en el otro, así que volver a ejecutar continúa donde
+quedó. Las lecturas siguen funcionando con
+`Order.objects.get_or_archived(...)`.
+
+En PostgreSQL el espacio de los índices no se devuelve al borrar: con
+`reindex=True` se reconstruyen con `REINDEX TABLE CONCURRENTLY` y el
+informe mide el tamaño antes y después.
+"""
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+from api.models.orders.models_orders import (
+    ArchivedOrder, ArchivedOrderItem, ArchivedOrderStatusHistory, Order, OrderItem, OrderStatusHistory,
+)
+from api.models.payments.models_payments import ArchivedOrderPayment, ArchivedPayment, OrderPayment, Payment
+from utils.counts import invalidate_counts
+
+ARCHIVE_STATUSES = [Order.Status.DELIVERED, Order.Status.CANCELLED]
+
+# (tabla caliente, archivo, columna con el id de la orden); hijas antes que la orden
+TABLES = [
+    (OrderItem, ArchivedOrderItem, 'order_id'),
+    (OrderStatusHistory, ArchivedOrderStatusHistory, 'order_id'),
+    (OrderPayment, ArchivedOrderPayment, 'order_id'),
+    (Payment, ArchivedPayment, 'order_id'),
+    (Order, ArchivedOrder, 'id'),
+]
+
+
+@dataclass
+class ArchiveReport:
+    orders: int = 0
+    rows: dict = field(default_factory=dict)  # {tabla: filas movidas}
+    batches: int = 0
+    elapsed: float = 0.0
+    index_bytes_before: int = None
+    index_bytes_after: int = None
+
+    @property
+    def total_rows(self):
+        return sum(self.rows.values())
+
+    @property
+    def rows_per_second(self):
+        return self.total_rows / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def index_bytes_saved(self):
+        if self.index_bytes_before is None or self.index_bytes_after is None:
+            return None
+        return self.index_bytes_before - self.index_bytes_after
+
+
+def archivable(older_than_days=None):
+    days = getattr(settings, 'ORDER_ARCHIVE_AFTER_DAYS', 365) if older_than_days is None else older_than_days
+    cutoff = timezone.now() - timedelta(days=days)
+    return Order.objects.filter(status__in=ARCHIVE_STATUSES, created_at__lt=cutoff)
+
+
+def index_bytes(connection, models):
+    """Tamaño total de los índices de las tablas; None si la base no lo expone"""
+    tables = [model._meta.db_table for model in models]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute("SELECT COALESCE(SUM(pg_indexes_size(t::regclass)), 0) FROM unnest(%s) AS t", [tables])
+            return int(cursor.fetchone()[0])
+        if connection.vendor == 'sqlite':
+            try:
+                placeholders = ', '.join(['%s'] * len(tables))
+                cursor.execute(
+                    "SELECT COALESCE(SUM(s.pgsize), 0) FROM dbstat s JOIN sqlite_master m ON m.name = s.name "
+                    f"WHERE m.type = 'index' AND m.tbl_name IN ({placeholders})", tables,
+                )
+                return int(cursor.fetchone()[0])
+            except Exception:
+                return None  # SQLite compilado sin la tabla virtual dbstat
+    return None
+
+
+def _move(connection, hot, archive, column, ids):
+    """Copia al archivo y borra de la tabla caliente las filas de `ids`"""
+    qn = connection.ops.quote_name
+    columns = ', '.join(qn(f.column) for f in hot._meta.concrete_fields)
+    if connection.vendor == 'postgresql':
+        where, params = f"{qn(column)} = ANY(%s)", [list(ids)]
+    else:
+        where, params = f"{qn(column)} IN ({', '.join(['%s'] * len(ids))})", list(ids)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {qn(archive._meta.db_table)} ({columns}) "
+            f"SELECT {columns} FROM {qn(hot._meta.db_table)} WHERE {where}", params,
+        )
+        # DELETE directo: el collector de Django cargaría cada fila por las señales post_delete
+        cursor.execute(f"DELETE FROM {qn(hot._meta.db_table)} WHERE {where}", params)
+        return cursor.rowcount
+
+
+def archive_orders(older_than_days=None, batch_size=1000, max_batches=None, reindex=False, progress=None):
+    """
+    Mueve al archivo las órdenes de `archivable()` en lotes de
+    `batch_size`. `progress(report)` se llama después de cada lote.
+    """
+    connection = connections[Order.objects.db]
+    hot_models = [hot for hot, _, _ in TABLES]
+    report = ArchiveReport(rows={hot._meta.db_table: 0 for hot in hot_models})
+    report.index_bytes_before = index_bytes(connection, hot_models)
+    queryset = archivable(older_than_days).order_by('pk')
+
+    started = time.perf_counter()
+    last_pk = 0
+    while max_batches is None or report.batches < max_batches:
+        with transaction.atomic():
+            # Bloquea las órdenes del lote: una transición concurrente espera o queda fuera
+            ids = list(
+                queryset.filter(pk__gt=last_pk).select_for_update(skip_locked=True)
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            for hot, archive, column in TABLES:
+                report.rows[hot._meta.db_table] += _move(connection, hot, archive, column, ids)
+        last_pk = ids[-1]
+        report.orders += len(ids)
+        report.batches += 1
+        report.elapsed = time.perf_counter() - started
+        if progress:
+            progress(report)
+    report.elapsed = time.perf_counter() - started
+
+    if report.orders:
+        for hot in hot_models:
+            invalidate_counts(hot)
+        if reindex and connection.vendor == 'postgresql':
+            # CONCURRENTLY no admite transacción: una sentencia por tabla en autocommit
+            with connection.cursor() as cursor:
+                for hot in hot_models:
+                    cursor.execute(f"REINDEX TABLE CONCURRENTLY {connection.ops.quote_name(hot._meta.db_table)}")
+    report.index_bytes_after = index_bytes(connection, hot_models)
+    return report
@@ -0,0 +1,447 @@
+"""
+Carrito en caché con escritura diferida a `shopping_carts`/`cart_items`.
+
+Cada carrito vive como una entrada de la caché `CART_CACHE_ALIAS`
+(`LocMemCache` propia en pruebas y desarrollo; en producción una
+compartida entre procesos y sin expulsión por memoria). Agregar, cambiar la
+cantidad o quitar una línea solo modifica esa entrada; la base se
+escribe por lotes:
+
+    - en el checkout (`checkout` llama a `flush_cart` antes de leer las
+      líneas y a `forget_cart` al terminar, con `cart_lock` tomado todo
+      el tiempo para que ningún cambio caiga entre los dos);
+    - a intervalos: `flush_dirty` (comando `flush_carts`) persiste todos
+      los carritos pendientes con un `bulk_create`, un `bulk_update` y
+      un `DELETE` para todo el lote;
+    - antes de soltar la entrada: `evict_cart`, y cualquier carrito con
+      cambios más viejos que `CART_FLUSH_INTERVAL` se persiste en su
+      siguiente cambio, así que lo que una expulsión de la caché puede
+      perder está acotado por ese intervalo.
+
+Las mutaciones de un carrito se serializan con un candado `cache.add`;
+los carritos pendientes se anotan con una secuencia `cache.incr`, ambas
+operaciones atómicas en todos los backends de Django. Una línea sin
+producto ni diseño se rechaza al agregarla, igual que la restricción
+`product_or_design_required`, y el precio se fija en ese momento como
+hacía `CartItem.save`.
+"""
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from api.models.editor.models_editor import CustomDesign
+from api.models.orders.models_orders import CartItem, ShoppingCart
+from api.models.products.models_products import Product
+from api.services.products.pricing import resolve_prices
+from utils.caches import is_shared_cache
+
+CART_KEY_PREFIX = 'cart'
+LOCK_KEY_PREFIX = 'cart_lock'
+DIRTY_SEQUENCE_KEY = 'cart_dirty_seq'
+DIRTY_KEY_PREFIX = 'cart_dirty'
+FLUSHED_KEY = 'cart_dirty_flushed'
+LOCK_TIMEOUT = 10  # Segundos; un proceso caído con el candado no bloquea el carrito más que esto
+
+
+class CartLocked(Exception):
+    pass
+
+
+class CartPersistError(Exception):
+    pass
+
+
+@dataclass
+class FlushReport:
+    carts: int = 0
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+    skipped: int = 0  # carritos con el candado tomado; quedan para la próxima vez
+    dropped: int = 0  # líneas descartadas porque su producto o diseño ya no existe
+    failed: list = field(default_factory=list)  # ids de carritos que no se pudieron escribir
+
+
+def _cache():
+    return caches[getattr(settings, 'CART_CACHE_ALIAS', 'default')]
+
+
+def cache_is_shared():
+    """False si la caché de carritos es local al proceso (cada worker tendría su copia)"""
+    return is_shared_cache(getattr(settings, 'CART_CACHE_ALIAS', 'default'))
+
+
+def _ttl():
+    return getattr(settings, 'CART_CACHE_TTL', 7 * 24 * 3600)
+
+
+def _cart_key(cart_id):
+    return f"{CART_KEY_PREFIX}:{cart_id}"
+
+
+def _line_key(product_id, custom_design_id):
+    return f"{product_id or ''}:{custom_design_id or ''}"
+
+
+def _acquire(cart_id, wait=True):
+    cache = _cache()
+    key = f"{LOCK_KEY_PREFIX}:{cart_id}"
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while not cache.add(key, 1, LOCK_TIMEOUT):
+        if not wait or time.monotonic() >= deadline:
+            raise CartLocked(cart_id)
+        time.sleep(0.002)
+
+
+def _release(cart_id):
+    _cache().delete(f"{LOCK_KEY_PREFIX}:{cart_id}")
+
+
+@contextmanager
+def cart_lock(cart_id):
+    """
+    Bloquea el carrito frente a mutaciones y barridos durante el bloque
+    (checkout: de `flush_cart` a `forget_cart`). Lanza `CartLocked` si no
+    se obtiene en `LOCK_TIMEOUT` segundos.
+    """
+    _acquire(cart_id)
+    try:
+        yield
+    finally:
+        _release(cart_id)
+
+
+def _load(cart_id):
+    """Estado del carrito desde la base (dos consultas)"""
+    cart = ShoppingCart.objects.filter(pk=cart_id).values('pk', 'user_id', 'session_id').first()
+    if cart is None:
+        raise ShoppingCart.DoesNotExist(f"No existe el carrito {cart_id}")
+    lines, duplicates = {}, []
+    for item in CartItem.objects.filter(cart_id=cart_id).order_by('pk').values(
+        'pk', 'product_id', 'custom_design_id', 'quantity', 'price',
+    ):
+        key = _line_key(item['product_id'], item['custom_design_id'])
+        if key in lines:
+            # Filas repetidas de antes del carrito en caché: se funden en la primera
+            lines[key]['quantity'] += item['quantity']
+            lines[key]['dirty'] = True
+            duplicates.append(item['pk'])
+            continue
+        lines[key] = {
+            'id': item['pk'],
+            'product_id': item['product_id'],
+            'custom_design_id': item['custom_design_id'],
+            'quantity': item['quantity'],
+            'price': item['price'],
+            'dirty': False,
+        }
+    state = {
+        'cart_id': cart['pk'],
+        'user_id': cart['user_id'],
+        'session_id': cart['session_id'],
+        'lines': lines,
+        'removed': duplicates,  # ids de cart_items por borrar
+        'dirty_since': None,    # time.time() del primer cambio sin persistir
+    }
+    if duplicates:
+        _mark_dirty(state)
+    return state
+
+
+def _state(cart_id):
+    cache = _cache()
+    state = cache.get(_cart_key(cart_id))
+    if state is None:
+        state = _load(cart_id)
+        cache.set(_cart_key(cart_id), state, _ttl())
+    return state
+
+
+def _enqueue(cart_id):
+    cache = _cache()
+    cache.add(DIRTY_SEQUENCE_KEY, 0, None)
+    sequence = cache.incr(DIRTY_SEQUENCE_KEY)
+    cache.set(f"{DIRTY_KEY_PREFIX}:{sequence}", cart_id, _ttl())
+
+
+def _mark_dirty(state):
+    if state['dirty_since'] is None:
+        state['dirty_since'] = time.time()
+        _enqueue(state['cart_id'])
+
+
+def _mutate(cart_id, change):
+    """Aplica `change(state)` con el carrito bloqueado y guarda la entrada"""
+    _acquire(cart_id)
+    try:
+        state = _state(cart_id)
+        change(state)
+        stale = state['dirty_since'] is not None and (
+            time.time() - state['dirty_since'] >= getattr(settings, 'CART_FLUSH_INTERVAL', 30)
+        )
+        if stale:
+            _persist([state])
+        _cache().set(_cart_key(cart_id), state, _ttl())
+        return state
+    finally:
+        _release(cart_id)
+
+
+def get_or_create_cart(user=None, session_id=None):
+    """Id del carrito más reciente del usuario o la sesión; lo crea si no existe"""
+    user_id = getattr(user, 'pk', user)
+    if user_id is None and not session_id:
+        raise ValueError("El carrito necesita un usuario o un id de sesión.")
+    owner = {'user_id': user_id} if user_id is not None else {'session_id': session_id, 'user__isnull': True}
+    owner_key = f"{CART_KEY_PREFIX}_owner:{user_id if user_id is not None else 's:' + session_id}"
+    cache = _cache()
+    cart_id = cache.get(owner_key)
+    if cart_id is None:
+        cart_id = ShoppingCart.objects.filter(**owner).order_by('-created_at').values_list('pk', flat=True).first()
+        if cart_id is None:
+            cart_id = ShoppingCart.objects.create(user_id=user_id, session_id=session_id).pk
+        cache.set(owner_key, cart_id, _ttl())
+    return cart_id
+
+
+def cart_lines(cart_id):
+    """Líneas vigentes del carrito (incluidas las que aún no están en la base)"""
+    return [
+        {key: line[key] for key in ('id', 'product_id', 'custom_design_id', 'quantity', 'price')}
+        for line in _state(cart_id)['lines'].values()
+    ]
+
+
+def add_item(cart_id, product_id=None, custom_design_id=None, quantity=1):
+    """Suma `quantity` a la línea del producto o diseño; la crea si no existe"""
+    if product_id is None and custom_design_id is None:
+        raise ValueError("La línea necesita un producto o un diseño personalizado.")
+    if quantity < 1:
+        raise ValueError("La cantidad debe ser positiva.")
+    key = _line_key(product_id, custom_design_id)
+
+    def change(state):
+        line = state['lines'].get(key)
+        if line is None:
+            price = resolve_prices([{'product_id': product_id, 'custom_design_id': custom_design_id}])[0].unit_price
+            line = state['lines'][key] = {
+                'id': None, 'product_id': product_id, 'custom_design_id': custom_design_id,
+                'quantity': 0, 'price': price, 'dirty': True,
+            }
+        line['quantity'] += quantity
+        line['dirty'] = True
+        _mark_dirty(state)
+
+    return _mutate(cart_id, change)
+
+
+def set_quantity(cart_id, quantity, product_id=None, custom_design_id=None):
+    """Fija la cantidad de una línea existente; 0 la quita"""
+    key = _line_key(product_id, custom_design_id)
+
+    def change(state):
+        line = state['lines'].get(key)
+        if line is None:
+            raise KeyError(f"El carrito {cart_id} no tiene la línea {key}")
+        if quantity <= 0:
+            del state['lines'][key]
+            if line['id'] is not None:
+                state['removed'].append(line['id'])
+        else:
+            line['quantity'] = quantity
+            line['dirty'] = True
+        _mark_dirty(state)
+
+    return _mutate(cart_id, change)
+
+
+def remove_item(cart_id, product_id=None, custom_design_id=None):
+    return set_quantity(cart_id, 0, product_id=product_id, custom_design_id=custom_design_id)
+
+
+def clear_cart(cart_id):
+    def change(state):
+        state['removed'].extend(line['id'] for line in state['lines'].values() if line['id'] is not None)
+        state['lines'] = {}
+        _mark_dirty(state)
+
+    return _mutate(cart_id, change)
+
+
+def _write(states, report):
+    """Un `bulk_create`, un `bulk_update` y un `DELETE` para todos los `states`"""
+    existing = set(ShoppingCart.objects.filter(pk__in=[s['cart_id'] for s in states]).values_list('pk', flat=True))
+
+    created, updated, removed = [], [], []
+    for state in states:
+        if state['cart_id'] not in existing:
+            continue  # carrito borrado en la base (p. ej. con su usuario)
+        removed.extend(state['removed'])
+        for line in state['lines'].values():
+            if not line['dirty']:
+                continue
+            item = CartItem(
+                pk=line['id'], cart_id=state['cart_id'], product_id=line['product_id'],
+                custom_design_id=line['custom_design_id'], quantity=line['quantity'], price=line['price'],
+            )
+            (updated if line['id'] else created).append((line, item))
+
+    deleted = 0
+    with transaction.atomic():
+        if removed:
+            deleted = CartItem.objects.filter(pk__in=removed).delete()[0]
+        if created:
+            CartItem.objects.bulk_create([item for _, item in created], batch_size=1000)
+        if updated:
+            CartItem.objects.bulk_update([item for _, item in updated], ['quantity', 'price'], batch_size=1000)
+        ShoppingCart.objects.filter(pk__in=existing).update(updated_at=timezone.now())
+
+    for line, item in created:
+        line['id'] = item.pk
+    for line, _ in created + updated:
+        line['dirty'] = False
+    for state in states:
+        state['removed'] = []
+        state['dirty_since'] = None
+    report.carts += len(states)
+    report.created += len(created)
+    report.updated += len(updated)
+    report.deleted += deleted
+
+
+def _drop_missing(state):
+    """Quita las líneas cuyo producto o diseño se borró después de cachear el carrito"""
+    lines = state['lines']
+    products = {line['product_id'] for line in lines.values()} - {None}
+    designs = {line['custom_design_id'] for line in lines.values()} - {None}
+    products = set(Product.objects.filter(pk__in=products).values_list('pk', flat=True)) if products else set()
+    designs = set(CustomDesign.objects.filter(pk__in=designs).values_list('pk', flat=True)) if designs else set()
+    missing = [
+        key for key, line in lines.items()
+        if (line['product_id'] is not None and line['product_id'] not in products)
+        or (line['custom_design_id'] is not None and line['custom_design_id'] not in designs)
+    ]
+    for key in missing:
+        line = lines.pop(key)
+        if line['id'] is not None:
+            state['removed'].append(line['id'])
+    return len(missing)
+
+
+def _persist(states, report=None):
+    """
+    Escribe en la base los cambios de `states` (carritos ya bloqueados),
+    todo el lote en una transacción. Si el lote falla, cada carrito se
+    reintenta por separado (sin las líneas de productos o diseños
+    borrados); los que aun así fallan quedan en `report.failed`, con sus
+    cambios en la caché, y no frenan al resto.
+    """
+    report = report or FlushReport()
+    states = [state for state in states if state['dirty_since'] is not None]
+    if not states:
+        return report
+    try:
+        _write(states, report)
+        return report
+    except DatabaseError:
+        pass
+    for state in states:
+        try:
+            _write([state], report)
+            continue
+        except DatabaseError:
+            pass
+        report.dropped += _drop_missing(state)
+        try:
+            _write([state], report)
+        except DatabaseError:
+            report.failed.append(state['cart_id'])
+    return report
+
+
+def flush_cart(cart_id, locked=False):
+    """
+    Persiste los cambios pendientes de un carrito (checkout). `locked=True`
+    si el llamador ya tiene `cart_lock`. Lanza `CartPersistError` si no se
+    pudieron escribir.
+    """
+    if not locked:
+        with cart_lock(cart_id):
+            return flush_cart(cart_id, locked=True)
+    cache = _cache()
+    state = cache.get(_cart_key(cart_id))
+    if state is None:
+        return FlushReport()
+    report = _persist([state])
+    cache.set(_cart_key(cart_id), state, _ttl())
+    if report.failed:
+        raise CartPersistError(f"No se pudieron guardar los cambios del carrito {cart_id}")
+    return report
+
+
+def forget_cart(cart_id):
+    """Descarta la entrada de la caché; la próxima lectura carga la base"""
+    _cache().delete(_cart_key(cart_id))
+
+
+def evict_cart(cart_id):
+    """Persiste y suelta la entrada (carritos inactivos, cierre de sesión)"""
+    _acquire(cart_id)
+    try:
+        state = _cache().get(_cart_key(cart_id))
+        report = _persist([state]) if state is not None else FlushReport()
+        if not report.failed:
+            forget_cart(cart_id)  # si falló, los cambios siguen solo en la caché
+        return report
+    finally:
+        _release(cart_id)
+
+
+def flush_dirty(batch_size=500):
+    """
+    Persiste los carritos anotados como pendientes desde el último
+    barrido, en lotes de `batch_size` carritos. Un carrito que no se puede
+    escribir queda en `report.failed`, vuelve a la cola para el próximo
+    barrido y este sigue con los demás.
+    """
+    cache = _cache()
+    report = FlushReport()
+    last = cache.get(FLUSHED_KEY, 0)
+    current = cache.get(DIRTY_SEQUENCE_KEY, 0)
+    while last < current:
+        end = min(last + batch_size, current)
+        keys = [f"{DIRTY_KEY_PREFIX}:{sequence}" for sequence in range(last + 1, end + 1)]
+        cart_ids = list(dict.fromkeys(cache.get_many(keys).values()))
+
+        locked, states = [], []
+        for cart_id in cart_ids:
+            try:
+                _acquire(cart_id, wait=False)
+            except CartLocked:
+                report.skipped += 1  # en plena mutación: vuelve a la cola para el próximo barrido
+                _enqueue(cart_id)
+                continue
+            locked.append(cart_id)
+            state = cache.get(_cart_key(cart_id))
+            if state is not None:
+                states.append(state)
+        failed = len(report.failed)
+        try:
+            _persist(states, report)
+            cache.set_many({_cart_key(state['cart_id']): state for state in states}, _ttl())
+        finally:
+            for cart_id in locked:
+                _release(cart_id)
+        for cart_id in report.failed[failed:]:
+            # Sigue con `dirty_since` puesto, así que `_mark_dirty` no lo volvería a anotar
+            _enqueue(cart_id)
+
+        cache.delete_many(keys)
+        last = end
+        cache.set(FLUSHED_KEY, last, None)
+    return report
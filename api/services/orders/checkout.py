@@ -0,0 +1,169 @@
+"""
+Checkout: convierte un `ShoppingCart` en `Order` por conjuntos.
+
+Todo ocurre en una transacción con el carrito bloqueado
+(`select_for_update`), así que dos checkouts simultáneos del mismo
+carrito no pueden crear dos órdenes; el candado del carrito en caché
+(`cart_lock`) se mantiene desde `flush_cart` hasta `forget_cart`. Precios, nombres de producto y
+vistas previas de diseños se resuelven para todas las líneas a la vez y
+los `OrderItem` se insertan con un único `bulk_create`; el número de
+consultas no depende de cuántas líneas tenga el carrito.
+"""
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+
+from api.models.editor.models_editor import CustomDesign
+from api.models.locations.models_locations import Address
+from api.models.orders.models_orders import CartItem, Order, OrderItem, OrderStatusHistory, ShoppingCart
+from api.models.products.models_products import Product
+from api.services.inventory.reservations import commit_reservations
+from api.services.products.pricing import money, resolve_prices
+from utils.counts import invalidate_counts
+from .cart_store import CartLocked, CartPersistError, cart_lock, flush_cart, forget_cart
+from .shipping import quote_methods, shipment_weight
+
+
+class CheckoutError(Exception):
+    pass
+
+
+@dataclass
+class OrderTotals:
+    subtotal: Decimal
+    discount_amount: Decimal
+    tax_amount: Decimal
+    shipping_cost: Decimal
+    total: Decimal
+
+
+def compute_totals(priced_lines, shipping_cost, discount_amount=0, tax_rate=None):
+    """Totales de la orden: IVA sobre el subtotal con descuento, más envío"""
+    tax_rate = Decimal(str(getattr(settings, 'ORDER_TAX_RATE', 0) if tax_rate is None else tax_rate))
+    subtotal = money(sum((line.subtotal for line in priced_lines), Decimal(0)))
+    discount_amount = min(money(discount_amount), subtotal)
+    tax_amount = money((subtotal - discount_amount) * tax_rate)
+    shipping_cost = money(shipping_cost)
+    return OrderTotals(
+        subtotal=subtotal,
+        discount_amount=discount_amount,
+        tax_amount=tax_amount,
+        shipping_cost=shipping_cost,
+        total=subtotal - discount_amount + tax_amount + shipping_cost,
+    )
+
+
+def _addresses(user_id, shipping_address_id, billing_address_id):
+    addresses = dict(
+        Address.objects.filter(pk__in={shipping_address_id, billing_address_id}, user_id=user_id)
+        .values_list('pk', 'municipio_id')
+    )
+    if shipping_address_id not in addresses or billing_address_id not in addresses:
+        raise CheckoutError("La dirección no pertenece al usuario del carrito.")
+    return addresses
+
+
+def checkout(cart, shipping_address, billing_address=None, shipping_method=Order.ShippingMethod.STANDARD,
+             payment_method=None, discount_amount=0, notes=None, changed_by='checkout', reservation_reference=None):
+    """
+    Crea la orden del carrito y vacía el carrito. Devuelve la `Order`.
+
+    `shipping_address` y `billing_address` aceptan instancias o ids. Si el
+    stock se reservó al armar el carrito, `reservation_reference` confirma
+    esas reservas en la misma transacción.
+    """
+    cart_id = getattr(cart, 'pk', cart)
+    shipping_address_id = getattr(shipping_address, 'pk', shipping_address)
+    billing_address_id = getattr(billing_address, 'pk', billing_address) or shipping_address_id
+
+    # El candado del carrito en caché cubre desde la escritura diferida hasta descartar la
+    # entrada: un cambio que llegue mientras tanto espera y se aplica sobre el carrito ya vacío
+    try:
+        with cart_lock(cart_id):
+            # Cambios del carrito aún en caché (escritura diferida): a la base antes de leer las líneas
+            flush_cart(cart_id, locked=True)
+            with transaction.atomic():
+                cart = ShoppingCart.objects.select_for_update().get(pk=cart_id)
+                if cart.user_id is None:
+                    raise CheckoutError("El carrito debe pertenecer a un usuario para crear la orden.")
+                items = list(CartItem.objects.filter(cart_id=cart_id).order_by('pk').values(
+                    'pk', 'product_id', 'custom_design_id', 'quantity',
+                ))
+                if not items:
+                    raise CheckoutError("El carrito está vacío.")
+
+                try:
+                    priced = resolve_prices(items)
+                except ValueError as exc:
+                    raise CheckoutError(str(exc)) from exc
+
+                # Snapshots para todas las líneas: una consulta de productos y otra de diseños
+                products = {
+                    pk: (name, is_active)
+                    for pk, name, is_active in Product.objects.filter(pk__in={line.product_id for line in priced})
+                    .values_list('pk', 'name', 'is_active')
+                }
+                inactive = sorted(pk for pk, (_, is_active) in products.items() if not is_active)
+                if inactive:
+                    raise CheckoutError(f"Productos no disponibles: {inactive}")
+                design_ids = {line.custom_design_id for line in priced} - {None}
+                previews = {
+                    pk: thumbnail or image
+                    for pk, thumbnail, image in CustomDesign.objects.filter(pk__in=design_ids)
+                    .values_list('pk', 'thumbnail_url', 'design_image_url')
+                } if design_ids else {}
+
+                addresses = _addresses(cart.user_id, shipping_address_id, billing_address_id)
+                quote = quote_methods(addresses[shipping_address_id], shipment_weight(priced), [shipping_method])
+                if shipping_method not in quote:
+                    raise CheckoutError(f"El método de envío '{shipping_method}' no está disponible para la dirección.")
+                totals = compute_totals(priced, quote[shipping_method].cost, discount_amount)
+
+                order = Order.objects.create(
+                    user_id=cart.user_id,
+                    shipping_address_id=shipping_address_id,
+                    billing_address_id=billing_address_id,
+                    shipping_method=shipping_method,
+                    payment_method=payment_method,
+                    notes=notes,
+                    subtotal=totals.subtotal,
+                    discount_amount=totals.discount_amount,
+                    tax_amount=totals.tax_amount,
+                    shipping_cost=totals.shipping_cost,
+                    total=totals.total,
+                )
+                OrderItem.objects.bulk_create([
+                    OrderItem(
+                        order=order,
+                        product_id=line.product_id,
+                        variant_id=line.variant_id,
+                        custom_design_id=line.custom_design_id,
+                        product_name=products[line.product_id][0],
+                        unit_price=line.unit_price,
+                        quantity=line.quantity,
+                        design_preview_url=previews.get(line.custom_design_id),
+                        subtotal=line.subtotal,
+                    )
+                    for line in priced
+                ])
+                OrderStatusHistory.objects.create(
+                    order=order,
+                    old_status=None,
+                    new_status=order.status,
+                    changed_by=changed_by,
+                    notes="Orden creada desde el carrito",
+                )
+                if reservation_reference:
+                    commit_reservations(reservation_reference)
+                CartItem.objects.filter(cart_id=cart_id).delete()
+            forget_cart(cart_id)
+    except CartLocked as exc:
+        raise CheckoutError("El carrito se está modificando; reintente.") from exc
+    except CartPersistError as exc:
+        raise CheckoutError(str(exc)) from exc
+
+    # bulk_create no emite post_save: invalidar a mano los conteos paginados
+    invalidate_counts(OrderItem)
+    return order
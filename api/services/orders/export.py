@@ -0,0 +1,206 @@
+"""
+Exportación de órdenes en streaming (CSV o NDJSON, opcionalmente gzip).
+
+La memoria no depende del número de órdenes:
+
+    - Las órdenes se leen con `QuerySet.iterator(chunk_size=...)`; en
+      PostgreSQL es un cursor del servidor, en otras bases lecturas por
+      bloques del cursor.
+    - Las líneas y los pagos se leen por lotes de órdenes consecutivas
+      (`order_id IN (...) ORDER BY order_id`), una consulta por lote y
+      tabla, y se unen con las órdenes del lote en memoria.
+    - Las órdenes archivadas del rango (`ArchivedOrder`, ver
+      `api.services.orders.archive`) salen igual, con sus tablas de
+      archivo; ambos cursores se intercalan por id.
+    - La salida se genera como un iterador de bytes agrupados en bloques
+      de ~64 KB; con gzip se comprime al vuelo con `zlib`.
+
+Los pagos son los de la pasarela (`OrderPayment`) y los de PayPal
+(`Payment`, con `payment_method='paypal'` y `paypal_id` como
+`transaction_id`), ordenados por fecha.
+
+CSV: una fila por línea de la orden (las órdenes sin líneas salen con las
+columnas de línea vacías) y los pagos resumidos en columnas de la orden.
+NDJSON: un objeto por orden con `items` y `payments` anidados.
+"""
+import csv
+import heapq
+import zlib
+from datetime import datetime, time, timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, QuerySet, Value
+from django.utils import timezone
+
+from api.models.orders.models_orders import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+from api.models.payments.models_payments import ArchivedOrderPayment, ArchivedPayment, OrderPayment, Payment
+
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+ORDER_FIELDS = [
+    'id', 'order_number', 'status', 'created_at', 'paid_at', 'cancelled_at', 'delivered_at',
+    'user_id', 'user__email', 'shipping_address__municipio_id', 'payment_method', 'shipping_method',
+    'subtotal', 'discount_amount', 'tax_amount', 'shipping_cost', 'total',
+]
+ITEM_FIELDS = [
+    'order_id', 'id', 'product_id', 'variant_id', 'custom_design_id',
+    'product_name', 'unit_price', 'quantity', 'subtotal',
+]
+PAYMENT_FIELDS = ['order_id', 'id', 'payment_method', 'status', 'amount', 'transaction_id', 'payment_date']
+# Los pagos de PayPal con las mismas claves que `PAYMENT_FIELDS`
+PAYPAL_FIELDS = ['order_id', 'id', 'status', 'amount']
+PAYPAL_EXPRESSIONS = {
+    'payment_method': Value('paypal'),
+    'transaction_id': F('paypal_id'),
+    'payment_date': F('created_at'),
+}
+PAID_STATUSES = {'completed', 'approved'}  # `OrderPayment` y `Payment`
+
+# Modelo de orden → (líneas, pagos de la pasarela, pagos de PayPal)
+RELATED_MODELS = {
+    Order: (OrderItem, OrderPayment, Payment),
+    ArchivedOrder: (ArchivedOrderItem, ArchivedOrderPayment, ArchivedPayment),
+}
+
+CSV_HEADER = [
+    *(field.replace('__', '_') for field in ORDER_FIELDS),
+    'paid_amount', 'transaction_ids',
+    *(f'item_{field}' for field in ITEM_FIELDS[1:]),
+]
+
+BUFFER_SIZE = 64 * 1024
+
+
+def export_queryset(start_date=None, end_date=None, statuses=None, model=Order):
+    """Órdenes creadas en [start_date, end_date] (fechas locales), opcionalmente por estado"""
+    queryset = model.objects.all()
+    tz = timezone.get_current_timezone()
+    if start_date:
+        queryset = queryset.filter(created_at__gte=timezone.make_aware(datetime.combine(start_date, time.min), tz))
+    if end_date:
+        until = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min), tz)
+        queryset = queryset.filter(created_at__lt=until)
+    if statuses:
+        queryset = queryset.filter(status__in=statuses)
+    return queryset
+
+
+def export_querysets(start_date=None, end_date=None, statuses=None):
+    """Órdenes vivas y archivadas del rango, para `export_orders`"""
+    return [export_queryset(start_date, end_date, statuses, model) for model in RELATED_MODELS]
+
+
+def _grouped(model, fields, order_ids, **expressions):
+    """{order_id: [filas]} de un lote, leído en orden de clave"""
+    grouped = {}
+    rows = model.objects.filter(order_id__in=order_ids).order_by('order_id', 'pk').values(*fields, **expressions)
+    for row in rows:
+        grouped.setdefault(row.pop('order_id'), []).append(row)
+    return grouped
+
+
+def _iter_source(queryset, chunk_size):
+    item_model, payment_model, paypal_model = RELATED_MODELS[queryset.model]
+    orders = queryset.order_by('pk').values(*ORDER_FIELDS).iterator(chunk_size=chunk_size)
+    while True:
+        batch = list(islice(orders, chunk_size))
+        if not batch:
+            return
+        ids = [order['id'] for order in batch]
+        items = _grouped(item_model, ITEM_FIELDS, ids)
+        payments = _grouped(payment_model, PAYMENT_FIELDS, ids)
+        paypal = _grouped(paypal_model, PAYPAL_FIELDS, ids, **PAYPAL_EXPRESSIONS)
+        for order in batch:
+            order_payments = payments.get(order['id'], []) + paypal.get(order['id'], [])
+            order_payments.sort(key=lambda payment: payment['payment_date'])
+            yield order, items.get(order['id'], []), order_payments
+
+
+def iter_orders(querysets, chunk_size=None):
+    """
+    Genera `(orden, líneas, pagos)` en orden de id a partir de uno o
+    varios querysets de `Order`/`ArchivedOrder`. Por cada `chunk_size`
+    órdenes de cada uno se hacen tres consultas: líneas, pagos de la
+    pasarela y pagos de PayPal del lote.
+    """
+    chunk_size = chunk_size or getattr(settings, 'ORDER_EXPORT_CHUNK_SIZE', 2000)
+    if isinstance(querysets, QuerySet):
+        querysets = [querysets]
+    sources = [_iter_source(queryset, chunk_size) for queryset in querysets]
+    yield from heapq.merge(*sources, key=lambda row: row[0]['id'])
+
+
+class _Line:
+    """Destino de `csv.writer` que devuelve la línea en vez de escribirla"""
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return '' if value is None else value
+
+
+def csv_lines(rows):
+    writer = csv.writer(_Line())
+    yield writer.writerow(CSV_HEADER)
+    for order, items, payments in rows:
+        head = [_csv_value(order[field]) for field in ORDER_FIELDS]
+        head.append(sum((p['amount'] for p in payments if p['status'] in PAID_STATUSES), 0))
+        head.append(';'.join(p['transaction_id'] for p in payments if p['transaction_id']))
+        for item in items or [None]:
+            tail = [_csv_value(item[field]) for field in ITEM_FIELDS[1:]] if item else [''] * (len(ITEM_FIELDS) - 1)
+            yield writer.writerow(head + tail)
+
+
+def ndjson_lines(rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for order, items, payments in rows:
+        order = {field.replace('__', '_'): value for field, value in order.items()}
+        yield encoder.encode({**order, 'items': items, 'payments': payments}) + '\n'
+
+
+def _buffered(lines):
+    """Agrupa líneas de texto en bloques de bytes de ~BUFFER_SIZE"""
+    buffer, size = [], 0
+    for line in lines:
+        data = line.encode('utf-8')
+        buffer.append(data)
+        size += len(data)
+        if size >= BUFFER_SIZE:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def _gzipped(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: cabecera gzip
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_orders(querysets, output='csv', gzip=False, chunk_size=None):
+    """
+    Iterador de bytes con la exportación; apto para `StreamingHttpResponse`.
+    `querysets`: uno o varios, p. ej. `export_querysets(...)`.
+    """
+    if output not in FORMATS:
+        raise ValueError(f"Formato desconocido: {output}; opciones: {', '.join(FORMATS)}")
+    lines = csv_lines if output == 'csv' else ndjson_lines
+    chunks = _buffered(lines(iter_orders(querysets, chunk_size)))
+    return _gzipped(chunks) if gzip else chunks
+
+
+def export_filename(output, gzip=False):
+    extension = FORMATS[output][1] + ('.gz' if gzip else '')
+    return f"orders-{timezone.localdate():%Y%m%d}.{extension}"
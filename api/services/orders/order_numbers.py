@@ -0,0 +1,148 @@
+"""
+Asignación de números de orden por bloques preasignados.
+
+Cada proceso reserva `ORDER_NUMBER_BLOCK_SIZE` valores en un solo viaje a
+la base y los entrega desde memoria; asignar un número no toca la base
+salvo cuando se agota el bloque. Los valores reservados son únicos entre
+procesos y workers (gunicorn/uvicorn), así que nunca hace falta reintentar
+por `IntegrityError`.
+
+    - PostgreSQL: secuencia `<nombre>_number_seq`. La de `orders` la crea
+      la migración `0004_order_number_sequence`; cualquier otra se crea en
+      una conexión aparte, confirmada fuera de la transacción del llamador.
+      `nextval` no es transaccional: un rollback de la orden no devuelve
+      el bloque a la secuencia, por eso es seguro reservar dentro de la
+      transacción del checkout.
+    - Otras bases: fila `OrderNumberCounter` incrementada con `F()`. Como
+      ese incremento sí se revierte con la transacción, dentro de un
+      bloque `atomic` se toma un único valor sin guardarlo en memoria.
+
+Los números sin usar de un bloque se pierden al reiniciar el proceso; las
+órdenes quedan con huecos, no con duplicados. Formato: `HS-000012345`,
+ocho dígitos más un dígito verificador de Luhn.
+"""
+import os
+import threading
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, connection, transaction
+from django.db.models import F
+
+from api.models.orders.models_orders import OrderNumberCounter
+
+DEFAULT_COUNTER = 'orders'
+
+_allocators = {}
+_allocators_lock = threading.Lock()
+
+
+def luhn_digit(number):
+    total = 0
+    for position, digit in enumerate(reversed(str(number))):
+        value = int(digit)
+        if position % 2 == 0:
+            value *= 2
+            if value > 9:
+                value -= 9
+        total += value
+    return (10 - total % 10) % 10
+
+
+def format_order_number(value, prefix=None):
+    prefix = getattr(settings, 'ORDER_NUMBER_PREFIX', 'HS') if prefix is None else prefix
+    return f"{prefix}-{value:08d}{luhn_digit(value)}"
+
+
+def is_valid_order_number(order_number):
+    """Comprueba el dígito verificador (detecta errores de digitación)"""
+    digits = order_number.rpartition('-')[2]
+    return digits.isdigit() and len(digits) > 1 and luhn_digit(int(digits[:-1])) == int(digits[-1])
+
+
+class OrderNumberAllocator:
+    def __init__(self, name=DEFAULT_COUNTER, block_size=None):
+        self.name = name
+        self.block_size = block_size or getattr(settings, 'ORDER_NUMBER_BLOCK_SIZE', 100)
+        self.sequence = f"{name}_number_seq"
+        self.blocks_reserved = 0
+        self._values = []  # bloque actual, en orden inverso para usar pop()
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def allocate(self):
+        """Siguiente valor numérico único"""
+        with self._lock:
+            if self._pid != os.getpid():
+                # Proceso hijo (fork de un worker): el bloque heredado es del padre
+                self._values, self._pid = [], os.getpid()
+            if not self._values:
+                if connection.vendor != 'postgresql' and connection.in_atomic_block:
+                    return self._reserve_counter(1)[0]
+                self._values = self._reserve()[::-1]
+                self.blocks_reserved += 1
+            return self._values.pop()
+
+    def next_number(self):
+        return format_order_number(self.allocate())
+
+    def _reserve(self):
+        if connection.vendor == 'postgresql':
+            return self._reserve_sequence(self.block_size)
+        return self._reserve_counter(self.block_size)
+
+    def _reserve_sequence(self, count):
+        with connection.cursor() as cursor:
+            try:
+                with transaction.atomic():
+                    cursor.execute(
+                        "SELECT nextval(%s) FROM generate_series(1, %s)", [self.sequence, count],
+                    )
+                    return sorted(row[0] for row in cursor.fetchall())
+            except DatabaseError:
+                return self._reserve_new_sequence(count)
+
+    def _reserve_new_sequence(self, count):
+        """
+        Crea la secuencia y toma el primer bloque en autocommit. Dentro de un
+        `atomic` (el checkout) usa una conexión aparte: creada en la
+        transacción del llamador, un rollback la borraría mientras este
+        proceso conserva el bloque, y el siguiente volvería a entregar
+        números desde 1. La transacción del llamador, que ya la buscó sin
+        éxito, tampoco la vería hasta terminar.
+        """
+        target = connection.copy() if connection.in_atomic_block else connection
+        try:
+            with target.cursor() as cursor:
+                # IF NOT EXISTS tolera la carrera entre procesos
+                cursor.execute(f'CREATE SEQUENCE IF NOT EXISTS "{self.sequence}"')
+                cursor.execute("SELECT nextval(%s) FROM generate_series(1, %s)", [self.sequence, count])
+                return sorted(row[0] for row in cursor.fetchall())
+        finally:
+            if target is not connection:
+                target.close()
+
+    def _reserve_counter(self, count):
+        with transaction.atomic():
+            counter = OrderNumberCounter.objects.filter(name=self.name)
+            if not counter.update(value=F('value') + count):
+                try:
+                    with transaction.atomic():
+                        OrderNumberCounter.objects.create(name=self.name, value=0)
+                except IntegrityError:
+                    pass  # otro proceso la creó primero
+                counter.update(value=F('value') + count)
+            # La fila queda bloqueada hasta el commit: nadie más puede leer este mismo valor
+            end = counter.values_list('value', flat=True).get()
+        return list(range(end - count + 1, end + 1))
+
+
+def get_allocator(name=DEFAULT_COUNTER):
+    allocator = _allocators.get(name)
+    if allocator is None:
+        with _allocators_lock:
+            allocator = _allocators.setdefault(name, OrderNumberAllocator(name))
+    return allocator
+
+
+def next_order_number(name=DEFAULT_COUNTER):
+    return get_allocator(name).next_number()
@@ -0,0 +1,228 @@
+"""
+Agregados de ventas diarios y por hora (`SalesDaily`, `SalesHourly`).
+
+Clave: periodo de `paid_at` (hora local), producto, método de pago y
+municipio de la dirección de envío. Los tableros leen solo estas tablas.
+
+    - Incremental: `record_transition` se llama desde la máquina de
+      estados en la misma transacción. Al pagar, suma las líneas de las
+      órdenes; al cancelar o reembolsar una orden ya pagada, las pasa de
+      ventas a reversiones. Cada caso es un único
+      `INSERT ... SELECT ... ON CONFLICT DO UPDATE` por tabla.
+    - Reconstrucción: `rebuild_rollups` borra un rango de fechas y lo
+      vuelve a llenar con un `INSERT ... SELECT` agregado.
+    - Verificación: `check_rollups` compara los agregados contra los
+      datos crudos y devuelve las diferencias.
+
+Las tres rutas usan la misma consulta de agregación, así que un rango
+reconstruido y uno mantenido incrementalmente coinciden. La reconstrucción
+y la verificación suman también las órdenes archivadas
+(`api.services.orders.archive`).
+"""
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.db import connections, transaction
+from django.db.models import Count, DecimalField, F, IntegerField, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate, TruncHour
+from django.utils import timezone
+
+from api.models.orders.models_orders import ArchivedOrderItem, Order, OrderItem, SalesDaily, SalesHourly
+
+REVERSED_STATUSES = [Order.Status.CANCELLED, Order.Status.REFUNDED]
+
+
+def _trunc_hour(expression):
+    # En UTC: el inicio de la hora es el mismo instante en cualquier zona con
+    # desfase entero, y SQLite no convierte de vuelta un truncado local
+    return TruncHour(expression, tzinfo=dt_timezone.utc)
+
+
+# (modelo, columna del periodo, truncado de paid_at)
+ROLLUPS = {
+    'daily': (SalesDaily, 'date', TruncDate),
+    'hourly': (SalesHourly, 'hour', _trunc_hour),
+}
+KEY_COLUMNS = ['product_id', 'payment_method', 'municipio_id']
+METRICS = ['orders', 'units', 'revenue', 'refunds', 'refunded_units', 'refunded_amount']
+
+# Alias de la consulta agregada -> columna de la tabla de agregados
+ALIASES = {
+    'bucket': None,  # columna del periodo, depende de la tabla
+    'product_key': 'product_id',
+    'payment_key': 'payment_method',
+    'municipio_key': 'municipio_id',
+    **{metric: metric for metric in METRICS},
+}
+
+
+def aggregate_items(items, trunc):
+    """Líneas de órdenes pagadas agrupadas por la clave de los agregados"""
+    reversed_q = Q(order__status__in=REVERSED_STATUSES)
+    zero = Value(Decimal('0'), output_field=DecimalField(max_digits=14, decimal_places=2))
+    return (
+        items.filter(order__paid_at__isnull=False)
+        .annotate(
+            bucket=trunc('order__paid_at'),
+            product_key=F('product_id'),
+            payment_key=Coalesce('order__payment_method', Value('')),
+            municipio_key=F('order__shipping_address__municipio_id'),
+        )
+        .values('bucket', 'product_key', 'payment_key', 'municipio_key')
+        .annotate(
+            orders=Coalesce(Count('order_id', distinct=True, filter=~reversed_q), 0, output_field=IntegerField()),
+            units=Coalesce(Sum('quantity', filter=~reversed_q), 0, output_field=IntegerField()),
+            revenue=Coalesce(Sum('subtotal', filter=~reversed_q), zero),
+            refunds=Coalesce(Count('order_id', distinct=True, filter=reversed_q), 0, output_field=IntegerField()),
+            refunded_units=Coalesce(Sum('quantity', filter=reversed_q), 0, output_field=IntegerField()),
+            refunded_amount=Coalesce(Sum('subtotal', filter=reversed_q), zero),
+        )
+        .order_by()
+    )
+
+
+def _insert_select(rollup, items, on_conflict=None):
+    """`INSERT INTO <agregado> SELECT ... FROM (<agregación>)` en una sentencia"""
+    model, period, trunc = ROLLUPS[rollup]
+    table = model._meta.db_table
+    connection = connections[model.objects.db]
+    qn = connection.ops.quote_name
+
+    sql, params = aggregate_items(items, trunc).query.get_compiler(connection=connection).as_sql()
+    columns = [qn(column or period) for column in ALIASES.values()]
+    # `WHERE true` evita que SQLite confunda el ON CONFLICT con un JOIN ... ON
+    statement = (
+        f"INSERT INTO {qn(table)} ({', '.join(columns)}) "
+        f"SELECT {', '.join(f'agg.{qn(alias)}' for alias in ALIASES)} FROM ({sql}) agg WHERE true"
+    )
+    if on_conflict:
+        key = ', '.join(qn(column) for column in [period, *KEY_COLUMNS])
+        assignments = ', '.join(f"{qn(column)} = {expression.format(t=qn(table))}" for column, expression in on_conflict.items())
+        statement += f" ON CONFLICT ({key}) DO UPDATE SET {assignments}"
+    with connection.cursor() as cursor:
+        cursor.execute(statement, params)
+        return cursor.rowcount
+
+
+# Al pagar se suman todas las métricas (las reversiones llegan en cero)
+APPLY = {metric: f'{{t}}.{metric} + EXCLUDED.{metric}' for metric in METRICS}
+
+# Al revertir una orden ya contada, sus líneas pasan de ventas a reversiones
+REVERSE = {
+    'orders': '{t}.orders - EXCLUDED.refunds',
+    'units': '{t}.units - EXCLUDED.refunded_units',
+    'revenue': '{t}.revenue - EXCLUDED.refunded_amount',
+    'refunds': '{t}.refunds + EXCLUDED.refunds',
+    'refunded_units': '{t}.refunded_units + EXCLUDED.refunded_units',
+    'refunded_amount': '{t}.refunded_amount + EXCLUDED.refunded_amount',
+}
+
+
+def record_transition(order_ids, new_status):
+    """
+    Aplica a los agregados el cambio de estado de `order_ids`. Debe
+    llamarse en la transacción que cambió el estado, después del UPDATE.
+    """
+    if not order_ids:
+        return  # lote sin órdenes cambiadas (todas rechazadas)
+    if new_status == Order.Status.PAID:
+        on_conflict = APPLY
+    elif new_status in REVERSED_STATUSES:
+        on_conflict = REVERSE
+    else:
+        return
+    items = OrderItem.objects.filter(order_id__in=order_ids)
+    for rollup in ROLLUPS:
+        _insert_select(rollup, items, on_conflict)
+
+
+def _window(start_date, end_date):
+    """Instantes locales [inicio de start_date, inicio del día siguiente a end_date)"""
+    tz = timezone.get_current_timezone()
+    return (
+        timezone.make_aware(datetime.combine(start_date, time.min), tz),
+        timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min), tz),
+    )
+
+
+def _stored(model, period, start_date, end_date):
+    if period == 'date':
+        return model.objects.filter(date__gte=start_date, date__lte=end_date)
+    since, until = _window(start_date, end_date)
+    return model.objects.filter(hour__gte=since, hour__lt=until)
+
+
+def _sources(start_date, end_date):
+    """Líneas pagadas en el rango: tabla caliente y archivo"""
+    since, until = _window(start_date, end_date)
+    return [
+        model.objects.filter(order__paid_at__gte=since, order__paid_at__lt=until)
+        for model in (OrderItem, ArchivedOrderItem)
+    ]
+
+
+def rebuild_rollups(start_date, end_date):
+    """Reconstruye ambos agregados para las fechas [start_date, end_date]"""
+    items, archived = _sources(start_date, end_date)
+    inserted = {}
+    with transaction.atomic():
+        for rollup, (model, period, _) in ROLLUPS.items():
+            _stored(model, period, start_date, end_date).delete()
+            # El archivo se suma sobre las claves que ya llenó la tabla caliente
+            _insert_select(rollup, items)
+            _insert_select(rollup, archived, APPLY)
+            inserted[rollup] = _stored(model, period, start_date, end_date).count()
+    return inserted
+
+
+def check_rollups(start_date, end_date, rollup='daily'):
+    """
+    Compara el agregado con los datos crudos del rango. Devuelve una lista
+    de `(clave, esperado, actual)`; vacía si todo coincide.
+    """
+    model, period, trunc = ROLLUPS[rollup]
+
+    expected = {}
+    for items in _sources(start_date, end_date):
+        for row in aggregate_items(items, trunc):
+            key = (row['bucket'], row['product_key'], row['payment_key'], row['municipio_key'])
+            metrics = tuple(row[m] for m in METRICS)
+            expected[key] = tuple(map(sum, zip(expected[key], metrics))) if key in expected else metrics
+    actual = {
+        tuple(row[:4]): tuple(row[4:])
+        for row in _stored(model, period, start_date, end_date).values_list(period, *KEY_COLUMNS, *METRICS)
+    }
+
+    empty = (0, 0, Decimal('0'), 0, 0, Decimal('0'))
+    mismatches = []
+    for key in sorted(set(expected) | set(actual), key=str):
+        want, have = expected.get(key, empty), actual.get(key, empty)
+        if tuple(map(Decimal, want)) != tuple(map(Decimal, have)):
+            mismatches.append((key, want, have))
+    return mismatches
+
+
+REPORT_DIMENSIONS = {
+    'period': None,  # fecha u hora según la granularidad
+    'product': 'product_id',
+    'payment_method': 'payment_method',
+    'municipio': 'municipio_id',
+}
+
+
+def sales_report(start_date, end_date, group_by=('period',), granularity='daily'):
+    """
+    Totales del rango agrupados por `group_by` (claves de
+    `REPORT_DIMENSIONS`). Solo lee las tablas de agregados.
+    """
+    model, period, _ = ROLLUPS[granularity]
+    unknown = set(group_by) - set(REPORT_DIMENSIONS)
+    if unknown:
+        raise ValueError(f"Dimensiones desconocidas: {sorted(unknown)}")
+    columns = [REPORT_DIMENSIONS[dimension] or period for dimension in group_by]
+    return list(
+        _stored(model, period, start_date, end_date)
+        .values(*columns)
+        .annotate(**{metric: Sum(metric) for metric in METRICS})
+        .order_by(*columns)
+    )
@@ -0,0 +1,173 @@
+"""
+Cotización de envíos con tablas de tarifas en memoria.
+
+Las filas activas de `ShippingRate` se cargan una vez por proceso con una
+consulta y se agrupan por (alcance, código, método) en tuplas compactas:
+topes de peso ordenados y, en paralelo, `(costo, costo por kilo
+adicional, días)`. Cotizar es una búsqueda en diccionario más una
+búsqueda binaria sobre unos pocos tramos, sin consultas; el departamento
+del municipio sale del índice geográfico. La tabla se recarga cuando
+cambia la versión compartida en la caché (señales de `ShippingRate`);
+cada proceso lee esa versión como mucho una vez cada
+`IN_PROCESS_TABLE_TTL` segundos, o recarga siempre si la caché es local.
+
+Precedencia de tarifas: municipio, luego departamento, luego nacional.
+"""
+import math
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+
+from api.models.orders.models_orders import Order, ShippingRate
+from api.services.locations.geo_index import MUNICIPIO, get_geo_index
+from api.services.products.pricing import money, resolve_prices
+from utils.caches import is_shared_cache, refresh_due
+
+SHIPPING_RATES_VERSION_KEY = 'shipping_rates_version'
+
+SCOPE_MUNICIPIO = 'municipio'
+SCOPE_DEPARTAMENTO = 'departamento'
+SCOPE_NACIONAL = 'nacional'
+
+_table = None
+_table_version = None
+_table_checked_at = None  # `time.monotonic()` de la última lectura de la versión
+_table_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class Quote:
+    shipping_method: str
+    cost: Decimal
+    delivery_days: int
+    weight_grams: int
+    scope: str
+
+
+class RateTable:
+    def __init__(self, rows):
+        """
+        `rows`: tuplas (municipio, departamento, método, tope, costo,
+        costo por kilo adicional, días) de tarifas activas.
+        """
+        grouped = {}
+        for municipio, departamento, method, max_weight, cost, extra_kg_cost, days in rows:
+            if municipio is not None:
+                key = (SCOPE_MUNICIPIO, municipio, method)
+            elif departamento is not None:
+                key = (SCOPE_DEPARTAMENTO, departamento, method)
+            else:
+                key = (SCOPE_NACIONAL, None, method)
+            bound = math.inf if max_weight is None else max_weight
+            grouped.setdefault(key, []).append((bound, cost, extra_kg_cost, days))
+
+        self.brackets = {}
+        for key, brackets in grouped.items():
+            brackets.sort(key=lambda bracket: bracket[0])
+            self.brackets[key] = (
+                tuple(bracket[0] for bracket in brackets),
+                tuple(bracket[1:] for bracket in brackets),
+            )
+        self.methods = tuple(method for method in Order.ShippingMethod.values if any(
+            key[2] == method for key in self.brackets
+        ))
+
+    def __len__(self):
+        return sum(len(bounds) for bounds, _ in self.brackets.values())
+
+    def quote(self, municipio_id, departamento_id, method, weight_grams):
+        """`Quote` de la tarifa más específica o `None` si el método no llega al destino"""
+        for scope, code in ((SCOPE_MUNICIPIO, municipio_id), (SCOPE_DEPARTAMENTO, departamento_id), (SCOPE_NACIONAL, None)):
+            entry = self.brackets.get((scope, code, method))
+            if entry is None:
+                continue
+            bounds, values = entry
+            position = bisect_left(bounds, weight_grams)
+            if position == len(bounds):
+                continue  # más pesado que el último tramo: probar el alcance siguiente
+            cost, extra_kg_cost, days = values[position]
+            if extra_kg_cost:
+                floor = bounds[position - 1] if position else 0
+                cost += extra_kg_cost * math.ceil(max(weight_grams - floor, 0) / 1000)
+            return Quote(method, money(cost), days, weight_grams, scope)
+        return None
+
+
+def _current_version():
+    return cache.get_or_set(SHIPPING_RATES_VERSION_KEY, 0, None)
+
+
+def get_rate_table():
+    global _table, _table_version, _table_checked_at
+    if _table is not None and not refresh_due(_table_checked_at):
+        return _table
+    with _table_lock:
+        if _table is None or refresh_due(_table_checked_at):
+            version = _current_version()
+            if _table is None or _table_version != version or not is_shared_cache():
+                _table = RateTable(ShippingRate.objects.filter(is_active=True).values_list(
+                    'municipio_id', 'departamento_id', 'shipping_method', 'max_weight_grams',
+                    'cost', 'extra_kg_cost', 'delivery_days',
+                ))
+                _table_version = version
+            _table_checked_at = time.monotonic()
+    return _table
+
+
+def invalidate_rate_table():
+    global _table_checked_at
+    try:
+        cache.incr(SHIPPING_RATES_VERSION_KEY)
+    except ValueError:
+        cache.set(SHIPPING_RATES_VERSION_KEY, 1, None)
+    _table_checked_at = None  # este proceso revisa en el siguiente acceso; los demás al vencer el plazo
+
+
+def shipment_weight(priced_lines):
+    """Peso total en gramos de líneas de `resolve_prices`"""
+    default = getattr(settings, 'SHIPPING_DEFAULT_WEIGHT_GRAMS', 500)
+    return sum((line.unit_weight_grams or default) * line.quantity for line in priced_lines)
+
+
+def quote_methods(municipio_id, weight_grams, methods=None, table=None, index=None):
+    """`{método: Quote}` con los métodos disponibles para el destino"""
+    table = get_rate_table() if table is None else table
+    index = get_geo_index() if index is None else index
+    municipio = index.get(MUNICIPIO, municipio_id)
+    departamento_id = municipio['padre'] if municipio else None
+    quotes = {}
+    for method in methods or table.methods:
+        quote = table.quote(municipio_id, departamento_id, method, weight_grams)
+        if quote is not None:
+            quotes[method] = quote
+    return quotes
+
+
+def quote_bulk(shipments, methods=None):
+    """
+    Cotiza en bloque: `shipments` es un iterable de `(municipio_id,
+    peso en gramos)`; devuelve una lista de `{método: Quote}` en el mismo
+    orden, para comparar métodos lado a lado. No hace consultas si la
+    tabla y el índice geográfico ya están cargados.
+    """
+    table, index = get_rate_table(), get_geo_index()
+    return [
+        quote_methods(municipio_id, weight_grams, methods, table, index)
+        for municipio_id, weight_grams in shipments
+    ]
+
+
+def quote_cart(lines, municipio_id, methods=None):
+    """
+    Cotiza un carrito completo: `lines` admite lo mismo que
+    `resolve_prices` (o sus `PricedLine`). El peso sale de las tablas de
+    precio en caché, así que cada línea cuesta O(1).
+    """
+    lines = list(lines)
+    priced = lines if all(hasattr(line, 'unit_weight_grams') for line in lines) else resolve_prices(lines)
+    return quote_methods(municipio_id, shipment_weight(priced), methods)
@@ -0,0 +1,158 @@
+"""
+Máquina de estados de `Order` con historial automático.
+
+Las transiciones se aplican por lotes: un UPDATE condicionado al estado
+de origen (`WHERE id IN (...) AND status IN (...)`) que fija las fechas
+con `now()` en la base, y un `bulk_create` de `OrderStatusHistory` con el
+estado anterior de cada orden. Si otra transacción cambió una orden entre
+la selección y el UPDATE, esa orden no cumple el filtro y se informa en
+`TransitionResult.rejected` con su estado actual en vez de pisarla.
+
+Los agregados de ventas se actualizan en la misma transacción
+(`rollups.record_transition`).
+"""
+from dataclasses import dataclass, field
+
+from django.db import connections, transaction
+from django.db.models import F
+from django.db.models.functions import Coalesce, Now
+
+from api.models.orders.models_orders import Order, OrderStatusHistory
+from utils.counts import invalidate_counts
+from .rollups import record_transition
+
+Status = Order.Status
+
+TRANSITIONS = {
+    Status.PENDING: {Status.PAID, Status.CANCELLED},
+    Status.PAID: {Status.PROCESSING, Status.CANCELLED, Status.REFUNDED},
+    Status.PROCESSING: {Status.SHIPPED, Status.CANCELLED, Status.REFUNDED},
+    Status.SHIPPED: {Status.DELIVERED},
+    Status.DELIVERED: {Status.REFUNDED},
+    Status.CANCELLED: set(),
+    Status.REFUNDED: set(),
+}
+
+# Fecha que se fija la primera vez que una orden llega al estado
+TIMESTAMP_FIELDS = {
+    Status.PAID: 'paid_at',
+    Status.CANCELLED: 'cancelled_at',
+    Status.DELIVERED: 'delivered_at',
+}
+
+
+class InvalidTransition(Exception):
+    def __init__(self, rejected, new_status):
+        # {order_id: estado actual (None si la orden no existe)}
+        self.rejected = rejected
+        self.new_status = new_status
+        super().__init__(f"Transición a '{new_status}' no permitida para las órdenes {sorted(rejected)}")
+
+
+@dataclass
+class TransitionResult:
+    new_status: str
+    updated: list = field(default_factory=list)   # ids que cambiaron
+    rejected: dict = field(default_factory=dict)  # {id: estado actual}; None si no existe
+    history: int = 0
+
+
+def can_transition(old_status, new_status):
+    return new_status in TRANSITIONS.get(old_status, ())
+
+
+def source_statuses(new_status):
+    """Estados desde los que se puede llegar a `new_status`"""
+    if new_status not in TRANSITIONS:
+        raise ValueError(f"Estado desconocido: {new_status}")
+    return sorted(old for old, targets in TRANSITIONS.items() if new_status in targets)
+
+
+def _update_postgresql(connection, ids, sources, new_status):
+    """
+    Un solo UPDATE que devuelve el estado anterior. El `FOR UPDATE` del
+    subselect hace que PostgreSQL vuelva a evaluar el filtro de estado si
+    otra transacción tocó la fila mientras esperaba el bloqueo.
+    """
+    assignments = ['status = %s', 'updated_at = now()']
+    timestamp = TIMESTAMP_FIELDS.get(new_status)
+    if timestamp:
+        assignments.append(f'{timestamp} = COALESCE(o.{timestamp}, now())')
+    sql = (
+        f"UPDATE {Order._meta.db_table} AS o SET {', '.join(assignments)} "
+        f"FROM (SELECT id, status FROM {Order._meta.db_table} "
+        f"      WHERE id = ANY(%s) AND status = ANY(%s) FOR UPDATE) AS previous "
+        f"WHERE o.id = previous.id "
+        f"RETURNING o.id, previous.status"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [new_status, list(ids), sources])
+        return cursor.fetchall()
+
+
+def _update_portable(ids, sources, new_status):
+    rows = list(
+        Order.objects.select_for_update()
+        .filter(pk__in=ids, status__in=sources)
+        .values_list('pk', 'status')
+    )
+    values = {'status': new_status, 'updated_at': Now()}
+    timestamp = TIMESTAMP_FIELDS.get(new_status)
+    if timestamp:
+        values[timestamp] = Coalesce(F(timestamp), Now())
+    locked = [pk for pk, _ in rows]
+    Order.objects.filter(pk__in=locked, status__in=sources).update(**values)
+    return rows
+
+
+def transition_orders(order_ids, new_status, changed_by='system', notes=None, batch_size=5000):
+    """
+    Lleva las órdenes a `new_status` por lotes de `batch_size`. Las que no
+    están en un estado de origen válido (o las cambió otro proceso) se
+    devuelven en `rejected`; nunca se lanza excepción por ellas.
+    """
+    sources = source_statuses(new_status)
+    order_ids = list(dict.fromkeys(order_ids))
+    result = TransitionResult(new_status=new_status)
+    connection = connections[Order.objects.db]
+
+    for start in range(0, len(order_ids), batch_size):
+        ids = order_ids[start:start + batch_size]
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                rows = _update_postgresql(connection, ids, sources, new_status)
+            else:
+                rows = _update_portable(ids, sources, new_status)
+            OrderStatusHistory.objects.bulk_create([
+                OrderStatusHistory(order_id=pk, old_status=old_status, new_status=new_status,
+                                   changed_by=changed_by, notes=notes)
+                for pk, old_status in rows
+            ], batch_size=1000)
+            record_transition([pk for pk, _ in rows], new_status)
+        result.updated.extend(pk for pk, _ in rows)
+        result.history += len(rows)
+
+        missing = set(ids) - {pk for pk, _ in rows}
+        if missing:
+            current = dict(Order.objects.filter(pk__in=missing).values_list('pk', 'status'))
+            result.rejected.update({pk: current.get(pk) for pk in missing})
+
+    if result.updated:
+        invalidate_counts(Order)
+        invalidate_counts(OrderStatusHistory)
+    return result
+
+
+def transition_queryset(queryset, new_status, changed_by='system', notes=None, batch_size=5000):
+    """Transición de todas las órdenes del queryset que estén en un estado de origen válido"""
+    ids = queryset.filter(status__in=source_statuses(new_status)).values_list('pk', flat=True)
+    return transition_orders(list(ids), new_status, changed_by, notes, batch_size)
+
+
+def transition_order(order, new_status, changed_by='system', notes=None):
+    """Transición de una orden; lanza `InvalidTransition` si no procede"""
+    result = transition_orders([order.pk], new_status, changed_by, notes)
+    if result.rejected:
+        raise InvalidTransition(result.rejected, new_status)
+    order.refresh_from_db(fields=['status', 'updated_at', *TIMESTAMP_FIELDS.values()])
+    return order
@@ -0,0 +1,306 @@
+"""
+Importación masiva de catálogos de proveedores.
+
+Lee CSV o JSONL en streaming y procesa bloques de filas: upsert de
+`Product` y `ProductVariant` por `sku` con `bulk_create(update_conflicts=True)`,
+reemplazo de imágenes y asignación de categorías en bloque. Solo se
+mantiene en memoria el bloque actual, sin importar el tamaño del archivo.
+
+Formato de fila (CSV plano o JSONL):
+    sku, name, price, description, brand, base_price, is_active,
+    is_customizable, colors ("rojo|azul"), categories (slugs "ropa|buzos"),
+    variant_sku, variant_description, price_override, stock_quantity,
+    image_url, image_alt, image_is_main
+Varias filas con el mismo `sku` agregan variantes e imágenes al producto,
+aunque caigan en bloques distintos.
+En JSONL también se aceptan listas `variants`, `images`, `categories` y `colors`.
+"""
+import csv
+import json
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from functools import partial
+from itertools import islice
+
+from django.db import DatabaseError, transaction
+
+from api.models.products.models_products import (
+    Product, ProductCategoryAssignment, ProductImage, ProductVariant,
+)
+from utils.counts import invalidate_counts
+from .category_tree import get_category_tree
+from .read_model import invalidate_product_document
+from .search import reset_search_index, update_search_vectors
+
+PRODUCT_UPDATE_FIELDS = [
+    'name', 'description', 'brand', 'price', 'base_price', 'is_active', 'is_customizable', 'color_options', 'updated_at',
+]
+VARIANT_UPDATE_FIELDS = ['product', 'description', 'price_override', 'stock_quantity']
+
+TRUE_VALUES = {'1', 'true', 'si', 'sí', 'yes', 'y', 'x'}
+
+MAX_REPORTED_ERRORS = 1000  # Errores que se conservan; `error_count` los cuenta todos
+
+
+class RowError(ValueError):
+    pass
+
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    products: int = 0
+    variants: int = 0
+    images: int = 0
+    assignments: int = 0
+    errors: list = field(default_factory=list)  # [(número de fila, mensaje), ...] hasta MAX_REPORTED_ERRORS
+    error_count: int = 0
+    elapsed: float = 0.0
+
+    def add_error(self, number, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((number, message))
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+def read_rows(path, file_format=None):
+    """
+    Genera `(número de fila, dict)` sin cargar el archivo completo.
+    """
+    file_format = file_format or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+    with open(path, newline='', encoding='utf-8-sig') as handle:
+        if file_format == 'csv':
+            for number, row in enumerate(csv.DictReader(handle), start=2):
+                yield number, row
+        else:
+            for number, line in enumerate(handle, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield number, json.loads(line)
+                except json.JSONDecodeError as exc:
+                    yield number, RowError(f"JSON inválido: {exc.msg}")
+
+
+def _text(row, key, max_length=None, required=False):
+    value = row.get(key)
+    value = str(value).strip() if value not in (None, '') else None
+    if required and not value:
+        raise RowError(f"'{key}' es obligatorio")
+    if value and max_length and len(value) > max_length:
+        raise RowError(f"'{key}' supera {max_length} caracteres")
+    return value
+
+
+def _decimal(row, key, required=False):
+    value = row.get(key)
+    if value in (None, ''):
+        if required:
+            raise RowError(f"'{key}' es obligatorio")
+        return None
+    try:
+        return Decimal(str(value).strip()).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise RowError(f"'{key}' no es un número válido: {value!r}")
+
+
+def _bool(row, key, default):
+    value = row.get(key)
+    if value in (None, ''):
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+def _int(row, key, default=0):
+    value = row.get(key)
+    if value in (None, ''):
+        return default
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise RowError(f"'{key}' no es un entero válido: {value!r}")
+
+
+def _list(row, key):
+    value = row.get(key)
+    if value in (None, ''):
+        return []
+    if isinstance(value, list):
+        return [str(item).strip() for item in value if str(item).strip()]
+    return [item.strip() for item in str(value).split('|') if item.strip()]
+
+
+def parse_row(row):
+    """
+    Valida una fila y la convierte en `(producto, variantes, imágenes, slugs)`.
+    """
+    if isinstance(row, RowError):
+        raise row
+
+    product = {
+        'sku': _text(row, 'sku', 50, required=True),
+        'name': _text(row, 'name', 100, required=True),
+        'description': _text(row, 'description'),
+        'brand': _text(row, 'brand', 50),
+        'price': _decimal(row, 'price', required=True),
+        'base_price': _decimal(row, 'base_price'),
+        'is_active': _bool(row, 'is_active', True),
+        'is_customizable': _bool(row, 'is_customizable', False),
+        'color_options': _list(row, 'colors') or None,
+    }
+
+    variant_rows = row.get('variants') or ([row] if row.get('variant_sku') else [])
+    variants = [
+        {
+            'sku': _text(variant, 'variant_sku' if 'variant_sku' in variant else 'sku', 50, required=True),
+            'description': _text(variant, 'variant_description' if 'variant_description' in variant else 'description', 100),
+            'price_override': _decimal(variant, 'price_override'),
+            'stock_quantity': _int(variant, 'stock_quantity'),
+        }
+        for variant in variant_rows
+    ]
+
+    image_rows = row.get('images') or ([row] if row.get('image_url') else [])
+    images = [
+        {
+            'url': _text(image, 'image_url' if 'image_url' in image else 'url', required=True),
+            'alt_text': _text(image, 'image_alt' if 'image_alt' in image else 'alt_text', 100),
+            'is_main': _bool(image, 'image_is_main' if 'image_is_main' in image else 'is_main', False),
+        }
+        for image in image_rows
+    ]
+
+    return product, variants, images, _list(row, 'categories')
+
+
+class CatalogImporter:
+    def __init__(self, chunk_size=2000):
+        self.chunk_size = chunk_size
+        self.report = ImportReport()
+        self.categories = {node['slug']: pk for pk, node in get_category_tree().nodes.items()}
+        # Skus cuyas imágenes ya se reemplazaron en esta importación: los bloques
+        # siguientes agregan imágenes en vez de borrar las del bloque anterior
+        self.images_replaced = set()
+
+    def run(self, rows):
+        """
+        Importa un iterable de `(número de fila, dict)` por bloques.
+        """
+        start = time.perf_counter()
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            self.report.rows += len(chunk)
+            self.import_chunk(chunk)
+        reset_search_index()
+        self.report.elapsed = time.perf_counter() - start
+        return self.report
+
+    def import_chunk(self, chunk):
+        records = {}
+        for number, row in chunk:
+            try:
+                product, variants, images, slugs = parse_row(row)
+                missing = [slug for slug in slugs if slug not in self.categories]
+                if missing:
+                    raise RowError(f"categorías inexistentes: {', '.join(missing)}")
+            except RowError as exc:
+                self.report.add_error(number, str(exc))
+                continue
+
+            # Las filas repetidas de un mismo sku se agregan al mismo producto
+            record = records.setdefault(product['sku'], {'rows': [], 'variants': {}, 'images': [], 'slugs': set()})
+            record['rows'].append(number)
+            record['product'] = product
+            record['variants'].update((variant['sku'], variant) for variant in variants)
+            record['images'].extend(images)
+            record['slugs'].update(slugs)
+
+        if not records:
+            return
+        try:
+            with transaction.atomic():
+                replaced = self.write(records)
+            self.images_replaced.update(replaced)
+        except DatabaseError:
+            # Aislar las filas que fallan sin descartar el resto del bloque
+            for sku, record in records.items():
+                try:
+                    with transaction.atomic():
+                        replaced = self.write({sku: record})
+                    self.images_replaced.update(replaced)
+                except DatabaseError as exc:
+                    for number in record['rows']:
+                        self.report.add_error(number, f"error de base de datos: {exc}")
+
+    def write(self, records):
+        """Escribe un bloque. Devuelve los skus cuyas imágenes se reemplazaron."""
+        Product.objects.bulk_create(
+            [Product(**record['product']) for record in records.values()],
+            update_conflicts=True,
+            unique_fields=['sku'],
+            update_fields=PRODUCT_UPDATE_FIELDS,
+        )
+        product_ids = dict(Product.objects.filter(sku__in=list(records)).values_list('sku', 'id'))
+
+        variants = [
+            ProductVariant(product_id=product_ids[sku], **variant)
+            for sku, record in records.items()
+            for variant in record['variants'].values()
+        ]
+        if variants:
+            ProductVariant.objects.bulk_create(
+                variants,
+                update_conflicts=True,
+                unique_fields=['sku'],
+                update_fields=VARIANT_UPDATE_FIELDS,
+            )
+
+        # Las imágenes no tienen clave natural: el archivo reemplaza las existentes
+        # la primera vez que aparece el sku y agrega en las siguientes
+        with_images = {sku for sku, record in records.items() if record['images']}
+        first_seen = [product_ids[sku] for sku in with_images - self.images_replaced]
+        if first_seen:
+            ProductImage.objects.filter(product_id__in=first_seen).delete()
+        if with_images:
+            ProductImage.objects.bulk_create([
+                ProductImage(product_id=product_ids[sku], **image)
+                for sku, record in records.items()
+                for image in record['images']
+            ])
+
+        assignments = [
+            ProductCategoryAssignment(product_id=product_ids[sku], category_id=self.categories[slug])
+            for sku, record in records.items()
+            for slug in record['slugs']
+        ]
+        if assignments:
+            ProductCategoryAssignment.objects.bulk_create(assignments, ignore_conflicts=True)
+
+        # bulk_create no emite señales: mantener búsqueda, conteos y documentos. Las
+        # versiones suben al confirmar el bloque, como en `api.signals._after_commit`
+        ids = list(product_ids.values())
+        update_search_vectors(Product.objects.filter(pk__in=ids))
+        for model in (Product, ProductVariant, ProductImage, ProductCategoryAssignment):
+            transaction.on_commit(partial(invalidate_counts, model))
+        for pk in ids:
+            transaction.on_commit(partial(invalidate_product_document, pk))
+
+        self.report.products += len(records)
+        self.report.variants += len(variants)
+        self.report.images += sum(len(record['images']) for record in records.values())
+        self.report.assignments += len(assignments)
+        return with_images
+
+
+def import_catalog(path, file_format=None, chunk_size=2000):
+    return CatalogImporter(chunk_size=chunk_size).run(read_rows(path, file_format))
@@ -0,0 +1,84 @@
+"""
+Caché en proceso del árbol completo de `ProductCategory`.
+
+Las categorías son pocas y casi nunca cambian: el árbol se carga con una
+sola consulta y se reutiliza hasta que una alta, cambio o baja sube la
+versión compartida en la caché de Django. Cada proceso lee esa versión
+como mucho una vez cada `IN_PROCESS_TABLE_TTL` segundos (el proceso que
+hizo el cambio, en el siguiente acceso) y recarga el árbol si cambió, o
+siempre si la caché es local al proceso.
+"""
+import threading
+import time
+
+from django.core.cache import cache
+
+from api.models.products.models_products import ProductCategory
+from utils.caches import is_shared_cache, refresh_due
+
+TREE_VERSION_KEY = 'category_tree_version'
+
+_tree = None
+_tree_version = None
+_tree_checked_at = None  # `time.monotonic()` de la última lectura de la versión
+_tree_lock = threading.Lock()
+
+
+class CategoryTree:
+    def __init__(self, rows):
+        self.nodes = {row['id']: row for row in rows}
+        self.by_slug = {row['slug']: row for row in rows}
+        self.children = {pk: [] for pk in self.nodes}
+        self.roots = []
+        for row in rows:
+            if row['parent_id'] in self.children:
+                self.children[row['parent_id']].append(row['id'])
+            else:
+                self.roots.append(row['id'])
+
+    def descendants(self, category_id, include_self=True):
+        """Ids del subárbol en orden de recorrido en profundidad."""
+        result = [category_id] if include_self else []
+        stack = list(reversed(self.children.get(category_id, [])))
+        while stack:
+            pk = stack.pop()
+            result.append(pk)
+            stack.extend(reversed(self.children[pk]))
+        return result
+
+    def ancestors(self, category_id):
+        """Ids desde la raíz hasta el padre de la categoría (migas de pan)."""
+        result = []
+        parent_id = self.nodes[category_id]['parent_id']
+        while parent_id in self.nodes and parent_id not in result:
+            result.append(parent_id)
+            parent_id = self.nodes[parent_id]['parent_id']
+        return list(reversed(result))
+
+
+def _current_version():
+    return cache.get_or_set(TREE_VERSION_KEY, 0, None)
+
+
+def get_category_tree():
+    global _tree, _tree_version, _tree_checked_at
+    if _tree is not None and not refresh_due(_tree_checked_at):
+        return _tree
+    with _tree_lock:
+        if _tree is None or refresh_due(_tree_checked_at):
+            version = _current_version()
+            if _tree is None or _tree_version != version or not is_shared_cache():
+                rows = list(ProductCategory.objects.order_by('name').values('id', 'name', 'slug', 'parent_id', 'path'))
+                _tree = CategoryTree(rows)
+                _tree_version = version
+            _tree_checked_at = time.monotonic()
+    return _tree
+
+
+def invalidate_category_tree():
+    global _tree_checked_at
+    try:
+        cache.incr(TREE_VERSION_KEY)
+    except ValueError:
+        cache.set(TREE_VERSION_KEY, 1, None)
+    _tree_checked_at = None  # este proceso revisa en el siguiente acceso; los demás al vencer el plazo
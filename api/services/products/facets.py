@@ -0,0 +1,214 @@
+"""
+Facetas del catálogo: marca, color (`Product.color_options`), categoría y
+rangos de precio para el conjunto de filtros actual.
+
+En PostgreSQL todas las facetas salen de una sola consulta con
+`GROUPING SETS` sobre el conjunto filtrado (con `unnest` de los colores).
+En otros motores se usa una única consulta plana agregada en Python.
+Los resultados se cachean por firma normalizada de filtros.
+"""
+import hashlib
+import json
+from bisect import bisect_right
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+
+from api.models.products.models_products import Product, ProductCategory, ProductCategoryAssignment
+from utils.counts import get_model_version
+from .category_tree import get_category_tree
+
+FACET_CACHE_PREFIX = 'facets'
+
+# Límites de los rangos de precio en COP
+PRICE_BUCKETS = [Decimal(limit) for limit in (0, 20000, 50000, 100000, 200000, 500000)]
+
+FACETS_SQL = """
+WITH filtered AS ({filtered_sql})
+SELECT
+    GROUPING(f.brand), GROUPING(c.color), GROUPING(a.category_id), GROUPING(b.bucket),
+    f.brand, c.color, a.category_id, b.bucket,
+    COUNT(DISTINCT f.id)
+FROM filtered f
+LEFT JOIN LATERAL unnest(f.color_options) AS c(color) ON TRUE
+LEFT JOIN {assignments_table} a ON a.product_id = f.id
+CROSS JOIN LATERAL (SELECT width_bucket(f.price, %s::numeric[]) AS bucket) b
+GROUP BY GROUPING SETS ((f.brand), (c.color), (a.category_id), (b.bucket), ())
+"""
+
+
+def _as_list(value):
+    if value in (None, ''):
+        return []
+    if isinstance(value, (list, tuple, set)):
+        return [item for item in value if item not in (None, '')]
+    return [value]
+
+
+def _as_decimal(value):
+    try:
+        return str(Decimal(str(value)).quantize(Decimal('0.01')))
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def normalize_filters(params):
+    """
+    Filtros en forma canónica: listas ordenadas y sin duplicados, precios
+    como texto decimal y claves vacías eliminadas. Filtros equivalentes
+    producen la misma firma de caché.
+    """
+    getlist = getattr(params, 'getlist', None)
+    filters = {}
+
+    for key in ('brand', 'color'):
+        values = getlist(key) if getlist else _as_list(params.get(key))
+        values = sorted({str(value).strip() for value in values if str(value).strip()})
+        if values:
+            filters[key] = values
+
+    category = params.get('category')
+    if category not in (None, ''):
+        try:
+            filters['category'] = int(category)
+        except (TypeError, ValueError):
+            pass
+
+    for key in ('min_price', 'max_price'):
+        value = _as_decimal(params.get(key)) if params.get(key) not in (None, '') else None
+        if value is not None:
+            filters[key] = value
+
+    filters['is_active'] = str(params.get('is_active', True)).lower() not in ('false', '0')
+    return filters
+
+
+def filter_products(filters):
+    queryset = Product.objects.all()
+    if filters.get('is_active', True):
+        queryset = queryset.filter(is_active=True)
+    if filters.get('brand'):
+        queryset = queryset.filter(brand__in=filters['brand'])
+    if filters.get('color'):
+        queryset = queryset.filter(color_options__overlap=filters['color'])
+    if filters.get('category') is not None:
+        # La ruta del subárbol sale del árbol en memoria, sin consultar la categoría
+        node = get_category_tree().nodes.get(filters['category'])
+        if node:
+            queryset = queryset.in_category(ProductCategory(pk=node['id'], path=node['path']))
+        else:
+            queryset = queryset.none()
+    if filters.get('min_price'):
+        queryset = queryset.filter(price__gte=filters['min_price'])
+    if filters.get('max_price'):
+        queryset = queryset.filter(price__lte=filters['max_price'])
+    return queryset
+
+
+def _signature(filters):
+    raw = json.dumps(filters, sort_keys=True)
+    digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+    versions = f"{get_model_version(Product)}.{get_model_version(ProductCategoryAssignment)}"
+    return f"{FACET_CACHE_PREFIX}:{versions}:{digest}"
+
+
+def _bucket_label(bucket):
+    lower = PRICE_BUCKETS[bucket - 1]
+    upper = PRICE_BUCKETS[bucket] if bucket < len(PRICE_BUCKETS) else None
+    return {'value': f"{lower}-{upper}" if upper is not None else f"{lower}+", 'min': lower, 'max': upper}
+
+
+def _counts_postgresql(queryset):
+    counts = {'total': 0, 'brand': {}, 'color': {}, 'category': {}, 'price': {}}
+    try:
+        filtered_sql, params = queryset.order_by().values('id', 'brand', 'color_options', 'price').query.sql_with_params()
+    except EmptyResultSet:
+        # `.none()` (p. ej. categoría desconocida) no tiene SQL: no hay nada que contar
+        return counts
+    sql = FACETS_SQL.format(
+        filtered_sql=filtered_sql,
+        assignments_table=ProductCategoryAssignment._meta.db_table,
+    )
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(sql, [*params, PRICE_BUCKETS])
+        for g_brand, g_color, g_category, g_bucket, brand, color, category_id, bucket, count in cursor.fetchall():
+            if not g_brand:
+                key, value = 'brand', brand
+            elif not g_color:
+                key, value = 'color', color
+            elif not g_category:
+                key, value = 'category', category_id
+            elif not g_bucket:
+                key, value = 'price', bucket
+            else:
+                counts['total'] = count
+                continue
+            if value is not None:
+                counts[key][value] = count
+    return counts
+
+
+def _counts_python(queryset):
+    rows = queryset.order_by().values_list('id', 'brand', 'color_options', 'price', 'productcategoryassignment__category_id')
+    seen = set()
+    sets = {'brand': defaultdict(set), 'color': defaultdict(set), 'category': defaultdict(set), 'price': defaultdict(set)}
+    for pk, brand, colors, price, category_id in rows.iterator(chunk_size=2000):
+        seen.add(pk)
+        if brand is not None:
+            sets['brand'][brand].add(pk)
+        for color in colors or ():
+            sets['color'][color].add(pk)
+        if category_id is not None:
+            sets['category'][category_id].add(pk)
+        sets['price'][bisect_right(PRICE_BUCKETS, price)].add(pk)
+
+    counts = {key: {value: len(ids) for value, ids in groups.items()} for key, groups in sets.items()}
+    counts['total'] = len(seen)
+    return counts
+
+
+def compute_facets(params, use_cache=True):
+    """
+    Conteos de todas las facetas para los filtros dados, en una sola consulta.
+
+    Devuelve `{'total': n, 'brand': [...], 'color': [...], 'category': [...],
+    'price': [...]}` con cada lista ordenada por conteo descendente.
+    """
+    filters = normalize_filters(params)
+    key = _signature(filters)
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    queryset = filter_products(filters)
+    if connections[queryset.db].vendor == 'postgresql':
+        counts = _counts_postgresql(queryset)
+    else:
+        counts = _counts_python(queryset)
+
+    def ordered(items):
+        return sorted(items, key=lambda item: (-item['count'], str(item['value'])))
+
+    tree = get_category_tree()
+    facets = {
+        'total': counts['total'],
+        'brand': ordered({'value': value, 'count': count} for value, count in counts['brand'].items()),
+        'color': ordered({'value': value, 'count': count} for value, count in counts['color'].items()),
+        'category': ordered(
+            {'value': value, 'label': tree.nodes[value]['name'] if value in tree.nodes else None, 'count': count}
+            for value, count in counts['category'].items()
+        ),
+        'price': [
+            {**_bucket_label(bucket), 'count': count}
+            for bucket, count in sorted(counts['price'].items())
+            if bucket > 0
+        ],
+    }
+
+    cache.set(key, facets, getattr(settings, 'FACET_CACHE_TTL', 60))
+    return facets
@@ -0,0 +1,144 @@
+"""
+Resolución de precios unitarios efectivos para carritos y órdenes.
+
+Reglas (las de `CartItem.save`, más las variantes):
+    - variante: `ProductVariant.price_override` o, si no tiene, `Product.price`
+    - producto: `Product.price`
+    - diseño personalizado: `Product.price` del producto base del diseño
+    - una línea que ya trae precio lo conserva (`CartItem.save` solo
+      calcula el precio si está vacío); el checkout siempre recotiza
+    - sin producto que cotizar (diseño inexistente, producto borrado):
+      `ValueError` con la línea. Antes `CartItem.save` dejaba el precio
+      vacío y el INSERT fallaba por NOT NULL; el checkout lo convierte en
+      `CheckoutError`.
+
+`Product.base_price` (precio sin personalización) es informativo y no
+entra en el cálculo, como antes.
+
+Las tablas de precio se cachean por producto y se invalidan al guardar
+el producto o sus variantes. Un lote de líneas se resuelve en un número
+constante de consultas sin importar cuántas líneas tenga.
+"""
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+from django.core.cache import cache
+
+from api.models.editor.models_editor import CustomDesign
+from api.models.products.models_products import Product, ProductVariant
+
+PRICE_CACHE_PREFIX = 'price_table'
+CENT = Decimal('0.01')
+
+
+@dataclass
+class PricedLine:
+    product_id: int
+    variant_id: int
+    custom_design_id: int
+    quantity: int
+    unit_price: Decimal
+    subtotal: Decimal
+    unit_weight_grams: int = None
+
+
+def money(value):
+    return Decimal(value).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def _price_key(product_id):
+    return f"{PRICE_CACHE_PREFIX}:{product_id}"
+
+
+def invalidate_price_table(product_id):
+    cache.delete(_price_key(product_id))
+
+
+def get_price_tables(product_ids):
+    """
+    `{product_id: {'price', 'is_active', 'weight_grams', 'variants': {id: override}}}`
+    desde la caché; los faltantes se cargan con dos consultas.
+    """
+    product_ids = set(product_ids)
+    cached = cache.get_many([_price_key(pk) for pk in product_ids])
+    tables = {pk: cached[_price_key(pk)] for pk in product_ids if _price_key(pk) in cached}
+
+    missing = product_ids - set(tables)
+    if missing:
+        loaded = {
+            pk: {
+                'price': price, 'is_active': is_active, 'weight_grams': weight_grams, 'variants': {},
+            }
+            for pk, price, is_active, weight_grams in Product.objects.filter(pk__in=missing).values_list(
+                'pk', 'price', 'is_active', 'weight_grams',
+            )
+        }
+        variants = ProductVariant.objects.filter(product_id__in=loaded).values_list('pk', 'product_id', 'price_override')
+        for pk, product_id, price_override in variants:
+            loaded[product_id]['variants'][pk] = price_override
+        cache.set_many(
+            {_price_key(pk): table for pk, table in loaded.items()},
+            getattr(settings, 'PRICE_CACHE_TTL', 300),
+        )
+        tables.update(loaded)
+    return tables
+
+
+def _line_value(line, name):
+    if isinstance(line, dict):
+        return line.get(name)
+    return getattr(line, name, None)
+
+
+def resolve_prices(lines):
+    """
+    Precios efectivos de un lote de líneas (objetos o dicts con
+    `product_id`, `variant_id`, `custom_design_id` y `quantity`).
+
+    Como máximo tres consultas: diseños, productos y variantes; ninguna si
+    las tablas de precio ya están en caché y no hay diseños.
+    """
+    lines = list(lines)
+    design_ids = {_line_value(line, 'custom_design_id') for line in lines} - {None}
+    design_products = dict(
+        CustomDesign.objects.filter(pk__in=design_ids).values_list('pk', 'base_product_id')
+    ) if design_ids else {}
+
+    def product_of(line):
+        return _line_value(line, 'product_id') or design_products.get(_line_value(line, 'custom_design_id'))
+
+    tables = get_price_tables({product_of(line) for line in lines} - {None})
+
+    priced = []
+    for line in lines:
+        product_id = product_of(line)
+        table = tables.get(product_id)
+        if table is None:
+            raise ValueError(f"No hay precio para la línea {line!r}: producto inexistente.")
+
+        variant_id = _line_value(line, 'variant_id')
+        unit_price = table['price']
+        if variant_id is not None:
+            if variant_id not in table['variants']:
+                raise ValueError(f"La variante {variant_id} no pertenece al producto {product_id}.")
+            if table['variants'][variant_id] is not None:
+                unit_price = table['variants'][variant_id]
+
+        quantity = _line_value(line, 'quantity') or 1
+        unit_price = money(unit_price)
+        priced.append(PricedLine(
+            product_id=product_id,
+            variant_id=variant_id,
+            custom_design_id=_line_value(line, 'custom_design_id'),
+            quantity=quantity,
+            unit_price=unit_price,
+            subtotal=money(unit_price * quantity),
+            unit_weight_grams=table.get('weight_grams'),
+        ))
+    return priced
+
+
+def get_unit_price(product_id=None, variant_id=None, custom_design_id=None):
+    line = {'product_id': product_id, 'variant_id': variant_id, 'custom_design_id': custom_design_id, 'quantity': 1}
+    return resolve_prices([line])[0].unit_price
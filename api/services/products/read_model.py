@@ -0,0 +1,143 @@
+"""
+Documento de detalle de producto listo para servir.
+
+Carga el producto con variantes, imágenes, categorías, resumen de
+calificaciones y últimas reseñas en un número fijo de consultas y guarda
+el documento compacto en caché con claves versionadas. Las señales de
+`api.signals` suben la versión del producto ante cualquier cambio en sus
+modelos relacionados (al confirmar la transacción); el renombrado de
+categorías invalida a través de la versión del árbol de categorías.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Prefetch
+
+from api.models.products.models_products import (
+    Product, ProductCategoryAssignment, ProductImage, ProductReview, ProductVariant,
+)
+from .category_tree import TREE_VERSION_KEY
+
+DOCUMENT_PREFIX = 'product_doc'
+DOCUMENT_VERSION_PREFIX = 'product_doc_version'
+REVIEWS_IN_DOCUMENT = 5
+
+
+def _version_key(product_id):
+    return f"{DOCUMENT_VERSION_PREFIX}:{product_id}"
+
+
+def _document_key(product_id):
+    versions = cache.get_many([_version_key(product_id), TREE_VERSION_KEY])
+    return f"{DOCUMENT_PREFIX}:{product_id}:{versions.get(_version_key(product_id), 0)}.{versions.get(TREE_VERSION_KEY, 0)}"
+
+
+def invalidate_product_document(product_id):
+    """
+    Sube la versión del documento al confirmar la transacción en curso (de
+    inmediato si no hay una): así ninguna lectura concurrente guarda con la
+    versión nueva un documento armado con datos previos al commit.
+    """
+    key = _version_key(product_id)
+
+    def bump():
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+    transaction.on_commit(bump)
+
+
+def _decimal(value):
+    return str(value) if value is not None else None
+
+
+def build_product_document(product_id):
+    """
+    Construye el documento en 5 consultas, sin importar cuántas variantes,
+    imágenes, categorías o reseñas tenga el producto. Devuelve None si no existe.
+    """
+    product = (
+        Product.objects
+        .select_related('rating_summary')
+        .prefetch_related(
+            Prefetch('variants', queryset=ProductVariant.objects.filter(is_active=True).order_by('id')),
+            Prefetch('images', queryset=ProductImage.objects.order_by('-is_main', 'id')),
+            Prefetch(
+                'productcategoryassignment_set',
+                queryset=ProductCategoryAssignment.objects.select_related('category').order_by('category__name'),
+            ),
+            Prefetch(
+                'reviews',
+                queryset=ProductReview.objects.select_related('user').order_by('-created_at')[:REVIEWS_IN_DOCUMENT],
+                to_attr='latest_reviews',
+            ),
+        )
+        .filter(pk=product_id)
+        .first()
+    )
+    if product is None:
+        return None
+
+    summary = getattr(product, 'rating_summary', None)
+    return {
+        'id': product.pk,
+        'name': product.name,
+        'description': product.description,
+        'brand': product.brand,
+        'sku': product.sku,
+        'price': _decimal(product.price),
+        'base_price': _decimal(product.base_price),
+        'is_active': product.is_active,
+        'is_customizable': product.is_customizable,
+        'color_options': product.color_options or [],
+        'variants': [
+            {
+                'id': variant.pk,
+                'sku': variant.sku,
+                'description': variant.description,
+                'price': _decimal(variant.price_override if variant.price_override is not None else product.price),
+                'stock_quantity': variant.stock_quantity,
+            }
+            for variant in product.variants.all()
+        ],
+        'images': [
+            {'url': image.url, 'alt_text': image.alt_text, 'is_main': image.is_main}
+            for image in product.images.all()
+        ],
+        'categories': [
+            {'id': assignment.category.pk, 'name': assignment.category.name, 'slug': assignment.category.slug}
+            for assignment in product.productcategoryassignment_set.all()
+        ],
+        'rating': {
+            'count': summary.review_count if summary else 0,
+            'average': _decimal(summary.average_rating) if summary else None,
+            'histogram': summary.histogram if summary else {},
+        },
+        'reviews': [
+            {
+                'id': review.pk,
+                'rating': review.rating,
+                'comment': review.comment,
+                'author': review.user.get_full_name() or review.user.get_username(),
+                'created_at': review.created_at.isoformat(),
+            }
+            for review in product.latest_reviews
+        ],
+        'updated_at': product.updated_at.isoformat(),
+    }
+
+
+def get_product_document(product_id):
+    """
+    Documento del producto desde la caché; solo va a la base de datos si la
+    versión vigente aún no está cacheada.
+    """
+    key = _document_key(product_id)
+    document = cache.get(key)
+    if document is None:
+        document = build_product_document(product_id)
+        if document is not None:
+            cache.set(key, document, getattr(settings, 'PRODUCT_DOCUMENT_CACHE_TTL', 3600))
+    return document
@@ -0,0 +1,147 @@
+"""
+Búsqueda de productos.
+
+En PostgreSQL usa la columna `Product.search_vector` (índice GIN) con
+`SearchRank`, y el operador `%` de `pg_trgm` sobre `name` (índice GIN
+`gin_trgm_ops`) para tolerar errores tipográficos; `TrigramSimilarity`
+solo ordena. La extensión `pg_trgm` la crea la migración `0002_pg_trgm`.
+En otros motores usa el índice invertido en memoria de `search_index`.
+"""
+import threading
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+from django.db import connections
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Greatest
+
+from api.models.products.models_products import Product
+from .search_index import InvertedIndex
+
+SEARCH_CONFIG = 'spanish'
+
+SEARCH_VECTOR = (
+    SearchVector('name', weight='A', config=SEARCH_CONFIG)
+    + SearchVector('brand', weight='B', config=SEARCH_CONFIG)
+    + SearchVector('description', weight='C', config=SEARCH_CONFIG)
+)
+
+SEARCH_FILTER_CHUNK = 500
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def _is_postgresql(queryset):
+    return connections[queryset.db].vendor == 'postgresql'
+
+
+def update_search_vectors(queryset=None):
+    """
+    Recalcula `search_vector` en un solo UPDATE. Sin efecto fuera de PostgreSQL.
+    """
+    queryset = Product.objects.all() if queryset is None else queryset
+    if not _is_postgresql(queryset):
+        return 0
+    return queryset.update(search_vector=SEARCH_VECTOR)
+
+
+def get_search_index():
+    """
+    Índice invertido del proceso, construido la primera vez que se usa.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = InvertedIndex()
+                rows = Product.objects.values_list('id', 'name', 'brand', 'description')
+                for pk, name, brand, description in rows.iterator(chunk_size=2000):
+                    index.add(pk, {'name': name, 'brand': brand, 'description': description})
+                _index = index
+    return _index
+
+
+def reset_search_index():
+    """
+    Descarta el índice del proceso; se reconstruye en la siguiente búsqueda.
+    Necesario tras cargas con `bulk_create`, que no emiten señales.
+    """
+    global _index
+    with _index_lock:
+        _index = None
+
+
+def index_product(product):
+    """
+    Mantiene la búsqueda al día tras guardar un producto.
+    """
+    update_search_vectors(Product.objects.filter(pk=product.pk))
+    if _index is not None:
+        with _index_lock:
+            _index.add(product.pk, {
+                'name': product.name,
+                'brand': product.brand,
+                'description': product.description,
+            })
+
+
+def unindex_product(product_id):
+    if _index is not None:
+        with _index_lock:
+            _index.remove(product_id)
+
+
+def search_products(query, category=None, active_only=True, limit=50):
+    """
+    Busca productos por nombre, marca y descripción, ordenados por relevancia.
+
+    Devuelve un queryset anotado con `rank`. `category` filtra por una
+    categoría asignada mediante `ProductCategoryAssignment`.
+    """
+    queryset = Product.objects.all()
+    if active_only:
+        queryset = queryset.filter(is_active=True)
+    if category is not None:
+        queryset = queryset.filter(productcategoryassignment__category=category)
+
+    if not query or not query.strip():
+        return queryset.none()
+
+    if _is_postgresql(queryset):
+        search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type='websearch')
+        return (
+            queryset
+            .annotate(
+                text_rank=SearchRank(F('search_vector'), search_query),
+                similarity=TrigramSimilarity('name', query),
+            )
+            # `name__trigram_similar` es `name % query`, que sí usa `idx_product_name_trgm`;
+            # su umbral es `pg_trgm.similarity_threshold` (0.3, igual a TRIGRAM_THRESHOLD)
+            .filter(Q(search_vector=search_query) | Q(name__trigram_similar=query))
+            .annotate(rank=Greatest('text_rank', 'similarity'))
+            .order_by('-rank', '-id')[:limit]
+        )
+
+    # El índice no conoce los filtros: se aplican en la base de datos por
+    # bloques de candidatos hasta completar `limit`
+    candidates = get_search_index().search(query)
+    ranked = []
+    for start in range(0, len(candidates), SEARCH_FILTER_CHUNK):
+        chunk = candidates[start:start + SEARCH_FILTER_CHUNK]
+        matching = set(queryset.filter(pk__in=[pk for pk, _ in chunk]).values_list('pk', flat=True))
+        ranked.extend((pk, rank) for pk, rank in chunk if pk in matching)
+        if limit and len(ranked) >= limit:
+            ranked = ranked[:limit]
+            break
+    if not ranked:
+        return queryset.none()
+
+    return (
+        Product.objects
+        .filter(pk__in=[pk for pk, _ in ranked])
+        .annotate(rank=Case(
+            *[When(pk=pk, then=Value(rank)) for pk, rank in ranked],
+            output_field=FloatField(),
+        ))
+        .order_by('-rank', '-id')
+    )
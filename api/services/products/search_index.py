@@ -0,0 +1,140 @@
+"""
+Índice invertido en memoria para búsqueda de productos.
+
+Respaldo puro en Python de la búsqueda full-text + trigramas de PostgreSQL,
+usado en motores sin `tsvector` ni `pg_trgm` (p. ej. SQLite en pruebas).
+Replica los pesos A/B/C de `SearchRank` y la similitud de `pg_trgm`.
+"""
+import math
+import re
+import unicodedata
+from collections import defaultdict
+
+TOKEN_RE = re.compile(r'\w+')
+
+# Mismos pesos por defecto que PostgreSQL para A, B y C
+FIELD_WEIGHTS = {
+    'name': 1.0,
+    'brand': 0.4,
+    'description': 0.2,
+}
+
+TRIGRAM_THRESHOLD = 0.3  # Igual a pg_trgm.similarity_threshold
+
+
+def normalize(text):
+    """Minúsculas y sin tildes."""
+    text = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(normalize(text))
+
+
+def trigrams(token):
+    """Trigramas con el mismo relleno que pg_trgm (dos espacios antes, uno después)."""
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a, b):
+    ta, tb = trigrams(a), trigrams(b)
+    return len(ta & tb) / len(ta | tb)
+
+
+class InvertedIndex:
+    def __init__(self):
+        self.postings = defaultdict(dict)  # token -> {doc_id: peso acumulado}
+        self.by_trigram = defaultdict(set)  # trigrama -> tokens del vocabulario
+        self.documents = {}  # doc_id -> tokens indexados
+
+    def __len__(self):
+        return len(self.documents)
+
+    def add(self, doc_id, fields):
+        """
+        Indexa (o reindexa) un documento. `fields` mapea nombre de campo a texto.
+        """
+        if doc_id in self.documents:
+            self.remove(doc_id)
+
+        weights = defaultdict(float)
+        for field, text in fields.items():
+            weight = FIELD_WEIGHTS.get(field, 0.1)
+            for token in tokenize(text):
+                weights[token] += weight
+
+        for token, weight in weights.items():
+            if token not in self.postings:
+                for gram in trigrams(token):
+                    self.by_trigram[gram].add(token)
+            self.postings[token][doc_id] = weight
+        self.documents[doc_id] = tuple(weights)
+
+    def remove(self, doc_id):
+        for token in self.documents.pop(doc_id, ()):
+            postings = self.postings[token]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self.postings[token]
+                for gram in trigrams(token):
+                    self.by_trigram[gram].discard(token)
+
+    def _expand(self, token, threshold):
+        """
+        Términos del vocabulario que coinciden con `token`: el propio término,
+        los que lo tienen como prefijo y los similares por trigramas.
+        """
+        matches = {}
+        if token in self.postings:
+            matches[token] = 1.0
+
+        candidates = set()
+        for gram in trigrams(token):
+            candidates |= self.by_trigram.get(gram, set())
+        for candidate in candidates:
+            if candidate in matches:
+                continue
+            if candidate.startswith(token):
+                matches[candidate] = 1.0
+                continue
+            score = similarity(token, candidate)
+            if score >= threshold:
+                matches[candidate] = score
+        return matches
+
+    def search(self, query, limit=None, threshold=TRIGRAM_THRESHOLD):
+        """
+        Devuelve `[(doc_id, rank), ...]` ordenado por relevancia.
+
+        Todos los términos de la consulta deben coincidir (exactos, por prefijo
+        o con tolerancia a errores tipográficos).
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        total = len(self.documents) or 1
+        scores = None
+        for token in tokens:
+            token_scores = defaultdict(float)
+            for term, match in self._expand(token, threshold).items():
+                postings = self.postings[term]
+                idf = math.log(1 + total / len(postings))
+                for doc_id, weight in postings.items():
+                    token_scores[doc_id] = max(token_scores[doc_id], weight * match * idf)
+
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {
+                    doc_id: score + token_scores[doc_id]
+                    for doc_id, score in scores.items()
+                    if doc_id in token_scores
+                }
+            if not scores:
+                return []
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit] if limit else ranked
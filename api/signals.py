@@ -0,0 +1,151 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save
+from django.dispatch import receiver
+
+from api.models.locations.models_locations import Address, Barrio, Departamento, Municipio
+from api.models.orders.models_orders import ShippingRate
+from api.models.products.models_products import (
+    Product, ProductCategory, ProductCategoryAssignment, ProductImage, ProductRatingSummary, ProductReview,
+    ProductVariant,
+)
+from api.services.locations.addresses import refresh_formatted_addresses
+from api.services.locations.geo_index import invalidate_geo_index
+from api.services.orders.shipping import invalidate_rate_table
+from api.services.products.category_tree import invalidate_category_tree
+from api.services.products.pricing import invalidate_price_table
+from api.services.products.read_model import invalidate_product_document
+from api.services.products.search import index_product, unindex_product
+from utils.counts import invalidate_counts
+
+
+def _after_commit(invalidate, *args, using=None):
+    # Las versiones de caché suben al confirmar: antes, un lector concurrente podría reconstruir
+    # la entrada con datos previos al commit y guardarla con la versión nueva durante todo el TTL
+    transaction.on_commit(partial(invalidate, *args), using=using)
+
+
+@receiver(post_save, dispatch_uid='invalidate_counts_on_save')
+@receiver(post_delete, dispatch_uid='invalidate_counts_on_delete')
+def invalidate_counts_on_change(sender, using=None, **kwargs):
+    # Cualquier alta, cambio o baja invalida los conteos paginados del modelo
+    _after_commit(invalidate_counts, sender, using=using)
+
+
+@receiver(post_save, sender=Product, dispatch_uid='index_product_on_save')
+def index_product_on_save(sender, instance, **kwargs):
+    index_product(instance)
+
+
+@receiver(post_delete, sender=Product, dispatch_uid='unindex_product_on_delete')
+def unindex_product_on_delete(sender, instance, **kwargs):
+    unindex_product(instance.pk)
+
+
+@receiver(post_save, sender=ProductCategory, dispatch_uid='category_tree_on_save')
+def category_tree_on_save(sender, using=None, **kwargs):
+    _after_commit(invalidate_category_tree, using=using)
+
+
+@receiver(post_delete, sender=ProductCategory, dispatch_uid='category_tree_on_delete')
+def category_tree_on_delete(sender, instance, using=None, **kwargs):
+    instance.detach_subtree()
+    _after_commit(invalidate_category_tree, using=using)
+
+
+@receiver(post_delete, sender=ProductReview, dispatch_uid='rating_summary_on_review_delete')
+def rating_summary_on_review_delete(sender, instance, **kwargs):
+    ProductRatingSummary.apply_review(instance.product_id, instance.rating, -1)
+
+
+@receiver(post_save, sender=Product, dispatch_uid='product_document_on_product_save')
+@receiver(post_delete, sender=Product, dispatch_uid='product_document_on_product_delete')
+def product_document_on_product_change(sender, instance, **kwargs):
+    invalidate_product_document(instance.pk)
+
+
+@receiver(post_save, sender=ProductVariant, dispatch_uid='product_document_on_variant_save')
+@receiver(post_delete, sender=ProductVariant, dispatch_uid='product_document_on_variant_delete')
+@receiver(post_save, sender=ProductImage, dispatch_uid='product_document_on_image_save')
+@receiver(post_delete, sender=ProductImage, dispatch_uid='product_document_on_image_delete')
+@receiver(post_save, sender=ProductCategoryAssignment, dispatch_uid='product_document_on_assignment_save')
+@receiver(post_delete, sender=ProductCategoryAssignment, dispatch_uid='product_document_on_assignment_delete')
+@receiver(post_save, sender=ProductReview, dispatch_uid='product_document_on_review_save')
+@receiver(post_delete, sender=ProductReview, dispatch_uid='product_document_on_review_delete')
+def product_document_on_related_change(sender, instance, **kwargs):
+    # Los cambios de categoría invalidan vía la versión del árbol
+    invalidate_product_document(instance.product_id)
+
+
+@receiver(post_save, sender=Product, dispatch_uid='price_table_on_product_save')
+@receiver(post_delete, sender=Product, dispatch_uid='price_table_on_product_delete')
+def price_table_on_product_change(sender, instance, using=None, **kwargs):
+    _after_commit(invalidate_price_table, instance.pk, using=using)
+
+
+@receiver(post_save, sender=ProductVariant, dispatch_uid='price_table_on_variant_save')
+@receiver(post_delete, sender=ProductVariant, dispatch_uid='price_table_on_variant_delete')
+def price_table_on_variant_change(sender, instance, using=None, **kwargs):
+    _after_commit(invalidate_price_table, instance.product_id, using=using)
+
+
+@receiver(post_save, sender=Departamento, dispatch_uid='geo_index_on_departamento_save')
+@receiver(post_delete, sender=Departamento, dispatch_uid='geo_index_on_departamento_delete')
+@receiver(post_save, sender=Municipio, dispatch_uid='geo_index_on_municipio_save')
+@receiver(post_delete, sender=Municipio, dispatch_uid='geo_index_on_municipio_delete')
+@receiver(post_save, sender=Barrio, dispatch_uid='geo_index_on_barrio_save')
+@receiver(post_delete, sender=Barrio, dispatch_uid='geo_index_on_barrio_delete')
+def geo_index_on_change(sender, using=None, **kwargs):
+    _after_commit(invalidate_geo_index, using=using)
+
+
+# Campos que aparecen en `direccion_formateada` y filtro de las direcciones que los usan
+ADDRESS_NAME_FIELDS = {
+    Departamento: (('nombre',), 'municipio__departamento'),
+    Municipio: (('nombre', 'departamento_id'), 'municipio'),
+    Barrio: (('nombre',), 'barrio'),
+}
+
+
+@receiver(pre_save, sender=Departamento, dispatch_uid='addresses_on_departamento_pre_save')
+@receiver(pre_save, sender=Municipio, dispatch_uid='addresses_on_municipio_pre_save')
+@receiver(pre_save, sender=Barrio, dispatch_uid='addresses_on_barrio_pre_save')
+def addresses_on_name_pre_save(sender, instance, raw=False, using=None, **kwargs):
+    # Valores anteriores: solo un cambio de nombre obliga a reformatear las direcciones
+    fields, _ = ADDRESS_NAME_FIELDS[sender]
+    instance._address_names = None
+    if instance.pk is not None and not raw:
+        instance._address_names = (
+            sender._default_manager.using(using).filter(pk=instance.pk).values_list(*fields).first()
+        )
+
+
+@receiver(post_save, sender=Departamento, dispatch_uid='addresses_on_departamento_save')
+@receiver(post_save, sender=Municipio, dispatch_uid='addresses_on_municipio_save')
+@receiver(post_save, sender=Barrio, dispatch_uid='addresses_on_barrio_save')
+def addresses_on_name_save(sender, instance, created, using=None, **kwargs):
+    fields, lookup = ADDRESS_NAME_FIELDS[sender]
+    previous = getattr(instance, '_address_names', None)
+    if created or previous is None or previous == tuple(getattr(instance, field) for field in fields):
+        return
+    _after_commit(refresh_formatted_addresses, Address.objects.filter(**{lookup: instance.pk}), using=using)
+
+
+@receiver(pre_delete, sender=Barrio, dispatch_uid='addresses_on_barrio_pre_delete')
+def addresses_on_barrio_pre_delete(sender, instance, **kwargs):
+    # `barrio` es SET_NULL: guardar qué direcciones lo usaban antes de perder la referencia
+    instance._address_ids = list(Address.objects.filter(barrio=instance).values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Barrio, dispatch_uid='addresses_on_barrio_delete')
+def addresses_on_barrio_delete(sender, instance, **kwargs):
+    address_ids = getattr(instance, '_address_ids', None)
+    if address_ids:
+        refresh_formatted_addresses(Address.objects.filter(pk__in=address_ids))
+
+
+@receiver(post_save, sender=ShippingRate, dispatch_uid='rate_table_on_save')
+@receiver(post_delete, sender=ShippingRate, dispatch_uid='rate_table_on_delete')
+def rate_table_on_change(sender, using=None, **kwargs):
+    _after_commit(invalidate_rate_table, using=using)
@@ -0,0 +1,25 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+
+from api.models.locations.models_locations import Address, Departamento, Municipio
+from utils import idempotency
+
+
+def clear_caches():
+    # Las pruebas revierten la base pero no las cachés: cada prueba empieza sin estado previo
+    for alias in ('default', 'carts'):
+        caches[alias].clear()
+    idempotency._lru.clear()
+
+
+def create_user(username):
+    # AUTH_USER_MODEL (`api.User`): el modelo al que apuntan las llaves de direcciones y órdenes
+    return get_user_model().objects.create(username=username, email=f"{username}@example.com")
+
+
+def create_address(user):
+    departamento, _ = Departamento.objects.get_or_create(codigo_dane='11', defaults={'nombre': 'Bogotá, D.C.'})
+    municipio, _ = Municipio.objects.get_or_create(
+        codigo_dane='11001', defaults={'departamento': departamento, 'nombre': 'Bogotá, D.C.'},
+    )
+    return Address.objects.create(user=user, municipio=municipio, tipo_via='CL', numero_via='45', placa='12-30')
@@ -0,0 +1,31 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from api import signals
+from api.models.locations.models_locations import Address
+from .helpers import clear_caches, create_address, create_user
+
+
+class FormattedAddressTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.address = create_address(create_user('ana'))
+        self.municipio = self.address.municipio
+
+    def test_rename_refreshes_addresses_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.municipio.nombre = "Bogotá"
+            self.municipio.save()
+            self.assertTrue(Address.objects.get().direccion_formateada.endswith("Bogotá, D.C., Bogotá, D.C."))
+
+        self.assertTrue(callbacks)
+        self.assertTrue(Address.objects.get().direccion_formateada.endswith("Bogotá, Bogotá, D.C."))
+
+    def test_save_without_rename_leaves_addresses_alone(self):
+        with mock.patch.object(signals, 'refresh_formatted_addresses') as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.municipio.categoria = 'A'
+                self.municipio.save()
+                self.municipio.departamento.save()
+        refresh.assert_not_called()
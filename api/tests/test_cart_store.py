@@ -0,0 +1,70 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import TransactionTestCase
+
+from api.models.orders.models_orders import CartItem, ShoppingCart
+from api.models.products.models_products import Product
+from api.services.orders import cart_store
+from .helpers import clear_caches, create_user
+
+
+class CartStoreTests(TransactionTestCase):
+    # Las llaves foráneas se verifican al confirmar: hace falta commit real para el carrito inválido
+
+    def setUp(self):
+        clear_caches()
+        self.user = create_user('carrito')
+        self.camiseta = Product.objects.create(name="Camiseta", sku='TEST-CART-1', price=Decimal('10000'))
+        self.gorra = Product.objects.create(name="Gorra", sku='TEST-CART-2', price=Decimal('20000'))
+
+    def lines(self, cart_id):
+        return sorted(CartItem.objects.filter(cart_id=cart_id).values_list('product_id', 'quantity'))
+
+    def test_changes_reach_the_database_only_on_flush(self):
+        cart_id = cart_store.get_or_create_cart(self.user)
+        cart_store.add_item(cart_id, product_id=self.camiseta.pk, quantity=2)
+        cart_store.add_item(cart_id, product_id=self.camiseta.pk, quantity=1)
+        cart_store.add_item(cart_id, product_id=self.gorra.pk)
+        cart_store.remove_item(cart_id, product_id=self.gorra.pk)
+
+        self.assertEqual(self.lines(cart_id), [])
+        report = cart_store.flush_dirty()
+
+        self.assertEqual((report.carts, report.created), (1, 1))
+        self.assertEqual(self.lines(cart_id), [(self.camiseta.pk, 3)])
+        self.assertEqual(CartItem.objects.get(cart_id=cart_id).price, Decimal('10000'))
+        self.assertEqual(cart_store.flush_dirty().carts, 0)
+
+    def test_invalid_cart_does_not_block_the_others(self):
+        valid = ShoppingCart.objects.create(user=self.user).pk
+        stale = ShoppingCart.objects.create(user=self.user).pk
+        cart_store.add_item(valid, product_id=self.camiseta.pk, quantity=1)
+        cart_store.add_item(stale, product_id=self.camiseta.pk, quantity=1)
+        cart_store.add_item(stale, product_id=self.gorra.pk, quantity=4)
+        Product.objects.filter(pk=self.gorra.pk).delete()  # borrado después de cachear el carrito
+
+        report = cart_store.flush_dirty()
+
+        self.assertEqual((report.dropped, report.failed), (1, []))
+        self.assertEqual(self.lines(valid), [(self.camiseta.pk, 1)])
+        self.assertEqual(self.lines(stale), [(self.camiseta.pk, 1)])
+        self.assertEqual(cart_store.flush_dirty().carts, 0)
+
+    def test_failed_cart_is_retried_by_the_next_sweep(self):
+        cart_id = cart_store.get_or_create_cart(self.user)
+        cart_store.add_item(cart_id, product_id=self.camiseta.pk, quantity=2)
+        write = cart_store._write
+
+        def failing_write(states, report):
+            if any(state['cart_id'] == cart_id for state in states):
+                raise DatabaseError("falla simulada")
+            return write(states, report)
+
+        with mock.patch.object(cart_store, '_write', failing_write):
+            self.assertEqual(cart_store.flush_dirty().failed, [cart_id])
+
+        self.assertEqual(self.lines(cart_id), [])
+        self.assertEqual(cart_store.flush_dirty().carts, 1)
+        self.assertEqual(self.lines(cart_id), [(self.camiseta.pk, 2)])
@@ -0,0 +1,39 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from api.models.products.models_products import ProductCategory
+from api.services.products import category_tree
+from .helpers import clear_caches
+
+
+class CategoryTreeTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        category_tree._tree = None
+
+    def create_category(self, name):
+        with self.captureOnCommitCallbacks(execute=True):
+            return ProductCategory.objects.create(name=name, slug=name.lower())
+
+    def test_lookups_within_the_interval_skip_the_cache(self):
+        category_tree.get_category_tree()
+
+        with mock.patch.object(category_tree.cache, 'get_or_set') as version:
+            category_tree.get_category_tree()
+        version.assert_not_called()
+
+    def test_change_is_visible_in_this_process_right_away(self):
+        category_tree.get_category_tree()
+        gorras = self.create_category("Gorras")
+
+        self.assertIn(gorras.pk, category_tree.get_category_tree().nodes)
+
+    @override_settings(IN_PROCESS_TABLE_TTL=0)
+    def test_other_processes_reload_when_the_interval_expires(self):
+        category_tree.get_category_tree()
+        # Cambio hecho por otro proceso: la versión compartida sube sin pasar por este
+        gorras = ProductCategory.objects.create(name="Gorras", slug='gorras')
+        category_tree.cache.incr(category_tree.TREE_VERSION_KEY)
+
+        self.assertIn(gorras.pk, category_tree.get_category_tree().nodes)
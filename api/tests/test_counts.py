@@ -0,0 +1,50 @@
+from decimal import Decimal
+
+from django.test import TestCase
+
+from api.models.products.models_products import Product, ProductCategory, ProductCategoryAssignment
+from api.services.products.catalog_import import CatalogImporter
+from utils.counts import get_count, get_model_version, queryset_fingerprint
+from utils.pagination import CachedCountPaginator
+from .helpers import clear_caches
+
+
+class CountCacheTests(TestCase):
+    def setUp(self):
+        clear_caches()
+
+    def test_count_of_empty_querysets_is_exact_zero(self):
+        for queryset in (Product.objects.none(), Product.objects.filter(pk__in=[])):
+            self.assertIsNone(queryset_fingerprint(queryset))
+            self.assertEqual(get_count(queryset), (0, False))
+
+    def test_paginator_counts_empty_filtered_list(self):
+        paginator = CachedCountPaginator(Product.objects.filter(pk__in=[]).order_by('pk'), 10)
+
+        self.assertEqual(paginator.count, 0)
+        self.assertEqual(list(paginator.page(1)), [])
+
+    def test_joined_model_change_invalidates_the_count(self):
+        category = ProductCategory.objects.create(name="Gorras", slug='gorras')
+        product = Product.objects.create(name="Gorra", sku='TEST-COUNT', price=Decimal('20000'))
+        in_category = Product.objects.filter(categories=category)
+        self.assertEqual(get_count(in_category), (0, False))
+
+        # Solo cambia la tabla intermedia: la versión de Product no se mueve
+        with self.captureOnCommitCallbacks(execute=True):
+            ProductCategoryAssignment.objects.create(product=product, category=category)
+
+        self.assertEqual(get_count(in_category), (1, False))
+
+    def test_catalog_import_invalidates_counts_after_commit(self):
+        importer = CatalogImporter()
+        self.assertEqual(get_count(Product.objects.all()), (0, False))
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            importer.import_chunk([(2, {'sku': 'IMP-1', 'name': "Gorra", 'price': '20000'})])
+            # Sin confirmar, la versión no sube: nadie guarda el conteo viejo con la versión nueva
+            self.assertEqual(get_model_version(Product), 0)
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(get_count(Product.objects.all()), (1, False))
@@ -0,0 +1,46 @@
+import tempfile
+from pathlib import Path
+
+from django.test import TestCase
+
+from api.models.locations.models_locations import Departamento, Municipio
+from api.services.locations.dane import DEFAULT_PATH, load_dane
+from .helpers import clear_caches
+
+# Extracto del listado DIVIPOLA tal como lo exporta el geoportal del DANE
+DIVIPOLA = """\
+Código Departamento,Nombre Departamento,Código Municipio,Nombre Municipio,Tipo: Municipio / Isla / Área no municipalizada,longitud,Latitud
+05,ANTIOQUIA,05001,MEDELLÍN,Municipio,-75.5812,6.2443
+5,ANTIOQUIA,5088,BELLO,Municipio,-75.5574,6.3373
+13,BOLÍVAR,13001,CARTAGENA DE INDIAS,Municipio,-75.4963,10.3997
+"""
+
+
+class LoadDaneTests(TestCase):
+    def setUp(self):
+        clear_caches()
+
+    def test_bundled_sample_loads_every_departamento(self):
+        counts = load_dane()
+
+        self.assertEqual(counts['departamentos'], 33)
+        self.assertEqual(Departamento.objects.count(), 33)
+        self.assertEqual(Municipio.objects.get(codigo_dane='05001').tipo, Municipio.TIPO_DISTRITO)
+
+    def test_official_divipola_file_replaces_the_municipio_sample(self):
+        with tempfile.TemporaryDirectory() as directory:
+            divipola = Path(directory) / 'DIVIPOLA_Municipios.csv'
+            divipola.write_text(DIVIPOLA, encoding='utf-8-sig')
+            counts = load_dane(DEFAULT_PATH, municipios=divipola)
+
+        self.assertEqual(counts['municipios'], 3)
+        self.assertEqual(
+            dict(Municipio.objects.values_list('codigo_dane', 'nombre')),
+            {'05001': "Medellín", '05088': "Bello", '13001': "Cartagena de Indias"},
+        )
+        self.assertEqual(Municipio.objects.get(codigo_dane='05088').departamento_id, '05')
+
+    def test_same_files_are_not_loaded_twice(self):
+        load_dane()
+
+        self.assertIsNone(load_dane())
@@ -0,0 +1,56 @@
+import csv
+import io
+import json
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from api.models.orders.models_orders import ArchivedOrder, Order
+from api.models.payments.models_payments import OrderPayment, Payment
+from api.services.orders.archive import archive_orders
+from api.services.orders.export import export_orders, export_querysets
+from .helpers import create_address, create_user
+
+
+class OrderExportTests(TestCase):
+    def setUp(self):
+        user = create_user('export')
+        address = create_address(user)
+        self.orders = [
+            Order.objects.create(
+                user=user, shipping_address=address, billing_address=address,
+                subtotal=Decimal('100'), total=Decimal('100'),
+            )
+            for _ in range(2)
+        ]
+        first, second = self.orders
+        OrderPayment.objects.create(
+            order=first, amount=Decimal('40'), payment_method='tarjeta', transaction_id='tx-1', status='completed',
+        )
+        Payment.objects.create(order=first, paypal_id='PAY-1', amount=Decimal('60'), status='approved')
+        Payment.objects.create(order=second, paypal_id='PAY-2', amount=Decimal('100'), status='approved')
+
+    def export(self, output):
+        today = timezone.localdate()
+        return b''.join(export_orders(export_querysets(today, today), output)).decode('utf-8')
+
+    def test_csv_includes_paypal_payments(self):
+        rows = {row['id']: row for row in csv.DictReader(io.StringIO(self.export('csv')))}
+
+        first = rows[str(self.orders[0].pk)]
+        self.assertEqual(Decimal(first['paid_amount']), Decimal('100'))
+        self.assertEqual(first['transaction_ids'], 'tx-1;PAY-1')
+
+    def test_archived_orders_in_range_are_exported(self):
+        Order.objects.filter(pk=self.orders[0].pk).update(status=Order.Status.DELIVERED)
+        archive_orders(older_than_days=0)
+        self.assertTrue(ArchivedOrder.objects.filter(pk=self.orders[0].pk).exists())
+
+        exported = [json.loads(line) for line in self.export('ndjson').splitlines()]
+
+        self.assertEqual([order['id'] for order in exported], [order.pk for order in self.orders])
+        self.assertEqual(
+            [(payment['payment_method'], payment['transaction_id']) for payment in exported[0]['payments']],
+            [('tarjeta', 'tx-1'), ('paypal', 'PAY-1')],
+        )
@@ -0,0 +1,16 @@
+from django.test import TestCase
+
+from api.models.products.models_products import Product
+from api.services.products.facets import _counts_postgresql, compute_facets
+from .helpers import clear_caches
+
+
+class FacetTests(TestCase):
+    def setUp(self):
+        clear_caches()
+
+    def test_queryset_without_sql_has_empty_facets(self):
+        self.assertEqual(_counts_postgresql(Product.objects.none())['total'], 0)
+
+    def test_facets_for_unknown_category(self):
+        self.assertEqual(compute_facets({'category': '999999'}, use_cache=False)['total'], 0)
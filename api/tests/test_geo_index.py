@@ -0,0 +1,29 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from api.models.locations.models_locations import Departamento, Municipio
+from api.services.locations import geo_index
+from .helpers import clear_caches
+
+
+class GeoIndexTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        geo_index._index = None
+        Departamento.objects.create(codigo_dane='05', nombre="Antioquia")
+        Municipio.objects.create(codigo_dane='05001', nombre="Medellín", departamento_id='05')
+
+    def test_lookups_within_the_interval_skip_the_cache(self):
+        geo_index.get_geo_index()
+
+        with mock.patch.object(geo_index.cache, 'get_or_set') as version:
+            self.assertEqual(geo_index.get_geo_index().municipio('05001')['nombre'], "Medellín")
+        version.assert_not_called()
+
+    def test_change_is_visible_in_this_process_right_away(self):
+        geo_index.get_geo_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            Municipio.objects.create(codigo_dane='05088', nombre="Bello", departamento_id='05')
+
+        self.assertEqual(geo_index.get_geo_index().autocomplete("bel")[0]['codigo'], '05088')
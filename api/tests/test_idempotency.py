@@ -0,0 +1,63 @@
+from django.http import JsonResponse
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from api.models.orders.models_orders import IdempotencyKey
+from utils import idempotency
+from .helpers import clear_caches
+
+
+class IdempotencyTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.factory = RequestFactory()
+        self.executed = 0
+
+    def view(self, request):
+        self.executed += 1
+        return JsonResponse({'order': self.executed}, status=201)
+
+    def request(self, key, path='/api/orders/', body=b'{"cart": 1}'):
+        return self.factory.post(path, body, content_type='application/json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def post(self, key, body=b'{"cart": 1}'):
+        return idempotency.run_idempotent(self.request(key, body=body), self.view)
+
+    def test_repeated_key_replays_the_first_response(self):
+        first = self.post('pedido-1')
+        idempotency._lru.clear()  # la repetición debe salir también de la base
+        second = self.post('pedido-1')
+
+        self.assertEqual(self.executed, 1)
+        self.assertEqual((second.status_code, second.content), (first.status_code, first.content))
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+
+    def test_same_key_with_another_body_is_rejected(self):
+        self.post('pedido-2')
+        response = self.post('pedido-2', body=b'{"cart": 2}')
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(self.executed, 1)
+
+    def test_expired_response_is_not_replayed(self):
+        self.post('pedido-3')
+        IdempotencyKey.objects.update(expires_at=timezone.now())
+        idempotency._lru.clear()
+
+        response = self.post('pedido-3')
+
+        self.assertEqual(self.executed, 2)
+        self.assertFalse(response.has_header('Idempotent-Replayed'))
+
+    def test_middleware_only_covers_order_and_payment_routes(self):
+        middleware = idempotency.IdempotencyMiddleware(self.view)
+
+        for _ in range(2):
+            middleware(self.request('sesion', path='/api/token/'))
+        self.assertEqual(self.executed, 2)
+        self.assertFalse(IdempotencyKey.objects.exists())  # una respuesta con JWT nunca se guarda
+
+        for _ in range(2):
+            middleware(self.request('pago', path='/api/payments/'))
+        self.assertEqual(self.executed, 3)
+        self.assertEqual(IdempotencyKey.objects.count(), 1)
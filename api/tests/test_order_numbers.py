@@ -0,0 +1,49 @@
+from unittest import skipUnless
+
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+
+from api.services.orders.order_numbers import (
+    OrderNumberAllocator, format_order_number, is_valid_order_number, luhn_digit,
+)
+
+
+class OrderNumberTests(TestCase):
+    def test_luhn_check_digit(self):
+        self.assertEqual(luhn_digit(7992739871), 3)
+        self.assertEqual(format_order_number(12345, prefix='HS'), 'HS-000123455')
+
+    def test_validates_check_digit(self):
+        number = format_order_number(98765)
+
+        self.assertTrue(is_valid_order_number(number))
+        tampered = number[:-2] + str((int(number[-2]) + 1) % 10) + number[-1]
+        self.assertFalse(is_valid_order_number(tampered))
+        self.assertFalse(is_valid_order_number('HS-'))
+
+    def test_allocators_never_repeat_numbers(self):
+        # Dos "procesos" con bloques pequeños sobre el mismo contador
+        first, second = OrderNumberAllocator('pruebas', block_size=3), OrderNumberAllocator('pruebas', block_size=3)
+        numbers = [allocator.next_number() for _ in range(10) for allocator in (first, second)]
+
+        self.assertEqual(len(set(numbers)), len(numbers))
+        self.assertTrue(all(is_valid_order_number(number) for number in numbers))
+
+
+@skipUnless(connection.vendor == 'postgresql', "Solo PostgreSQL reserva bloques de una secuencia")
+class OrderNumberSequenceTests(TransactionTestCase):
+    def tearDown(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DROP SEQUENCE IF EXISTS "rollback_number_seq"')
+
+    def test_rolled_back_checkout_keeps_the_sequence(self):
+        # El primer número sale dentro de un checkout que se revierte; el bloque queda en memoria
+        first = OrderNumberAllocator('rollback', block_size=5)
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                first.allocate()
+                raise RuntimeError
+        kept = [first.allocate() for _ in range(4)]
+
+        second = OrderNumberAllocator('rollback', block_size=5)  # otro proceso
+        self.assertFalse(set(kept) & {second.allocate() for _ in range(5)})
@@ -0,0 +1,41 @@
+from decimal import Decimal
+
+from django.test import TestCase
+
+from api.models.orders.models_orders import Order, OrderStatusHistory
+from api.services.orders.status import InvalidTransition, transition_orders
+from .helpers import create_address, create_user
+
+
+class OrderStatusTests(TestCase):
+    def setUp(self):
+        user = create_user('estados')
+        address = create_address(user)
+        self.order = Order.objects.create(
+            user=user, shipping_address=address, billing_address=address, subtotal=Decimal('1'), total=Decimal('1'),
+        )
+
+    def test_valid_transition_records_history(self):
+        self.order.transition_to(Order.Status.PAID, changed_by='pruebas')
+
+        self.assertEqual(self.order.status, Order.Status.PAID)
+        self.assertIsNotNone(self.order.paid_at)
+        self.assertEqual(
+            list(OrderStatusHistory.objects.filter(order=self.order).values_list('old_status', 'new_status')),
+            [(Order.Status.PENDING, Order.Status.PAID)],
+        )
+
+    def test_invalid_transition_is_rejected_without_changes(self):
+        with self.assertRaises(InvalidTransition) as raised:
+            self.order.transition_to(Order.Status.DELIVERED)
+
+        self.assertEqual(raised.exception.rejected, {self.order.pk: Order.Status.PENDING})
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, Order.Status.PENDING)
+        self.assertFalse(OrderStatusHistory.objects.filter(order=self.order).exists())
+
+    def test_batch_reports_rejected_and_missing_orders(self):
+        result = transition_orders([self.order.pk, 0], Order.Status.SHIPPED)
+
+        self.assertEqual(result.updated, [])
+        self.assertEqual(result.rejected, {self.order.pk: Order.Status.PENDING, 0: None})
@@ -0,0 +1,40 @@
+from decimal import Decimal
+
+from django.test import TestCase
+
+from api.models.editor.models_editor import CustomDesign
+from api.models.orders.models_orders import CartItem, ShoppingCart
+from api.models.products.models_products import Product
+from api.services.products.pricing import resolve_prices
+from .helpers import clear_caches, create_user
+
+
+class ResolvePricesTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.user = create_user('ana')
+        self.product = Product.objects.create(
+            name="Camiseta", sku='CAM-1', price=Decimal('50000'), base_price=Decimal('30000'),
+        )
+        self.design = CustomDesign.objects.create(
+            user=self.user, base_product=self.product, design_image_url='https://example.com/d.png',
+            design_parameters={},
+        )
+
+    def test_design_line_uses_the_base_product_price(self):
+        line, = resolve_prices([{'custom_design_id': self.design.pk, 'quantity': 2}])
+
+        self.assertEqual((line.product_id, line.unit_price, line.subtotal), (
+            self.product.pk, Decimal('50000.00'), Decimal('100000.00'),
+        ))
+
+    def test_design_line_without_product_is_rejected(self):
+        with self.assertRaisesMessage(ValueError, "producto inexistente"):
+            resolve_prices([{'custom_design_id': self.design.pk + 1, 'quantity': 1}])
+
+    def test_cart_item_keeps_an_explicit_price(self):
+        cart = ShoppingCart.objects.create(user=self.user)
+        with self.assertNumQueries(1):
+            item = CartItem.objects.create(cart=cart, custom_design=self.design, price=Decimal('45000'))
+
+        self.assertEqual(item.price, Decimal('45000'))
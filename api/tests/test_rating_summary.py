@@ -0,0 +1,31 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from api.models.products.models_products import Product, ProductRatingSummary, ProductReview
+from .helpers import clear_caches, create_user
+
+
+class RatingSummaryTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.product = Product.objects.create(name="Camiseta", sku='CAM-1', price=Decimal('50000'))
+        self.review = ProductReview.objects.create(product=self.product, user=create_user('ana'), rating=2)
+
+    def test_rating_change_moves_the_review_between_stars(self):
+        self.review.rating = 5
+        self.review.save()
+
+        summary = ProductRatingSummary.objects.get(product=self.product)
+        self.assertEqual((summary.review_count, summary.rating_sum), (1, 5))
+        self.assertEqual((summary.stars_2, summary.stars_5), (0, 1))
+
+    def test_previous_rating_is_read_with_the_row_locked(self):
+        self.review.rating = 4
+        with CaptureQueriesContext(connection) as queries:
+            self.review.save()
+
+        previous = next(query['sql'] for query in queries if query['sql'].startswith('SELECT'))
+        self.assertIn('FOR UPDATE', previous)
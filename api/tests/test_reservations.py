@@ -0,0 +1,94 @@
+import random
+import threading
+from decimal import Decimal
+
+from django.db import OperationalError, connection
+from django.db.models import Sum
+from django.test import TestCase, TransactionTestCase
+
+from api.models.inventory.models_inventory import StockReservation
+from api.models.products.models_products import Product, ProductVariant
+from api.services.inventory.reservations import InsufficientStock, release_reservations, reserve_stock
+
+
+class StockReservationTests(TestCase):
+    def setUp(self):
+        product = Product.objects.create(name="Camiseta", sku='TEST-RES', price=Decimal('30000'))
+        self.talla_s = ProductVariant.objects.create(product=product, sku='TEST-RES-S', stock_quantity=5)
+        self.talla_m = ProductVariant.objects.create(product=product, sku='TEST-RES-M', stock_quantity=1)
+
+    def stock(self):
+        return dict(ProductVariant.objects.values_list('sku', 'stock_quantity'))
+
+    def test_reserves_all_lines_and_merges_repeated_variants(self):
+        reservations = reserve_stock([(self.talla_s.pk, 2), (self.talla_m.pk, 1), (self.talla_s.pk, 1)], 'carrito-1')
+
+        self.assertEqual(len(reservations), 2)
+        self.assertEqual(self.stock(), {'TEST-RES-S': 2, 'TEST-RES-M': 0})
+
+    def test_insufficient_line_reserves_nothing(self):
+        with self.assertRaises(InsufficientStock) as raised:
+            reserve_stock([(self.talla_s.pk, 1), (self.talla_m.pk, 2)], 'carrito-2')
+
+        self.assertEqual(raised.exception.shortages, {self.talla_m.pk: (2, 1)})
+        self.assertEqual(self.stock(), {'TEST-RES-S': 5, 'TEST-RES-M': 1})
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_release_returns_stock_once(self):
+        reserve_stock([(self.talla_s.pk, 3)], 'carrito-3')
+
+        self.assertEqual(release_reservations('carrito-3'), 1)
+        self.assertEqual(release_reservations('carrito-3'), 0)
+        self.assertEqual(self.stock()['TEST-RES-S'], 5)
+
+
+class ConcurrentReservationTests(TransactionTestCase):
+    # Cada hilo usa su propia conexión: hace falta commit real para que compitan por las filas
+    THREADS = 8
+    ATTEMPTS = 15
+    STOCK = 30
+
+    def test_concurrent_reservations_never_oversell(self):
+        product = Product.objects.create(name="Camiseta", sku='TEST-CONC', price=Decimal('30000'))
+        variant_ids = [
+            variant.pk for variant in ProductVariant.objects.bulk_create([
+                ProductVariant(product=product, sku=f"TEST-CONC-{i}", stock_quantity=self.STOCK) for i in range(3)
+            ])
+        ]
+        outcomes, errors = [], []
+
+        def worker(seed):
+            rng = random.Random(seed)
+            try:
+                for attempt in range(self.ATTEMPTS):
+                    lines = [(variant_id, rng.randint(1, 3)) for variant_id in rng.sample(variant_ids, rng.randint(1, 3))]
+                    while True:
+                        try:
+                            reserve_stock(lines, reference=f"hilo-{seed}-{attempt}")
+                            outcomes.append('reserved')
+                        except InsufficientStock:
+                            outcomes.append('rejected')
+                        except OperationalError:
+                            # SQLite: base bloqueada; PostgreSQL: deadlock entre los UPDATE. Se revirtió todo
+                            continue
+                        break
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(outcomes), self.THREADS * self.ATTEMPTS)
+        self.assertIn('rejected', outcomes)  # la demanda supera el stock: hubo competencia real
+        reserved = dict(
+            StockReservation.objects.values('variant_id').annotate(total=Sum('quantity')).values_list('variant_id', 'total')
+        )
+        for variant_id, stock in ProductVariant.objects.filter(pk__in=variant_ids).values_list('pk', 'stock_quantity'):
+            self.assertGreaterEqual(stock, 0)
+            self.assertEqual(stock + reserved.get(variant_id, 0), self.STOCK)
@@ -0,0 +1,43 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+
+from api.models.orders.models_orders import Order, ShippingRate
+from api.services.orders import shipping
+from .helpers import clear_caches
+
+
+class RateTableTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        shipping._table = None
+
+    def create_rate(self, cost, max_weight_grams=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return ShippingRate.objects.create(
+                shipping_method=Order.ShippingMethod.STANDARD, max_weight_grams=max_weight_grams, cost=cost,
+            )
+
+    def test_lookups_within_the_interval_skip_the_cache(self):
+        self.create_rate(Decimal('9000'))
+        shipping.get_rate_table()
+
+        with mock.patch.object(shipping.cache, 'get_or_set') as version:
+            self.assertEqual(len(shipping.get_rate_table()), 1)
+        version.assert_not_called()
+
+    def test_change_is_visible_in_this_process_right_away(self):
+        self.create_rate(Decimal('9000'))
+        shipping.get_rate_table()
+        self.create_rate(Decimal('6000'), max_weight_grams=1000)
+
+        quote = shipping.get_rate_table().quote('11001', '11', Order.ShippingMethod.STANDARD, 500)
+        self.assertEqual(quote.cost, Decimal('6000.00'))
+
+    def test_national_open_bracket_is_unique(self):
+        self.create_rate(Decimal('9000'))
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.create_rate(Decimal('8000'))
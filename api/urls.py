@@ -0,0 +1,9 @@
+from django.urls import path
+
+from api.views.orders.views_export import OrderExportView
+from api.views.orders.views_reports import SalesReportView
+
+urlpatterns = [
+    path('orders/export/', OrderExportView.as_view(), name='order-export'),
+    path('reports/sales/', SalesReportView.as_view(), name='sales-report'),
+]
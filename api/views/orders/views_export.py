@@ -0,0 +1,53 @@
+from datetime import date
+
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from api.models.orders.models_orders import Order
+from api.services.orders.export import FORMATS, export_filename, export_orders, export_querysets
+
+
+class OrderExportView(APIView):
+    """
+    GET /api/orders/export/?output=csv|ndjson&gzip=1&start=2025-01-01&end=2025-03-31&status=paid,delivered
+
+    Responde con `StreamingHttpResponse`: no pasa por `CustomJSONRenderer`
+    ni arma la exportación completa en memoria.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        params = request.query_params
+        output = params.get('output', 'csv')
+        if output not in FORMATS:
+            return self.error(f"Formato inválido; opciones: {', '.join(FORMATS)}.")
+        try:
+            start = date.fromisoformat(params['start']) if params.get('start') else None
+            end = date.fromisoformat(params['end']) if params.get('end') else None
+        except ValueError:
+            return self.error("Las fechas deben tener formato AAAA-MM-DD.")
+        statuses = [value for value in params.get('status', '').split(',') if value]
+        if set(statuses) - set(Order.Status.values):
+            return self.error(f"Estado inválido; opciones: {', '.join(Order.Status.values)}.")
+        gzip = params.get('gzip', '').lower() in ('1', 'true', 'yes')
+
+        response = StreamingHttpResponse(
+            export_orders(export_querysets(start, end, statuses), output, gzip),
+            content_type=FORMATS[output][0] + '; charset=utf-8',
+        )
+        if gzip:
+            # Descarga del archivo .gz tal cual: no se declara Content-Encoding
+            response['Content-Type'] = 'application/gzip'
+        response['Content-Disposition'] = f'attachment; filename="{export_filename(output, gzip)}"'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    @staticmethod
+    def error(message):
+        return Response(
+            {'message': message, 'data': None, 'errors': [message]},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
@@ -0,0 +1,46 @@
+from datetime import date, timedelta
+
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from api.services.orders.rollups import REPORT_DIMENSIONS, ROLLUPS, sales_report
+
+
+class SalesReportView(APIView):
+    """
+    GET /api/reports/sales/?start=2025-01-01&end=2025-01-31&group_by=period,municipio&granularity=daily
+
+    Lee solo `SalesDaily`/`SalesHourly`; nunca agrega `orders` ni `order_items`.
+    """
+    permission_classes = [IsAdminUser]
+    pagination_class = None
+
+    def get(self, request):
+        try:
+            end = date.fromisoformat(request.query_params.get('end') or date.today().isoformat())
+            start = date.fromisoformat(request.query_params.get('start') or (end - timedelta(days=29)).isoformat())
+        except ValueError:
+            return self.error("Las fechas deben tener formato AAAA-MM-DD.")
+        granularity = request.query_params.get('granularity', 'daily')
+        if granularity not in ROLLUPS:
+            return self.error(f"Granularidad inválida; opciones: {', '.join(ROLLUPS)}.")
+        group_by = [value for value in request.query_params.get('group_by', 'period').split(',') if value]
+        if set(group_by) - set(REPORT_DIMENSIONS):
+            return self.error(f"Dimensión inválida; opciones: {', '.join(REPORT_DIMENSIONS)}.")
+        if start > end:
+            return self.error("`start` debe ser anterior o igual a `end`.")
+
+        rows = sales_report(start, end, group_by, granularity)
+        return Response({
+            'message': "Reporte de ventas generado.",
+            'data': {'start': start, 'end': end, 'granularity': granularity, 'group_by': group_by, 'rows': rows},
+        })
+
+    @staticmethod
+    def error(message):
+        return Response(
+            {'message': message, 'data': None, 'errors': [message]},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
@@ -29,7 +29,7 @@ DEBUG = False
 ALLOWED_HOSTS = ['*']
 
 # Configuración personalizada para el modelo de usuario
-#AUTH_USER_MODEL = 'api.User' 
+AUTH_USER_MODEL = 'api.User'
 
 # Application definition
 
@@ -41,6 +41,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',  # ArrayField, búsqueda full-text y trigramas
     
     # Third-party apps (cada una solo una vez)
     'rest_framework',
@@ -62,6 +63,75 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Conteos de paginación: caché por filtros y estimación del planificador
+PAGINATION_COUNT_CACHE_TTL = config('PAGINATION_COUNT_CACHE_TTL', default=30, cast=int)  # Segundos
+PAGINATION_COUNT_ESTIMATE_THRESHOLD = config('PAGINATION_COUNT_ESTIMATE_THRESHOLD', default=100000, cast=int)  # 0 desactiva la estimación
+
+# Facetas del catálogo: caché por firma de filtros
+FACET_CACHE_TTL = config('FACET_CACHE_TTL', default=60, cast=int)  # Segundos
+
+# Documento de detalle de producto (se invalida por señales; el TTL es un respaldo)
+PRODUCT_DOCUMENT_CACHE_TTL = config('PRODUCT_DOCUMENT_CACHE_TTL', default=3600, cast=int)  # Segundos
+
+# Reservas de stock: tiempo que un carrito retiene las unidades
+STOCK_RESERVATION_TTL = config('STOCK_RESERVATION_TTL', default=900, cast=int)  # Segundos
+
+# Tablas de precio por producto (se invalidan al guardar producto o variantes)
+PRICE_CACHE_TTL = config('PRICE_CACHE_TTL', default=300, cast=int)  # Segundos
+
+# Envíos: peso asumido para productos sin `weight_grams`
+SHIPPING_DEFAULT_WEIGHT_GRAMS = config('SHIPPING_DEFAULT_WEIGHT_GRAMS', default=500, cast=int)  # Gramos
+
+# Números de orden: prefijo y cantidad reservada por proceso en cada viaje a la base
+ORDER_NUMBER_PREFIX = config('ORDER_NUMBER_PREFIX', default='HS')
+ORDER_NUMBER_BLOCK_SIZE = config('ORDER_NUMBER_BLOCK_SIZE', default=100, cast=int)
+
+# Checkout: IVA sobre el subtotal con descuento (0 si los precios ya lo incluyen)
+ORDER_TAX_RATE = config('ORDER_TAX_RATE', default='0.19')
+
+# Exportación de órdenes: filas por lectura del cursor y por lote de líneas/pagos
+ORDER_EXPORT_CHUNK_SIZE = config('ORDER_EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
+# Archivo de órdenes: antigüedad desde la que se mueven las entregadas o canceladas
+ORDER_ARCHIVE_AFTER_DAYS = config('ORDER_ARCHIVE_AFTER_DAYS', default=365, cast=int)  # Días
+
+# Idempotencia: peticiones con `Idempotency-Key` bajo estas rutas se ejecutan una sola vez. Solo
+# creación de órdenes, checkout y pagos: la respuesta se guarda en claro en `idempotency_keys`, así
+# que nunca rutas de autenticación (login y refresh devuelven JWT)
+IDEMPOTENCY_PATHS = ['/api/orders/', '/api/checkout/', '/api/payments/']
+IDEMPOTENCY_TTL = config('IDEMPOTENCY_TTL', default=86400, cast=int)  # Segundos que se guarda la respuesta
+IDEMPOTENCY_WAIT_TIMEOUT = config('IDEMPOTENCY_WAIT_TIMEOUT', default=30, cast=int)  # Segundos que espera un duplicado
+IDEMPOTENCY_LEASE = config('IDEMPOTENCY_LEASE', default=30, cast=int)  # Segundos sin latido para dar por caída una petición
+IDEMPOTENCY_LRU_SIZE = config('IDEMPOTENCY_LRU_SIZE', default=10000, cast=int)  # Respuestas en memoria por proceso
+
+# Carrito en caché con escritura diferida. En pruebas y desarrollo, LocMemCache propia (la de
+# Django guarda solo 300 entradas y expulsaría carritos sin persistir); en producción una caché
+# compartida entre procesos y sin expulsión por memoria, p. ej.
+# CART_CACHE_BACKEND=django.core.cache.backends.redis.RedisCache CART_CACHE_LOCATION=redis://...
+CART_CACHE_BACKEND = config('CART_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache')
+# La caché por defecto guarda las versiones de invalidación de las tablas en memoria (categorías,
+# índice geográfico, tarifas), los precios y los conteos: con varios workers debe ser compartida
+# (CACHE_BACKEND=django.core.cache.backends.redis.RedisCache CACHE_LOCATION=redis://...). Cada
+# proceso lee la versión de una tabla como mucho cada IN_PROCESS_TABLE_TTL segundos; con una caché
+# local la tabla se recarga siempre al vencer ese plazo.
+CACHE_BACKEND = config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache')
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    },
+    'carts': {
+        'BACKEND': CART_CACHE_BACKEND,
+        'LOCATION': config('CART_CACHE_LOCATION', default='carts'),
+        # MAX_ENTRIES solo aplica a LocMemCache; Redis pasaría OPTIONS a su pool de conexiones
+        'OPTIONS': {'MAX_ENTRIES': 100000} if CART_CACHE_BACKEND.endswith('LocMemCache') else {},
+    },
+}
+CART_CACHE_ALIAS = config('CART_CACHE_ALIAS', default='carts')
+CART_CACHE_TTL = config('CART_CACHE_TTL', default=604800, cast=int)  # Segundos
+CART_FLUSH_INTERVAL = config('CART_FLUSH_INTERVAL', default=30, cast=int)  # Segundos máximos sin persistir
+IN_PROCESS_TABLE_TTL = config('IN_PROCESS_TABLE_TTL', default=60, cast=int)  # Segundos entre lecturas de la versión de una tabla en memoria
+
 
 from datetime import timedelta
 
@@ -83,6 +153,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'utils.idempotency.IdempotencyMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'api.middlewares.CustomExceptionMiddleware',
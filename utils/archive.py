@@ -0,0 +1,42 @@
+from django.db import models
+
+
+def archive_model(source, name, db_table, parents=None):
+    """
+    Modelo de archivo con las mismas columnas que `source` y tabla propia.
+
+    No copia los índices del `Meta` de `source` (solo la clave primaria,
+    las columnas `unique` y los índices de las claves foráneas) y sus
+    claves foráneas no llevan restricción en la base, así que archivar no
+    bloquea borrar productos o direcciones. `parents` redirige las claves
+    hacia otros modelos de archivo: `{Order: ArchivedOrder}` hace que
+    `archived_order.items` funcione igual que `order.items`.
+    """
+    parents = parents or {}
+    attrs = {'__module__': source.__module__}
+    for field in source._meta.concrete_fields:
+        if field.is_relation:
+            # Sin deconstruct(): la clave hacia el usuario es intercambiable y
+            # resolverla exige el registro de modelos completo
+            target = parents.get(field.remote_field.model)
+            attrs[field.name] = models.ForeignKey(
+                target or field.remote_field.model,
+                on_delete=models.DO_NOTHING,
+                db_constraint=False,
+                related_name=field.remote_field.related_name if target else '+',
+                null=field.null,
+                blank=field.blank,
+                verbose_name=field.verbose_name,
+            )
+        else:
+            _, _, args, kwargs = field.deconstruct()
+            attrs[field.name] = field.__class__(*args, **kwargs)
+
+    attrs['Meta'] = type('Meta', (), {
+        'db_table': db_table,
+        'ordering': source._meta.ordering,
+        'verbose_name': f"{source._meta.verbose_name} (archivo)",
+        'verbose_name_plural': f"{source._meta.verbose_name_plural} (archivo)",
+    })
+    attrs['__str__'] = source.__str__
+    return type(name, (models.Model,), attrs)
@@ -0,0 +1,26 @@
+import time
+
+from django.conf import settings
+
+# Backends cuyo contenido vive dentro de cada proceso: con varios workers cada uno tiene su copia
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def is_shared_cache(alias='default'):
+    """False si la caché `alias` es local al proceso"""
+    return settings.CACHES.get(alias, {}).get('BACKEND') not in PROCESS_LOCAL_BACKENDS
+
+
+def refresh_due(checked_at):
+    """
+    True si una tabla en memoria revisada por última vez en `checked_at`
+    (`time.monotonic()`) debe volver a leer su versión compartida. Como
+    mucho una vez cada `IN_PROCESS_TABLE_TTL` segundos: entre revisiones
+    una lectura no hace ningún viaje a la caché. Con una caché local al
+    proceso la versión no trae los cambios de otros workers, así que al
+    vencer el plazo la tabla se recarga siempre (ver `is_shared_cache`).
+    """
+    return checked_at is None or time.monotonic() - checked_at >= getattr(settings, 'IN_PROCESS_TABLE_TTL', 60)
@@ -0,0 +1,152 @@
+import hashlib
+import json
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+from django.db.models.sql import Query
+from django.db.models.sql.where import WhereNode
+
+COUNT_CACHE_PREFIX = 'count'
+COUNT_VERSION_PREFIX = 'count_version'
+
+
+def _version_key(model):
+    return f"{COUNT_VERSION_PREFIX}:{model._meta.label_lower}"
+
+
+def get_model_version(model):
+    """
+    Versión de invalidación del modelo; cambia con cada alta, cambio o baja.
+    """
+    return cache.get(_version_key(model), 0)
+
+
+def _models_by_table():
+    return {model._meta.db_table: model for model in apps.get_models(include_auto_created=True)}
+
+
+def queryset_models(queryset):
+    """
+    Modelos de todas las tablas que lee el queryset: la propia, las de sus
+    JOIN y las de subconsultas en filtros y anotaciones.
+    """
+    by_table = _models_by_table()
+    tables, pending = set(), [queryset.query]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, Query):
+            if node.model is not None:
+                tables.add(node.model._meta.db_table)
+            # Los JOIN recortados (`categories__id` no lee `product_categories`) quedan con refcount 0
+            tables.update(join.table_name for alias, join in node.alias_map.items() if node.alias_refcount.get(alias))
+            pending.extend([node.where, *node.annotations.values(), *node.combined_queries])
+        elif isinstance(node, WhereNode):
+            pending.extend(node.children)
+        else:
+            # Lookups (`lhs`/`rhs`, `__in=queryset`), Subquery/Exists (`query`) y expresiones
+            pending.extend(
+                value for value in (getattr(node, 'lhs', None), getattr(node, 'rhs', None), getattr(node, 'query', None))
+                if isinstance(value, (Query, WhereNode)) or hasattr(value, 'get_source_expressions')
+            )
+            if hasattr(node, 'get_source_expressions'):
+                pending.extend(expression for expression in node.get_source_expressions() if expression is not None)
+    return sorted((by_table[table] for table in tables if table in by_table), key=lambda model: model._meta.label_lower)
+
+
+def queryset_fingerprint(queryset):
+    """
+    Huella del queryset: versiones de invalidación de cada modelo que lee
+    (ver `queryset_models`) y SQL con parámetros. Dos peticiones con los
+    mismos filtros comparten la misma huella; un cambio en cualquier tabla
+    unida, p. ej. una asignación de categoría, la cambia.
+    Devuelve None si el queryset es vacío por construcción (`.none()`,
+    `pk__in=[]`) y por tanto no tiene SQL.
+    """
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return None
+    models = queryset_models(queryset)
+    keys = [_version_key(model) for model in models]
+    stored = cache.get_many(keys)
+    versions = ','.join(f"{key}={stored.get(key, 0)}" for key in keys)
+    raw = f"{queryset.model._meta.label_lower}|{versions}|{sql}|{params!r}"
+    digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+    return f"{COUNT_CACHE_PREFIX}:{digest}"
+
+
+def invalidate_counts(model):
+    """
+    Invalida todos los conteos cacheados de un modelo subiendo su versión.
+    """
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def estimate_count(queryset):
+    """
+    Estimación del planificador de PostgreSQL.
+
+    Sin filtros usa `pg_class.reltuples`; con filtros usa las filas
+    estimadas de `EXPLAIN`. Devuelve None en otros motores o si PostgreSQL
+    aún no tiene estadísticas de la tabla.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+            estimate = row[0] if row else None
+        else:
+            try:
+                sql, params = queryset.query.sql_with_params()
+            except EmptyResultSet:
+                return 0
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            estimate = plan[0]['Plan']['Plan Rows']
+
+    if estimate is None or estimate < 0:
+        return None
+    return int(estimate)
+
+
+def get_count(queryset):
+    """
+    Devuelve `(count, es_aproximado)` para un queryset.
+
+    El resultado se cachea por huella durante `PAGINATION_COUNT_CACHE_TTL`
+    segundos. Si la estimación supera `PAGINATION_COUNT_ESTIMATE_THRESHOLD`
+    se devuelve la estimación en lugar de ejecutar COUNT(*).
+    """
+    key = queryset_fingerprint(queryset)
+    if key is None:
+        # Vacío por construcción: conteo exacto sin consultar ni cachear
+        return (0, False)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    threshold = getattr(settings, 'PAGINATION_COUNT_ESTIMATE_THRESHOLD', 100000)
+    estimate = estimate_count(queryset) if threshold else None
+    if estimate is not None and estimate > threshold:
+        result = (estimate, True)
+    else:
+        result = (queryset.count(), False)
+
+    cache.set(key, result, getattr(settings, 'PAGINATION_COUNT_CACHE_TTL', 30))
+    return result
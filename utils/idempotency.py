@@ -0,0 +1,354 @@
+"""
+Idempotencia para peticiones que crean órdenes o pagos.
+
+Un cliente que reintenta envía la misma cabecera `Idempotency-Key`. La
+primera petición se ejecuta y su respuesta se guarda en
+`IdempotencyKey`; las repeticiones reciben esa misma respuesta (con
+`Idempotent-Replayed: true`) sin volver a ejecutar la vista.
+
+    - Huella: usuario (del JWT o la sesión), método, ruta y clave. La misma
+      clave con otro cuerpo responde 422.
+    - Consulta: primero un LRU en memoria del proceso (microsegundos);
+      si no está, el propio INSERT que reserva la clave es la consulta:
+      la restricción única de `fingerprint` decide quién la ejecuta.
+    - Duplicados en curso: el segundo espera a que el primero termine
+      (un `threading.Event` dentro del proceso; sondeo de la fila entre
+      procesos) y devuelve su respuesta. Si no termina en
+      `IDEMPOTENCY_WAIT_TIMEOUT` responde 409. Mientras corre, un hilo del
+      proceso renueva su `heartbeat_at` cada tercio de
+      `IDEMPOTENCY_LEASE`; solo una reserva sin latido durante todo ese
+      plazo (proceso caído) se puede volver a tomar, así que una vista
+      lenta nunca se ejecuta dos veces.
+    - Vencimiento: una respuesta con `expires_at` pasado no se repite
+      aunque el barrido aún no haya borrado la fila.
+    - Solo se guardan respuestas definitivas: un 5xx o un 401/403/409/429
+      liberan la clave para que el reintento se ejecute.
+
+Se aplica con `IdempotencyMiddleware` (rutas de `IDEMPOTENCY_PATHS`) o
+con el decorador `idempotent` en vistas sueltas. Las claves vencidas se
+borran por lotes con `expire_idempotency_keys`.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, connection, transaction
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from api.models.orders.models_orders import IdempotencyKey
+
+HEADER = 'HTTP_IDEMPOTENCY_KEY'
+METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
+# Respuestas que el cliente debe poder reintentar en vez de recibir repetidas
+TRANSIENT_STATUSES = {401, 403, 408, 409, 429}
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    request_hash: str
+    status_code: int
+    content_type: str
+    body: bytes
+    expires_at: float  # time.time()
+
+    def replay(self):
+        response = HttpResponse(self.body, status=self.status_code, content_type=self.content_type)
+        response['Idempotent-Replayed'] = 'true'
+        return response
+
+
+class ResponseLRU:
+    """LRU con vencimiento de las respuestas ya guardadas, por proceso"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, fingerprint):
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.time():
+                del self._entries[fingerprint]
+                return None
+            self._entries.move_to_end(fingerprint)
+            return entry
+
+    def put(self, fingerprint, entry):
+        with self._lock:
+            self._entries[fingerprint] = entry
+            self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_lru = ResponseLRU(getattr(settings, 'IDEMPOTENCY_LRU_SIZE', 10000))
+_inflight = {}  # {huella: Event} de las peticiones que este proceso está ejecutando
+_owned = set()  # huellas reservadas en la base por este proceso; las renueva `_heartbeat_loop`
+_inflight_lock = threading.Lock()
+_heartbeat = None
+
+
+def _error(status, message):
+    return JsonResponse(
+        {'status': 'error', 'message': message, 'data': None, 'code': status, 'errors': [message]},
+        status=status,
+    )
+
+
+def _scope(request):
+    """Dueño de la clave: usuario del JWT (sin consultar la base), de la sesión o anónimo"""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f"user:{user.pk}"
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    if raw_token:
+        try:
+            token = authentication.get_validated_token(raw_token)
+            return f"user:{token[jwt_settings.USER_ID_CLAIM]}"
+        except (InvalidToken, TokenError, KeyError):
+            pass
+    return "anonymous"
+
+
+def _fingerprint(request, key):
+    raw = f"{_scope(request)}|{request.method}|{request.path}|{key}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def _stored(row):
+    return StoredResponse(
+        request_hash=row.request_hash,
+        status_code=row.status_code,
+        content_type=row.content_type,
+        body=bytes(row.body or b''),
+        expires_at=row.expires_at.timestamp(),
+    )
+
+
+def _lease():
+    return getattr(settings, 'IDEMPOTENCY_LEASE', 30)
+
+
+def _heartbeat_loop():
+    """
+    Hilo del proceso que renueva `heartbeat_at` de todas sus reservas en
+    curso con un UPDATE cada tercio de `IDEMPOTENCY_LEASE`.
+    """
+    while True:
+        time.sleep(max(_lease() / 3, 0.1))
+        with _inflight_lock:
+            owned = list(_owned)
+        if not owned:
+            continue
+        try:
+            IdempotencyKey.objects.filter(fingerprint__in=owned, status_code__isnull=True).update(
+                heartbeat_at=timezone.now(),
+            )
+        except DatabaseError:
+            connection.close()  # se reconecta en el siguiente latido
+
+
+def _own(fingerprint):
+    global _heartbeat
+    with _inflight_lock:
+        _owned.add(fingerprint)
+        if _heartbeat is None:
+            _heartbeat = threading.Thread(target=_heartbeat_loop, name='idempotency-heartbeat', daemon=True)
+            _heartbeat.start()
+
+
+def _claim(fingerprint, request_hash, ttl):
+    """Reserva la clave; False si otra petición ya la tiene"""
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            IdempotencyKey.objects.create(
+                fingerprint=fingerprint,
+                request_hash=request_hash,
+                expires_at=now + timedelta(seconds=ttl),
+                heartbeat_at=now,
+            )
+        return True
+    except IntegrityError:
+        return False
+
+
+def _wait(fingerprint, request_hash, ttl):
+    """
+    Espera a la petición que tiene la clave. Devuelve su `StoredResponse`,
+    o None si la clave quedó libre y esta petición la reservó.
+    """
+    timeout = getattr(settings, 'IDEMPOTENCY_WAIT_TIMEOUT', 30)
+    deadline = time.monotonic() + timeout
+    delay = 0.005
+    while True:
+        event = _inflight.get(fingerprint)
+        if event is not None:
+            event.wait(max(0, deadline - time.monotonic()))
+        entry = _lru.get(fingerprint)
+        if entry is not None:
+            return entry
+
+        row = IdempotencyKey.objects.filter(fingerprint=fingerprint).first()
+        if row is None:
+            # La primera falló y liberó la clave: esta petición la toma
+            if _claim(fingerprint, request_hash, ttl):
+                return None
+            continue
+        now = timezone.now()
+        if row.status_code is not None:
+            if row.expires_at <= now:
+                # Respuesta vencida que el barrido aún no borró: la clave vuelve a estar libre
+                IdempotencyKey.objects.filter(pk=row.pk, expires_at__lte=now).delete()
+                continue
+            entry = _stored(row)
+            _lru.put(fingerprint, entry)
+            return entry
+        if row.heartbeat_at < now - timedelta(seconds=_lease()):
+            # Sin latido durante todo el plazo: el proceso dueño cayó. Se libera una sola vez
+            IdempotencyKey.objects.filter(
+                pk=row.pk, status_code__isnull=True, heartbeat_at=row.heartbeat_at,
+            ).delete()
+            continue
+        if time.monotonic() >= deadline:
+            raise TimeoutError(fingerprint)
+        time.sleep(delay)
+        delay = min(delay * 2, 0.1)
+
+
+def _save(fingerprint, request_hash, response, ttl):
+    if hasattr(response, 'render') and not getattr(response, 'is_rendered', True):
+        response.render()
+    if response.streaming or response.status_code >= 500 or response.status_code in TRANSIENT_STATUSES:
+        IdempotencyKey.objects.filter(fingerprint=fingerprint, status_code__isnull=True).delete()
+        return
+    expires_at = timezone.now() + timedelta(seconds=ttl)
+    entry = StoredResponse(
+        request_hash=request_hash,
+        status_code=response.status_code,
+        content_type=response.get('Content-Type', ''),
+        body=response.content,
+        expires_at=expires_at.timestamp(),
+    )
+    IdempotencyKey.objects.filter(fingerprint=fingerprint).update(
+        status_code=entry.status_code,
+        content_type=entry.content_type,
+        body=entry.body,
+        expires_at=expires_at,
+    )
+    _lru.put(fingerprint, entry)
+
+
+def run_idempotent(request, handler):
+    """Ejecuta `handler(request)` una sola vez por `Idempotency-Key`"""
+    key = request.META.get(HEADER)
+    if not key or request.method not in METHODS or getattr(request, '_idempotency_checked', False):
+        return handler(request)
+    request._idempotency_checked = True  # middleware y decorador no se aplican dos veces
+    if len(key) > 255:
+        return _error(400, "La cabecera Idempotency-Key admite hasta 255 caracteres.")
+
+    ttl = getattr(settings, 'IDEMPOTENCY_TTL', 86400)
+    fingerprint = _fingerprint(request, key)
+    request_hash = hashlib.sha256(request.body).hexdigest()
+
+    entry = _lru.get(fingerprint)
+    if entry is None:
+        with _inflight_lock:
+            event = _inflight.get(fingerprint)
+            owner = event is None
+            if owner:
+                event = _inflight[fingerprint] = threading.Event()
+        if owner and not _claim(fingerprint, request_hash, ttl):
+            # Otro proceso la tiene: liberar el evento local y esperar como duplicado
+            with _inflight_lock:
+                _inflight.pop(fingerprint, None)
+            event.set()
+            owner = False
+        if not owner:
+            try:
+                entry = _wait(fingerprint, request_hash, ttl)
+            except TimeoutError:
+                response = _error(409, "Una petición con la misma Idempotency-Key sigue en curso; reintente.")
+                response['Retry-After'] = '1'
+                return response
+            if entry is None:
+                # La clave quedó libre y ahora es de esta petición
+                with _inflight_lock:
+                    event = _inflight.setdefault(fingerprint, threading.Event())
+                owner = True
+        if owner:
+            _own(fingerprint)
+            try:
+                response = handler(request)
+                _save(fingerprint, request_hash, response, ttl)
+                return response
+            except BaseException:
+                IdempotencyKey.objects.filter(fingerprint=fingerprint, status_code__isnull=True).delete()
+                raise
+            finally:
+                with _inflight_lock:
+                    _inflight.pop(fingerprint, None)
+                    _owned.discard(fingerprint)
+                event.set()
+
+    if entry.request_hash != request_hash:
+        return _error(422, "La Idempotency-Key ya se usó con otro cuerpo de petición.")
+    return entry.replay()
+
+
+class IdempotencyMiddleware:
+    """Aplica `run_idempotent` a las rutas de `IDEMPOTENCY_PATHS`"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.paths = tuple(getattr(settings, 'IDEMPOTENCY_PATHS', ()))
+
+    def __call__(self, request):
+        if request.method in METHODS and HEADER in request.META and request.path.startswith(self.paths):
+            return run_idempotent(request, self.get_response)
+        return self.get_response(request)
+
+
+def idempotent(view):
+    """
+    Decorador para vistas fuera de `IDEMPOTENCY_PATHS`:
+    `path('checkout/', idempotent(CheckoutView.as_view()))`.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        return run_idempotent(request, lambda request: view(request, *args, **kwargs))
+    return wrapper
+
+
+def expire_idempotency_keys(batch_size=1000, now=None):
+    """Borra por lotes las claves vencidas. Devuelve cuántas se borraron."""
+    now = now or timezone.now()
+    deleted = 0
+    while True:
+        batch = list(
+            IdempotencyKey.objects.filter(expires_at__lte=now).order_by('expires_at')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if batch:
+            deleted += IdempotencyKey.objects.filter(pk__in=batch).delete()[0]
+        if len(batch) < batch_size:
+            return deleted
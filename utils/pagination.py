@@ -1,8 +1,27 @@
-from rest_framework.pagination import PageNumberPagination
+from django.core.paginator import Paginator
+from django.db.models.query import QuerySet
+from django.utils.functional import cached_property
+from rest_framework.pagination import PageNumberPagination, CursorPagination
 from rest_framework.response import Response
 from rest_framework import status
 
+from utils.counts import get_count
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator que obtiene el total desde la capa de conteos cacheados.
+    """
+    count_is_approximate = False
+
+    @cached_property
+    def count(self):
+        if not isinstance(self.object_list, QuerySet):
+            return super().count
+        count, self.count_is_approximate = get_count(self.object_list)
+        return count
+
 class StandardResultsSetPagination(PageNumberPagination):
+    django_paginator_class = CachedCountPaginator
     page_size = 10  # Tamaño de página por defecto
     page_size_query_param = 'page_size'  # Parámetro para cambiar el tamaño de página
     max_page_size = 100  # Tamaño máximo de página permitido
@@ -16,6 +35,49 @@ class StandardResultsSetPagination(PageNumberPagination):
             "message": "Datos obtenidos correctamente.",
             "data": {
                 "count": self.page.paginator.count,
+                "count_is_approximate": self.page.paginator.count_is_approximate,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            },
+            "code": status.HTTP_200_OK,
+            "errors": [],
+        }
+        return Response(response_data)
+
+class CursorResultsSetPagination(CursorPagination):
+    """
+    Paginación por cursor (keyset) para tablas grandes.
+
+    No ejecuta COUNT(*) ni OFFSET: cada página filtra a partir de la última
+    posición vista, así que la página N cuesta lo mismo que la primera.
+    El orden por defecto coincide con `Product.Meta.ordering` y
+    `Order.Meta.ordering`, con `id` como desempate. Una vista puede definir
+    `cursor_ordering` para usar otro campo (p. ej. `('-changed_at', '-id')`
+    en el historial de estados).
+    """
+    page_size = 10  # Tamaño de página por defecto
+    page_size_query_param = 'page_size'  # Parámetro para cambiar el tamaño de página
+    max_page_size = 100  # Tamaño máximo de página permitido
+    ordering = ('-created_at', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Permite que cada vista elija su propio orden con `cursor_ordering`.
+        """
+        ordering = getattr(view, 'cursor_ordering', None)
+        if ordering:
+            return (ordering,) if isinstance(ordering, str) else tuple(ordering)
+        return super().get_ordering(request, queryset, view)
+
+    def get_paginated_response(self, data):
+        """
+        Devuelve una respuesta paginada estandarizada (sin `count`).
+        """
+        response_data = {
+            "status": "success",
+            "message": "Datos obtenidos correctamente.",
+            "data": {
                 "next": self.get_next_link(),
                 "previous": self.get_previous_link(),
                 "results": data,
@@ -23,4 +85,4 @@ class StandardResultsSetPagination(PageNumberPagination):
             "code": status.HTTP_200_OK,
             "errors": [],
         }
-        return Response(response_data)
\ No newline at end of file
+        return Response(response_data)